@@ -14,8 +14,8 @@ v6.5.2: Correctly patched Graph API date filter to use unquoted UTC ISO string w
 v6.5.2a: Outlook read now marks mail as read, sturdier drafts, recipient sanitizer, stronger OpenAI error logging.
 
 Install:
-  pip install fastapi uvicorn "websockets>=12" httpx python-dotenv msal "itsdangerous>=2.0" \
-              google-auth google-auth-oauthlib google-api-python-client
+  pip install fastapi uvicorn "websockets>=12" "httpx[http2]" python-dotenv orjson msal "itsdangerous>=2.0" \
+              google-auth google-auth-oauthlib google-api-python-client google-auth-httplib2
 
 Run:
   uvicorn app:app --host 0.0.0.0 --port 8000 --reload
@@ -37,28 +37,39 @@ Env (.env):
   MS_REDIRECT_URI=http://localhost:8000/outlook/callback
 """
 
-import os, io, json, base64, re, uuid, asyncio, traceback, datetime, time, logging
-from collections import deque
+import os, io, json, base64, re, uuid, asyncio, traceback, datetime, time, logging, struct, hashlib, threading, gzip, itertools, secrets, random, html
+from concurrent.futures import ThreadPoolExecutor
+from collections import OrderedDict, deque
 from contextlib import contextmanager
 from contextvars import ContextVar
+from functools import lru_cache
 from typing import Optional, List, Dict, Any, Tuple, Set
 from datetime import timezone
 from pathlib import Path
+from urllib.parse import urlencode, quote
 
 import httpx
+import httplib2
+import orjson
 import msal
 from fastapi import FastAPI, WebSocket, WebSocketDisconnect, Request, Header, Response
-from fastapi.responses import HTMLResponse, PlainTextResponse, RedirectResponse
+from fastapi.responses import HTMLResponse, PlainTextResponse, RedirectResponse, StreamingResponse
 from dotenv import load_dotenv
+try:
+    import brotli
+except ImportError:
+    brotli = None
 from starlette.middleware.sessions import SessionMiddleware
 
 # Google / Gmail / Calendar
-from email.message import EmailMessage
-from email.utils import parseaddr, getaddresses
+from email.header import Header as MIMEHeader
+from email.utils import parseaddr, getaddresses, formataddr
+from google.auth.transport.requests import Request as GoogleAuthRequest
+from google_auth_httplib2 import AuthorizedHttp
 from google.oauth2.credentials import Credentials
 from google_auth_oauthlib.flow import Flow
-from googleapiclient.discovery import build
-from googleapiclient.errors import HttpError
+from googleapiclient.discovery import build_from_document
+from googleapiclient.discovery_cache import get_static_doc
 
 load_dotenv()
 
@@ -101,6 +112,8 @@ MS_REDIRECT_URI = os.getenv("MS_REDIRECT_URI", _default_redirect("/outlook/callb
 MS_SCOPES = ["User.Read", "Mail.ReadWrite", "Mail.Send", "Calendars.ReadWrite"]
 MS_AUTHORITY = f"https://login.microsoftonline.com/{MS_TENANT_ID}" if MS_TENANT_ID else None
 GRAPH_API_ENDPOINT = "https://graph.microsoft.com/v1.0"
+GMAIL_API_ENDPOINT = "https://gmail.googleapis.com/gmail/v1"
+_GRAPH_IDENTITY_SELECT = "displayName,mail,userPrincipalName"
 
 if not OPENAI_API_KEY:
     raise RuntimeError("Set OPENAI_API_KEY in the environment before starting the server.")
@@ -160,26 +173,130 @@ app.add_middleware(
 _SESSION_STATE: Dict[str, Dict[str, Any]] = {}
 _current_session: ContextVar[Optional[str]] = ContextVar("current_session", default=None)
 _MAX_AUDIO_CACHE = int(os.getenv("MAX_AUDIO_CACHE_PER_SESSION", "10"))
+_AUDIO_CACHE_TTL = float(os.getenv("AUDIO_CACHE_TTL_SECONDS", "120"))
+_AUDIO_CACHE_MAX_BYTES = int(os.getenv("AUDIO_CACHE_MAX_BYTES_PER_SESSION", str(8 * 1024 * 1024)))
+
+class AudioLRU:
+    """Per-session store for generated speech, bounded by entry count, total bytes and age."""
+
+    def __init__(self, cap: int = _MAX_AUDIO_CACHE, ttl: float = _AUDIO_CACHE_TTL, max_bytes: int = _AUDIO_CACHE_MAX_BYTES):
+        self.cap = cap
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.total_bytes = 0
+        self.d: "OrderedDict[str, Tuple[float, Any, int]]" = OrderedDict()
+
+    def _pop_oldest(self) -> None:
+        _, (_, _, size) = self.d.popitem(last=False)
+        self.total_bytes -= size
+
+    def put(self, key: str, value: Any) -> None:
+        # Values are bytes or a SpeechStream still being generated; a stream is charged its
+        # current size now and re-charged at its final size once generation ends.
+        self.d[key] = (time.monotonic(), value, len(value))
+        self.total_bytes += len(value)
+        if isinstance(value, SpeechStream) and not value.done:
+            value.on_done(lambda: self._recharge(key, value))
+        self._evict()
+
+    def _recharge(self, key: str, value: Any) -> None:
+        entry = self.d.get(key)
+        if not entry or entry[1] is not value:
+            return
+        self.d[key] = (entry[0], value, len(value))
+        self.total_bytes += len(value) - entry[2]
+        self._evict()
+
+    def _evict(self) -> None:
+        cutoff = time.monotonic() - self.ttl
+        while self.d and (len(self.d) > self.cap or self.total_bytes > self.max_bytes or next(iter(self.d.values()))[0] < cutoff):
+            self._pop_oldest()
+
+    def get(self, key: str) -> Any:
+        entry = self.d.get(key)
+        if not entry:
+            return None
+        if time.monotonic() - entry[0] > self.ttl:
+            del self.d[key]
+            self.total_bytes -= entry[2]
+            return None
+        return entry[1]
+
+    def clear(self) -> None:
+        self.d.clear()
+        self.total_bytes = 0
+
+_SEEN_IDS_CAP = 2048
+
+class _BoundedSet:
+    """Insertion-ordered id set that forgets its oldest entries past ``cap``."""
+
+    def __init__(self, items=(), cap: int = _SEEN_IDS_CAP):
+        self.cap = cap
+        self.d: "OrderedDict[str, None]" = OrderedDict()
+        for item in items:
+            self.add(item)
+
+    def add(self, item: str) -> None:
+        self.d[item] = None
+        self.d.move_to_end(item)
+        if len(self.d) > self.cap:
+            self.d.popitem(last=False)
+
+    def discard(self, item: str) -> None:
+        self.d.pop(item, None)
+
+    def clear(self) -> None:
+        self.d.clear()
+
+    def __contains__(self, item) -> bool:
+        return item in self.d
+
+    def __len__(self) -> int:
+        return len(self.d)
 
 # ---------- Global HTTP client ----------
 _httpx_client: Optional[httpx.AsyncClient] = None
 
 @app.on_event("startup")
 async def _startup():
-    global _httpx_client
-    _httpx_client = httpx.AsyncClient(timeout=httpx.Timeout(60.0), limits=httpx.Limits(max_connections=50))
+    global _httpx_client, _warmup_task
+    _httpx_client = httpx.AsyncClient(
+        http2=True,
+        timeout=httpx.Timeout(60.0, connect=5.0),
+        limits=httpx.Limits(max_connections=1000, max_keepalive_connections=100, keepalive_expiry=30.0),
+    )
+    _warmup_task = asyncio.create_task(_warm_connections())
+
+_warmup_task: Optional[asyncio.Task] = None
+
+async def _warm_connections():
+    # Open the pooled TLS connections now so the first turn doesn't pay DNS + handshake.
+    # Google calls go through per-thread httplib2 transports, which this pool can't prime.
+    probes = [_client().head(f"{OPENAI_BASE_URL.rstrip('/')}/v1/models", headers={"Authorization": f"Bearer {OPENAI_API_KEY}"})]
+    if AVAILABLE_SERVICES.get("microsoft"):
+        probes.append(_client().head(f"{GRAPH_API_ENDPOINT}/$metadata"))
+    await asyncio.gather(*probes, return_exceptions=True)
 
 @app.on_event("shutdown")
 async def _shutdown():
     global _httpx_client
     if _httpx_client:
         await _httpx_client.aclose()
+    _GAPI_POOL.shutdown(wait=False)
 
 def _client() -> httpx.AsyncClient:
     if not _httpx_client:
         raise RuntimeError("HTTP client not initialized")
     return _httpx_client
 
+_OPENAI_CHAT_URL = f"{OPENAI_BASE_URL.rstrip('/')}/v1/chat/completions"
+_OPENAI_JSON_HEADERS = {"Authorization": f"Bearer {OPENAI_API_KEY}", "Content-Type": "application/json"}
+
+async def _openai_chat(payload: Dict[str, Any]) -> httpx.Response:
+    # Every turn's completions go over the one pooled HTTP/2 connection; callers handle status.
+    return await _client().post(_OPENAI_CHAT_URL, content=orjson.dumps(payload), headers=_OPENAI_JSON_HEADERS)
+
 def _ensure_session_id(store: Dict[str, Any]) -> str:
     session_id = store.get("session_id")
     if not session_id:
@@ -219,8 +336,7 @@ def _get_session_state(session_id: Optional[str] = None) -> Dict[str, Any]:
     if not session_id:
         raise RuntimeError("Session context missing.")
     state = _SESSION_STATE.setdefault(session_id, {})
-    state.setdefault("audio_cache", {})
-    state.setdefault("audio_order", deque())
+    state.setdefault("audio_cache", AudioLRU())
     persistent = _PERSISTENT_STATE.get(session_id) if SESSION_PERSISTENCE_ENABLED else None
     if persistent:
         if "google_creds" not in state and persistent.get("google_creds"):
@@ -265,6 +381,9 @@ def _clear_google_creds() -> None:
 def _set_ms_token(token: Dict[str, Any]) -> None:
     session_id = _current_session_id()
     state = _get_session_state(session_id)
+    if "expires_in" in token:
+        # MSAL only reports a relative lifetime; pin it to wall-clock time for the token cache.
+        token = {**token, "expires_at": int(time.time()) + int(token["expires_in"])}
     state["ms_token"] = token
     if SESSION_PERSISTENCE_ENABLED:
         persistent = _PERSISTENT_STATE.setdefault(session_id, {})
@@ -284,35 +403,48 @@ def _clear_ms_token() -> None:
                 _PERSISTENT_STATE.pop(session_id, None)
             _save_persistent_state()
 
-def _store_audio_bytes(audio_bytes: bytes) -> str:
-    state = _get_session_state()
-    audio_cache: Dict[str, bytes] = state["audio_cache"]
-    audio_order: deque = state["audio_order"]
-    audio_id = str(uuid.uuid4())
-    audio_cache[audio_id] = audio_bytes
-    audio_order.append(audio_id)
-    while len(audio_order) > _MAX_AUDIO_CACHE:
-        expired = audio_order.popleft()
-        audio_cache.pop(expired, None)
+# Audio ids only need to be unique and unguessable from outside the process (lookups are also
+# scoped to the session), so a random per-process salt plus a counter stands in for uuid4.
+_AUDIO_ID_SALT = secrets.token_urlsafe(6)
+_audio_id_counter = itertools.count()
+
+def _store_audio_bytes(audio_bytes: Any) -> str:
+    audio_id = f"{_AUDIO_ID_SALT}-{next(_audio_id_counter)}"
+    _get_session_state()["audio_cache"].put(audio_id, audio_bytes)
     return audio_id
 
-def _get_audio_bytes(session_id: str, audio_id: str) -> Optional[bytes]:
+def _get_audio_bytes(session_id: str, audio_id: str) -> Any:
     state = _SESSION_STATE.get(session_id)
-    if not state:
+    if not state or "audio_cache" not in state:
         return None
-    audio_cache: Dict[str, bytes] = state.get("audio_cache", {})
-    return audio_cache.get(audio_id)
+    return state["audio_cache"].get(audio_id)
 
-SUGGESTION_BLOCK_RE = re.compile(r"<suggestions>(.*?)</suggestions>", re.DOTALL)
+_SUGGESTIONS_OPEN = "<suggestions>"
+_SUGGESTIONS_CLOSE = "</suggestions>"
+
+def _iter_suggestion_blocks(message: str):
+    # Yields (start, end, payload) per <suggestions> block; fixed delimiters need no regex.
+    i = 0
+    while (a := message.find(_SUGGESTIONS_OPEN, i)) >= 0:
+        b = message.find(_SUGGESTIONS_CLOSE, a + len(_SUGGESTIONS_OPEN))
+        if b < 0:
+            return
+        i = b + len(_SUGGESTIONS_CLOSE)
+        yield a, i, message[a + len(_SUGGESTIONS_OPEN):b]
 
 def _extract_suggestions(message: str) -> Tuple[str, List[Dict[str, str]]]:
     suggestions: List[Dict[str, str]] = []
     if not message:
         return "", suggestions
 
-    for raw in SUGGESTION_BLOCK_RE.findall(message):
+    # One scan: collect the text between blocks while parsing each block's payload.
+    parts: List[str] = []
+    last = 0
+    for start, end, raw in _iter_suggestion_blocks(message):
+        parts.append(message[last:start])
+        last = end
         try:
-            payload = json.loads(raw)
+            payload = orjson.loads(raw)
         except json.JSONDecodeError:
             continue
         for item in payload.get("items", []):
@@ -320,51 +452,39 @@ def _extract_suggestions(message: str) -> Tuple[str, List[Dict[str, str]]]:
             prompt = (item.get("prompt") or item.get("text") or label).strip()
             if label and prompt:
                 suggestions.append({"label": label, "prompt": prompt})
+    if not parts:
+        return message.strip(), suggestions
+    parts.append(message[last:])
+    return "".join(parts).strip(), suggestions
+
+def _format_display(name: str, email: str) -> str:
+    return f"{name} <{email}>" if name and email else (email or name)
 
-    cleaned_message = SUGGESTION_BLOCK_RE.sub("", message).strip()
-    return cleaned_message, suggestions
+# The same From/To headers come back on every summary and poll, so parse each raw value once.
+@lru_cache(maxsize=512)
+def _parse_address(value: str) -> Tuple[str, str]:
+    name, email = parseaddr(value)
+    return (name or "").strip(), (email or "").strip()
+
+@lru_cache(maxsize=512)
+def _parse_address_list(value: str) -> Tuple[Tuple[str, str], ...]:
+    pairs = (((name or "").strip(), (email or "").strip()) for name, email in getaddresses([value]))
+    return tuple((name, email) for name, email in pairs if name or email)
 
 def _identity_from_header(value: Optional[str]) -> Dict[str, str]:
-    name, email = parseaddr(value or "")
-    name = (name or "").strip()
-    email = (email or "").strip()
-    if name and email:
-        display = f"{name} <{email}>"
-    elif email:
-        display = email
-    else:
-        display = name
-    return {"name": name, "email": email, "display": display or (value or "").strip()}
+    name, email = _parse_address(value or "")
+    return {"name": name, "email": email, "display": _format_display(name, email) or (value or "").strip()}
 
 def _identities_from_header(value: Optional[str]) -> List[Dict[str, str]]:
     if not value:
         return []
-    identities: List[Dict[str, str]] = []
-    for name, email in getaddresses([value]):
-        name = (name or "").strip()
-        email = (email or "").strip()
-        if not name and not email:
-            continue
-        if name and email:
-            display = f"{name} <{email}>"
-        elif email:
-            display = email
-        else:
-            display = name
-        identities.append({"name": name, "email": email, "display": display})
-    return identities
+    return [{"name": name, "email": email, "display": _format_display(name, email)} for name, email in _parse_address_list(value)]
 
 def _identity_from_graph(email_address: Optional[Dict[str, Any]]) -> Dict[str, str]:
     email_address = email_address or {}
     name = (email_address.get("name") or "").strip()
     email = (email_address.get("address") or "").strip()
-    if name and email:
-        display = f"{name} <{email}>"
-    elif email:
-        display = email
-    else:
-        display = name
-    return {"name": name, "email": email, "display": display}
+    return {"name": name, "email": email, "display": _format_display(name, email)}
 
 def _identities_from_graph(entries: Optional[List[Dict[str, Any]]]) -> List[Dict[str, str]]:
     identities: List[Dict[str, str]] = []
@@ -375,57 +495,47 @@ def _identities_from_graph(entries: Optional[List[Dict[str, Any]]]) -> List[Dict
     return identities
 
 def _join_identity_displays(identities: List[Dict[str, str]]) -> str:
-    parts: List[str] = []
-    for ident in identities:
-        name = ident.get("name", "").strip()
-        email = ident.get("email", "").strip()
-        display = ident.get("display", "").strip()
-        if name and email:
-            parts.append(f"{name} <{email}>")
-        elif email:
-            parts.append(email)
-        elif display:
-            parts.append(display)
-    return ", ".join(parts)
+    # Entries without an address fall back to their stored display text.
+    return ", ".join(filter(None, (
+        _format_display(i.get("name", "").strip(), email) if (email := i.get("email", "").strip()) else i.get("display", "").strip()
+        for i in identities
+    )))
+
+_MAIL_TOOL_STATUS = {
+    "search_emails": ("Searching your {mailbox} inbox{maybe_q}...", True),
+    "read_email": ("Opening that message...", False),
+    "summarize_email": ("Summarizing that message for you...", False),
+    "draft_new_email": ("Drafting that email...", False),
+    "draft_reply": ("Writing your reply...", False),
+    "send_draft": ("Sending that email...", False),
+    "delete_email": ("Deleting that email...", False),
+    "archive_email": ("Archiving that email...", False),
+    "mark_as_read": ("Marking that email as read...", False),
+    "mark_as_unread": ("Marking that email as unread...", False),
+    "mark_all_read": ("Clearing every unread email in your inbox...", False),
+}
+# tool name -> (status template, whether the template shows the query)
+_TOOL_STATUS: Dict[str, Tuple[str, bool]] = {
+    **{f"{provider}_{op}": entry for op, entry in _MAIL_TOOL_STATUS.items() for provider in ("gmail", "outlook")},
+    "calendar_list_events": ("Reviewing your upcoming {calendar_service} schedule...", False),
+    "calendar_quick_add": ("Scheduling that event...", False),
+    "calendar_create_event": ("Putting that event on your {calendar_service}...", False),
+    "calendar_update_event_time": ("Updating that event's timing...", False),
+    "calendar_delete_event": ("Removing that event from your {calendar_service}...", False),
+}
 
 def _tool_status_message(name: str, args: Dict[str, Any], service: str) -> Optional[str]:
-    name = name or ""
-    query = (args.get("query") or "").strip()
-    mailbox = "Gmail" if service == "google" else "Outlook"
-    calendar_service = "Google Calendar" if service == "google" else "Microsoft Calendar"
-    if name in {"gmail_search_emails", "outlook_search_emails"}:
-        return f"Searching your {mailbox} inbox{' for ' + query if query else ''}..."
-    if name in {"gmail_read_email", "outlook_read_email"}:
-        return "Opening that message..."
-    if name in {"gmail_summarize_email", "outlook_summarize_email"}:
-        return "Summarizing that message for you..."
-    if name in {"gmail_draft_new_email", "outlook_draft_new_email"}:
-        return "Drafting that email..."
-    if name in {"gmail_draft_reply", "outlook_draft_reply"}:
-        return "Writing your reply..."
-    if name in {"gmail_send_draft", "outlook_send_draft"}:
-        return "Sending that email..."
-    if name in {"gmail_delete_email", "outlook_delete_email"}:
-        return "Deleting that email..."
-    if name in {"gmail_archive_email", "outlook_archive_email"}:
-        return "Archiving that email..."
-    if name in {"gmail_mark_as_read", "outlook_mark_as_read"}:
-        return "Marking that email as read..."
-    if name in {"gmail_mark_as_unread", "outlook_mark_as_unread"}:
-        return "Marking that email as unread..."
-    if name in {"gmail_mark_all_read", "outlook_mark_all_read"}:
-        return "Clearing every unread email in your inbox..."
-    if name == "calendar_list_events":
-        return f"Reviewing your upcoming {calendar_service} schedule..."
-    if name == "calendar_quick_add":
-        return "Scheduling that event..."
-    if name == "calendar_create_event":
-        return f"Putting that event on your {calendar_service}..."
-    if name == "calendar_update_event_time":
-        return "Updating that event's timing..."
-    if name == "calendar_delete_event":
-        return f"Removing that event from your {calendar_service}..."
-    return None
+    entry = _TOOL_STATUS.get(name or "")
+    if not entry:
+        return None
+    template, needs_query = entry
+    query = (args.get("query") or "").strip() if needs_query else ""
+    is_google = service == "google"
+    return template.format(
+        mailbox="Gmail" if is_google else "Outlook",
+        calendar_service="Google Calendar" if is_google else "Microsoft Calendar",
+        maybe_q=f" for {query}" if query else "",
+    )
 
 # ======================= UI / HTML Page =======================
 
@@ -548,7 +658,7 @@ CONVERSATIONAL_HTML = """
 <audio id="audio-player" style="display:none;"></audio>
 <script>
 const AppState = { IDLE: 'IDLE', LISTENING: 'LISTENING', PROCESSING: 'PROCESSING', SPEAKING: 'SPEAKING' };
-let state = AppState.IDLE; let socket; let mediaRecorder; let audioChunks = [];
+let state = AppState.IDLE; let socket; let mediaRecorder;
 let audioContext, analyser, microphone, scriptProcessor;
 let isVADActive = false; let vadStream = null;
 const chatLog = document.getElementById('chat-log'); const chatContainer = document.getElementById('chat-container');
@@ -620,89 +730,40 @@ async function initAudio() {
     }
 }
 
+const HTML_ESCAPES = { '&': '&amp;', '<': '&lt;', '>': '&gt;', '"': '&quot;', "'": '&#39;' };
+function esc(value){ return String(value).replace(/[&<>"']/g, ch => HTML_ESCAPES[ch]); }
 function renderPeopleList(items){
   if (!peoplePanel || !peopleList) return;
-  peopleList.innerHTML = '';
   if (!items || !items.length) {
     peoplePanel.classList.add('hidden');
-    const empty = document.createElement('div');
-    empty.className = 'people-empty';
-    empty.textContent = 'No recent senders yet.';
-    peopleList.appendChild(empty);
+    peopleList.innerHTML = '<div class="people-empty">No recent senders yet.</div>';
     return;
   }
   peoplePanel.classList.remove('hidden');
-  items.slice(0, 12).forEach((person) => {
+  peopleList.innerHTML = items.slice(0, 12).map((person, i) => {
     const name = person && (person.name || person.display || person.email) || 'Unknown Sender';
     const email = person && person.email || '';
     const subject = person && person.subject || '';
     const received = person && person.received || '';
     const preview = person && person.preview || '';
     const service = person && person.service || '';
-
-    const card = document.createElement('button');
-    card.type = 'button';
-    card.className = 'person-card';
-    card.setAttribute('aria-expanded', 'false');
-    const nameSpan = document.createElement('span');
-    nameSpan.className = 'person-name';
-    nameSpan.textContent = name;
-    card.appendChild(nameSpan);
-    if (email) {
-      const emailSpan = document.createElement('span');
-      emailSpan.className = 'person-email';
-      emailSpan.textContent = email;
-      card.appendChild(emailSpan);
-    }
-    const details = document.createElement('div');
-    details.className = 'person-details';
-    if (subject) {
-      const subjectSpan = document.createElement('div');
-      subjectSpan.className = 'person-subject';
-      subjectSpan.textContent = subject;
-      details.appendChild(subjectSpan);
-    }
-    const meta = document.createElement('div');
-    meta.className = 'person-meta';
-    if (received) {
-      const receivedRow = document.createElement('div');
-      receivedRow.className = 'person-meta-line';
-      const strong = document.createElement('strong');
-      strong.textContent = 'Last message';
-      receivedRow.appendChild(strong);
-      receivedRow.appendChild(document.createTextNode(` ${received}`));
-      meta.appendChild(receivedRow);
-    }
-    if (service) {
-      const svcRow = document.createElement('div');
-      svcRow.className = 'person-meta-line';
-      const strong = document.createElement('strong');
-      strong.textContent = 'Account';
-      svcRow.appendChild(strong);
-      svcRow.appendChild(document.createTextNode(` ${service === 'google' ? 'Gmail' : 'Outlook'}`));
-      meta.appendChild(svcRow);
-    }
-    if (meta.children.length) {
-      details.appendChild(meta);
-    }
-    if (preview) {
-      const previewDiv = document.createElement('div');
-      previewDiv.className = 'person-preview';
-      previewDiv.textContent = preview;
-      details.appendChild(previewDiv);
-    }
-    card.appendChild(details);
-    const toggle = () => {
-      const expanded = !card.classList.contains('expanded');
-      card.classList.toggle('expanded', expanded);
-      card.setAttribute('aria-expanded', expanded ? 'true' : 'false');
-    };
-    card.addEventListener('click', (ev) => { ev.preventDefault(); toggle(); });
-    card.addEventListener('keydown', (ev) => {
-      if (ev.key === 'Enter' || ev.key === ' ') { ev.preventDefault(); toggle(); }
-    });
-    peopleList.appendChild(card);
-  });
+    let meta = '';
+    if (received) meta += `<div class="person-meta-line"><strong>Last message</strong> ${esc(received)}</div>`;
+    if (service) meta += `<div class="person-meta-line"><strong>Account</strong> ${service === 'google' ? 'Gmail' : 'Outlook'}</div>`;
+    return `<button type="button" class="person-card" data-idx="${i}" aria-expanded="false">`
+      + `<span class="person-name">${esc(name)}</span>`
+      + (email ? `<span class="person-email">${esc(email)}</span>` : '')
+      + '<div class="person-details">'
+      + (subject ? `<div class="person-subject">${esc(subject)}</div>` : '')
+      + (meta ? `<div class="person-meta">${meta}</div>` : '')
+      + (preview ? `<div class="person-preview">${esc(preview)}</div>` : '')
+      + '</div></button>';
+  }).join('');
+}
+function togglePersonCard(card){
+  const expanded = !card.classList.contains('expanded');
+  card.classList.toggle('expanded', expanded);
+  card.setAttribute('aria-expanded', expanded ? 'true' : 'false');
 }
 
 function renderSuggestions(items){
@@ -772,22 +833,52 @@ function updateContext(info) {
 function showDraft(to, subject, body){ const draftWrap = document.getElementById('draft-wrap'); draftWrap.innerHTML = `<div class="draft"><h3>Email draft (preview)</h3><div><strong>To:</strong> <span>${to || '(none)'}</span></div><div><strong>Subject:</strong> <span>${subject || '(none)'}</span></div><div style="margin-top:6px;"><strong>Body:</strong></div><pre>${body || ''}</pre><div class="actions"><button class="btn" onclick="sendDraft()">Send</button><button class="btn secondary" onclick="cancelDraft()">Cancel</button></div></div>`; draftWrap.style.display = 'block'; scrollToBottom(); }
 function hideDraft(){ document.getElementById('draft-wrap').style.display = 'none'; }
 function updateStatus(text){ statusText.textContent = text; }
-function stopCurrentAudio() { audioPlayer.pause(); audioPlayer.src = ''; }
+const FRAME_AUDIO = 0x01, FRAME_JSON = 0x02;
+const MIC_CONTINUE_HEADER = new Uint8Array([0x10]), MIC_END_HEADER = new Uint8Array([0x11]);
+let scheduledSources = []; let nextStartTime = 0; let playbackGen = 0; let audioStreamOpen = false;
+let decodeChain = Promise.resolve();
+function stopCurrentAudio() {
+  audioPlayer.pause(); audioPlayer.src = '';
+  playbackGen++; audioStreamOpen = false;
+  scheduledSources.forEach(src => { try { src.stop(); } catch (e) {} });
+  scheduledSources = []; nextStartTime = 0;
+}
+function finishStreamedAudioIfDone() {
+  if (!audioStreamOpen && !scheduledSources.length && state === AppState.SPEAKING) setAppState(AppState.IDLE);
+}
+function enqueueAudioChunk(buf) {
+  // Decode in arrival order and schedule back-to-back on one AudioContext for gapless playback.
+  const gen = playbackGen;
+  decodeChain = decodeChain.then(async () => {
+    const audioBuf = await audioContext.decodeAudioData(buf);
+    if (gen !== playbackGen) return;
+    const src = audioContext.createBufferSource();
+    src.buffer = audioBuf; src.connect(audioContext.destination);
+    const startAt = Math.max(audioContext.currentTime, nextStartTime);
+    src.start(startAt); nextStartTime = startAt + audioBuf.duration;
+    scheduledSources.push(src);
+    src.onended = () => { scheduledSources = scheduledSources.filter(s => s !== src); finishStreamedAudioIfDone(); };
+  }).catch(e => console.error('Audio decode failed:', e));
+}
 function startRecording() {
   if (!vadStream) return;
   try {
     stopCurrentAudio();
     const mimeType = MediaRecorder.isTypeSupported('audio/webm; codecs=opus') ? 'audio/webm; codecs=opus' : 'audio/webm';
-    mediaRecorder = new MediaRecorder(vadStream, { mimeType }); audioChunks = [];
-    mediaRecorder.ondataavailable = e => { if (e.data && e.data.size > 0) audioChunks.push(e.data); };
+    mediaRecorder = new MediaRecorder(vadStream, { mimeType }); let chunksSent = 0;
+    // Each 200ms slice goes straight to the server, which relays it to Whisper while we keep recording.
+    mediaRecorder.ondataavailable = e => {
+      if (e.data && e.data.size > 0 && socket && socket.readyState === WebSocket.OPEN) {
+        socket.send(new Blob([MIC_CONTINUE_HEADER, e.data])); chunksSent++;
+      }
+    };
     mediaRecorder.onstop = () => {
-      if (socket && socket.readyState === WebSocket.OPEN && audioChunks.length > 0) {
-        const audioBlob = new Blob(audioChunks, { type: mimeType });
-        socket.send(audioBlob);
+      if (socket && socket.readyState === WebSocket.OPEN && chunksSent > 0) {
+        socket.send(MIC_END_HEADER);
         setAppState(AppState.PROCESSING);
       } else { setAppState(AppState.IDLE); }
     };
-    mediaRecorder.start(); setAppState(AppState.LISTENING);
+    mediaRecorder.start(200); setAppState(AppState.LISTENING);
   } catch (e) { console.error('Mic error', e); updateStatus('Microphone access denied.'); setAppState(AppState.IDLE); }
 }
 function stopRecording() { if (mediaRecorder && mediaRecorder.state === 'recording') { mediaRecorder.stop(); } }
@@ -801,11 +892,23 @@ function sendManualMessage(textOverride){
   setAppState(AppState.PROCESSING);
   socket.send(JSON.stringify({ action: 'manual_message', text }));
 }
+const STATUS_CACHE_KEY = 'api-status', STATUS_CACHE_TTL_MS = 10000;
+async function fetchStatus(){
+  let cached = null;
+  try { cached = JSON.parse(sessionStorage.getItem(STATUS_CACHE_KEY)); } catch (e) {}
+  const headers = {};
+  if (cached && Date.now() - cached.ts < STATUS_CACHE_TTL_MS) headers['If-None-Match'] = cached.etag;
+  const r = await fetch('/api/status', { headers, cache: 'no-store' });
+  if (r.status === 304 && cached) return cached.body;
+  const body = await r.json();
+  const etag = r.headers.get('ETag');
+  if (etag) { try { sessionStorage.setItem(STATUS_CACHE_KEY, JSON.stringify({ etag, body, ts: Date.now() })); } catch (e) {} }
+  return body;
+}
 async function checkAuth(){
   let payload;
   try {
-    const r = await fetch('/api/status');
-    payload = await r.json();
+    payload = await fetchStatus();
   } catch (err) {
     console.error('Status check failed:', err);
     if (authMsg) authMsg.textContent = 'Unable to reach the assistant. Refresh to try again.';
@@ -849,25 +952,43 @@ function connectWebSocket(){
   return new Promise((resolve, reject) => {
     updateStatus('Connecting to assistant...');
     const proto = window.location.protocol === 'https:' ? 'wss:' : 'ws:';
-    socket = new WebSocket(`${proto}//${window.location.host}/ws`);
+    const binaryAudio = audioContext ? '?binary_audio=1' : '';
+    socket = new WebSocket(`${proto}//${window.location.host}/ws${binaryAudio}`);
+    socket.binaryType = 'arraybuffer';
     socket.onopen = () => { appendChat('system', 'Connection established. Assistant is starting...'); renderSuggestions([]); renderPeopleList([]); setAppState(state); resolve(); };
     socket.onclose = () => { updateStatus('Session ended.'); renderSuggestions([]); renderPeopleList([]); setAppState(AppState.IDLE); };
     socket.onerror = (err) => { console.error('WebSocket Error:', err); updateStatus('Connection error. Please refresh.'); setAppState(AppState.IDLE); reject(err); };
     socket.onmessage = (event) => {
-      let msg; try { msg = JSON.parse(event.data); } catch { return; }
-      switch (msg.type) {
-        case 'play_audio': stopCurrentAudio(); updateStatus(msg.status_text); setAppState(AppState.SPEAKING); audioPlayer.src = msg.url; audioPlayer.play().catch(e => { console.error("Audio play failed:", e); setAppState(AppState.IDLE); }); break;
-        case 'update_status': updateStatus(msg.text); break;
-        case 'chat_append': appendChat(msg.role, msg.text); break;
-        case 'context_update': updateContext(msg.context); break;
-        case 'draft_preview': showDraft(msg.to, msg.subject, msg.body); break;
-        case 'draft_clear': hideDraft(); break;
-        case 'suggestions': renderSuggestions(msg.items || []); break;
-        case 'people_list': renderPeopleList(msg.people || []); break;
+      if (event.data instanceof ArrayBuffer) {
+        const tag = new DataView(event.data).getUint32(0, true);
+        const body = event.data.slice(4);
+        if (tag === FRAME_AUDIO) { enqueueAudioChunk(body); }
+        else if (tag === FRAME_JSON) { dispatchJson(jsonDecoder.decode(body)); }
+        return;
       }
+      dispatchJson(event.data);
     };
   });
 }
+const jsonDecoder = new TextDecoder();
+function dispatchJson(text){
+  let msg; try { msg = JSON.parse(text); } catch (e) { return; }
+  if (Array.isArray(msg)) { msg.forEach(handleMessage); } else { handleMessage(msg); }
+}
+function handleMessage(msg){
+  switch (msg.type) {
+    case 'audio_start': stopCurrentAudio(); audioStreamOpen = true; updateStatus(msg.status_text); setAppState(AppState.SPEAKING); break;
+    case 'audio_end': audioStreamOpen = false; decodeChain.then(finishStreamedAudioIfDone); break;
+    case 'play_audio': stopCurrentAudio(); updateStatus(msg.status_text); setAppState(AppState.SPEAKING); audioPlayer.src = msg.url; audioPlayer.play().catch(e => { console.error("Audio play failed:", e); setAppState(AppState.IDLE); }); break;
+    case 'update_status': updateStatus(msg.text); break;
+    case 'chat_append': appendChat(msg.role, msg.text); break;
+    case 'context_update': updateContext(msg.context); break;
+    case 'draft_preview': showDraft(msg.to, msg.subject, msg.body); break;
+    case 'draft_clear': hideDraft(); break;
+    case 'suggestions': renderSuggestions(msg.items || []); break;
+    case 'people_list': renderPeopleList(msg.people || []); break;
+  }
+}
 function sendDraft(){ if(!socket || socket.readyState !== WebSocket.OPEN) return; socket.send(JSON.stringify({ action: 'send_draft' })); }
 function cancelDraft(){ if(!socket || socket.readyState !== WebSocket.OPEN) return; socket.send(JSON.stringify({ action: 'cancel_draft' })); }
 audioPlayer.onended = () => { if (state === AppState.SPEAKING) { setAppState(AppState.IDLE); } };
@@ -876,24 +997,168 @@ if (textInput) {
     if (ev.key === 'Enter' && !ev.shiftKey) { ev.preventDefault(); sendManualMessage(); }
   });
 }
+if (peopleList) {
+  peopleList.addEventListener('click', (ev) => {
+    const card = ev.target.closest('.person-card');
+    if (card) { ev.preventDefault(); togglePersonCard(card); }
+  });
+  peopleList.addEventListener('keydown', (ev) => {
+    const card = ev.target.closest('.person-card');
+    if (card && (ev.key === 'Enter' || ev.key === ' ')) { ev.preventDefault(); togglePersonCard(card); }
+  });
+}
 renderPeopleList([]);
 renderSuggestions([]);
 setAppState(AppState.IDLE);
 checkAuth();
 </script>
-"""</body></html>
+</body></html>
 """
 
+# The page is static: minify and compress it once. Only indentation, blank lines and
+# whole-line // comments are dropped; the script has no multi-line template literals.
+_HTML_BYTES = "\n".join(
+    line for line in (raw.strip() for raw in CONVERSATIONAL_HTML.splitlines()) if line and not line.startswith("//")
+).encode()
+_HTML_GZ = gzip.compress(_HTML_BYTES, 9)
+_HTML_BR = brotli.compress(_HTML_BYTES, quality=11) if brotli else None
+_HTML_ETAG = f'"{hashlib.blake2b(_HTML_BYTES, digest_size=8).hexdigest()}"'
+
 # ======================= OpenAI & API Helpers =======================
 
-async def tts_any(text: str) -> str:
-    payload = {"model": "tts-1", "voice": REALTIME_VOICE, "input": text, "response_format": "mp3"}
-    headers = {"Authorization": f"Bearer {OPENAI_API_KEY}"}
-    r = await _client().post(f"{OPENAI_BASE_URL.rstrip('/')}/v1/audio/speech", json=payload, headers=headers)
+# Binary WebSocket frames carry a 4-byte little-endian type tag before the payload.
+FRAME_AUDIO = 0x01
+FRAME_JSON = 0x02
+_AUDIO_FRAME_TAG = struct.pack("<I", FRAME_AUDIO)
+_JSON_FRAME_TAG = struct.pack("<I", FRAME_JSON)
+# Inbound mic chunks carry a 1-byte header: more audio follows, or this is the last chunk.
+MIC_CONTINUE = 0x10
+MIC_END = 0x11
+_SENTENCE_END_RE = re.compile(r"(?<=[.!?])\s+")
+
+def _tts_chunks(text: str, min_chars: int = 60) -> List[str]:
+    # Sentence-sized pieces so the first one can play while the rest are synthesized.
+    chunks: List[str] = []
+    current = ""
+    for sentence in _SENTENCE_END_RE.split(text.strip()):
+        current = f"{current} {sentence}".strip() if current else sentence
+        if len(current) >= min_chars:
+            chunks.append(current)
+            current = ""
+    if current:
+        chunks.append(current)
+    return chunks or [text]
+
+# Short stock phrases ("Done.", "Sorry, I didn't catch that.") recur constantly; keep their audio.
+# Process-wide, so it is bounded by total bytes as well as entries, and only short texts go in.
+_TTS_CACHE: "OrderedDict[Tuple[str, str], bytes]" = OrderedDict()
+_TTS_CACHE_MAX = 256
+_TTS_CACHE_MAX_BYTES = int(os.getenv("TTS_CACHE_MAX_BYTES", str(4 * 1024 * 1024)))
+_TTS_CACHE_MAX_TEXT = 120
+_tts_cache_bytes = 0
+
+def _tts_request(text: str) -> Dict[str, Any]:
+    return {
+        "url": f"{OPENAI_BASE_URL.rstrip('/')}/v1/audio/speech",
+        "json": {"model": "tts-1", "voice": REALTIME_VOICE, "input": text, "response_format": "mp3"},
+        "headers": {"Authorization": f"Bearer {OPENAI_API_KEY}"},
+    }
+
+def _tts_cache_get(text: str) -> Optional[bytes]:
+    key = (REALTIME_VOICE, text)
+    cached = _TTS_CACHE.get(key)
+    if cached is not None:
+        _TTS_CACHE.move_to_end(key)
+    return cached
+
+def _tts_cache_put(text: str, audio: bytes) -> None:
+    global _tts_cache_bytes
+    if len(text) > _TTS_CACHE_MAX_TEXT or len(audio) > _TTS_CACHE_MAX_BYTES:
+        return
+    key = (REALTIME_VOICE, text)
+    old = _TTS_CACHE.pop(key, None)
+    if old is not None:
+        _tts_cache_bytes -= len(old)
+    _TTS_CACHE[key] = audio
+    _tts_cache_bytes += len(audio)
+    while len(_TTS_CACHE) > _TTS_CACHE_MAX or _tts_cache_bytes > _TTS_CACHE_MAX_BYTES:
+        _tts_cache_bytes -= len(_TTS_CACHE.popitem(last=False)[1])
+
+async def tts_bytes(text: str) -> bytes:
+    cached = _tts_cache_get(text)
+    if cached is not None:
+        return cached
+    r = await _client().post(**_tts_request(text))
     if r.status_code >= 400:
         logging.error("OpenAI TTS error %s: %s", r.status_code, r.text)
     r.raise_for_status()
-    audio_id = _store_audio_bytes(r.content)
+    _tts_cache_put(text, r.content)
+    return r.content
+
+class SpeechStream:
+    """TTS audio that is still arriving from OpenAI.
+
+    The /audio route can start answering as soon as the first bytes land: every reader replays
+    what has been buffered so far and then follows along until generation finishes.
+    """
+
+    def __init__(self, text: str):
+        self.buf = bytearray()
+        self.done = False
+        self.error: Optional[BaseException] = None
+        self._changed = asyncio.Event()
+        self._done_callbacks: List[Any] = []
+        self._task = asyncio.create_task(self._run(text))
+
+    def __len__(self) -> int:
+        return len(self.buf)
+
+    def _wake(self) -> None:
+        self._changed.set()
+        self._changed = asyncio.Event()
+
+    def on_done(self, callback: Any) -> None:
+        self._done_callbacks.append(callback)
+
+    async def _run(self, text: str) -> None:
+        try:
+            async with _client().stream("POST", **_tts_request(text)) as r:
+                if r.status_code >= 400:
+                    await r.aread()
+                    logging.error("OpenAI TTS error %s: %s", r.status_code, r.text)
+                r.raise_for_status()
+                async for chunk in r.aiter_bytes():
+                    self.buf += chunk
+                    self._wake()
+            _tts_cache_put(text, bytes(self.buf))
+        except Exception as e:
+            self.error = e
+        finally:
+            self.done = True
+            self._wake()
+            for callback in self._done_callbacks:
+                callback()
+            self._done_callbacks.clear()
+
+    async def iter_bytes(self):
+        pos = 0
+        while True:
+            if pos < len(self.buf):
+                chunk = bytes(self.buf[pos:])
+                pos += len(chunk)
+                yield chunk
+            elif self.done:
+                if self.error is not None:
+                    # Abort the response so the player sees a failure, not a clean short file.
+                    raise RuntimeError("speech generation failed") from self.error
+                return
+            else:
+                await self._changed.wait()
+
+async def tts_any(text: str) -> str:
+    # Hand out the URL right away; generation continues while the browser starts fetching.
+    cached = _tts_cache_get(text)
+    audio_id = _store_audio_bytes(cached if cached is not None else SpeechStream(text))
     return f"/audio/{audio_id}"
 
 async def transcribe_bytes(audio_bytes: bytes) -> str:
@@ -902,56 +1167,186 @@ async def transcribe_bytes(audio_bytes: bytes) -> str:
     headers = {"Authorization": f"Bearer {OPENAI_API_KEY}"}
     r = await _client().post(f"{OPENAI_BASE_URL.rstrip('/')}/v1/audio/transcriptions", data=data, files=files, headers=headers)
     r.raise_for_status()
-    return r.json().get("text", "").strip()
+    return orjson.loads(r.content).get("text", "").strip()
+
+async def _multipart_from_queue(queue: "asyncio.Queue[Optional[bytes]]", boundary: str):
+    yield (
+        f"--{boundary}\r\nContent-Disposition: form-data; name=\"model\"\r\n\r\nwhisper-1\r\n"
+        f"--{boundary}\r\nContent-Disposition: form-data; name=\"file\"; filename=\"speech.webm\"\r\n"
+        "Content-Type: audio/webm\r\n\r\n"
+    ).encode()
+    while (chunk := await queue.get()) is not None:
+        yield chunk
+    yield f"\r\n--{boundary}--\r\n".encode()
+
+async def transcribe_stream(queue: "asyncio.Queue[Optional[bytes]]") -> str:
+    # Uploads mic chunks as they arrive; a None on the queue closes the request body.
+    boundary = uuid.uuid4().hex
+    headers = {"Authorization": f"Bearer {OPENAI_API_KEY}", "Content-Type": f"multipart/form-data; boundary={boundary}"}
+    r = await _client().post(
+        f"{OPENAI_BASE_URL.rstrip('/')}/v1/audio/transcriptions",
+        content=_multipart_from_queue(queue, boundary),
+        headers=headers,
+    )
+    r.raise_for_status()
+    return orjson.loads(r.content).get("text", "").strip()
+
+_RE_TZ = re.compile(r"[+-]\d{2}:\d{2}$")
+_RE_DT_SPACE = re.compile(r"^\d{4}-\d{2}-\d{2} \d{2}:\d{2}$")
+_RE_DT_T = re.compile(r"^\d{4}-\d{2}-\d{2}T\d{2}:\d{2}(:\d{2})?$")
+_RE_DATE = re.compile(r"^\d{4}-\d{2}-\d{2}$")
 
+@lru_cache(maxsize=1024)
 def _parse_rfc3339(dt_str: str) -> str:
     try:
-        if re.search(r"[+-]\d{2}:\d{2}$", dt_str) or dt_str.endswith("Z"):
+        # Most model output already carries an offset or "Z"; check by index before any regex.
+        if dt_str.endswith("Z") or (len(dt_str) >= 6 and dt_str[-6] in "+-" and dt_str[-3] == ":" and _RE_TZ.search(dt_str)):
             return dt_str
-        if re.match(r"^\d{4}-\d{2}-\d{2} \d{2}:\d{2}$", dt_str):
-            return datetime.datetime.strptime(dt_str, "%Y-%m-%d %H:%M").isoformat()
-        if re.match(r"^\d{4}-\d{2}-\d{2}T\d{2}:\d{2}(:\d{2})?$", dt_str):
+        # The patterns fix every digit position, so the ISO form is a plain splice.
+        if _RE_DT_SPACE.match(dt_str):
+            return f"{dt_str[:10]}T{dt_str[11:]}:00"
+        if _RE_DT_T.match(dt_str):
             return dt_str if len(dt_str) > 16 else dt_str + ":00"
-        if re.match(r"^\d{4}-\d{2}-\d{2}$", dt_str):
-            return datetime.datetime.strptime(dt_str, "%Y-%m-%d").isoformat()
+        if _RE_DATE.match(dt_str):
+            return dt_str + "T00:00:00"
     except Exception:
         pass
     return dt_str
 
+_ZULU_FMT = "%Y-%m-%dT%H:%M:%SZ"
+
+def _as_zulu(dt_str: str) -> str:
+    # Google needs an explicit offset; naive times are taken as UTC, anything zoned passes through.
+    if dt_str.endswith("Z") or _RE_TZ.search(dt_str):
+        return dt_str
+    return dt_str + "Z"
+
+def _start_of_yesterday_utc() -> datetime.datetime:
+    now_utc = datetime.datetime.now(timezone.utc)
+    return (now_utc - datetime.timedelta(days=1)).replace(hour=0, minute=0, second=0, microsecond=0)
+
+def _today_bounds() -> Tuple[str, str]:
+    now = datetime.datetime.now().astimezone()
+    start_of_day = now.replace(hour=0, minute=0, second=0, microsecond=0)
+    end_of_day = now.replace(hour=23, minute=59, second=59, microsecond=999999)
+    return start_of_day.isoformat(), end_of_day.isoformat()
+
+def _outlook_unread_params(since: datetime.datetime) -> Dict[str, Any]:
+    return {
+        "$filter": f"isRead eq false and receivedDateTime ge {since.isoformat().replace('+00:00', 'Z')}",
+        "$top": 5,
+        "$select": "id,subject,from,receivedDateTime,bodyPreview"
+    }
+
+def _calendar_view_params(start_dt: str, end_dt: str, max_results: int, query: Optional[str] = None) -> Dict[str, Any]:
+    params = {"startDateTime": start_dt, "endDateTime": end_dt, "$top": max_results, "$orderby": "start/dateTime"}
+    if query:
+        params["$filter"] = f"contains(subject,'{query}')"
+    return params
+
+def _outlook_event_rows(items: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    return [{
+        "id": ev.get('id'),
+        "summary": ev.get('subject', '(No title)'),
+        "start": (ev.get('start') or {}).get('dateTime'),
+        "end": (ev.get('end') or {}).get('dateTime'),
+        "location": (ev.get('location') or {}).get('displayName', '')
+    } for ev in items]
+
+def _graph_url(path: str, params: Dict[str, Any]) -> str:
+    # $batch takes relative URLs with the query inline; keep OData's $ and quotes readable.
+    return path + "?" + urlencode(params, quote_via=quote, safe="$'(),:/")
+
 # Recipient sanitizer
 def _split_recipients(to: str) -> list:
-    # Split by comma, trim, drop empties and dups, preserve order
-    seen = set()
-    result = []
-    for addr in [p.strip() for p in to.split(",")]:
-        if addr and addr.lower() not in seen:
-            seen.add(addr.lower())
-            result.append(addr)
-    return result
+    # Split by comma, trim, drop empties and dups (first spelling wins), preserve order
+    unique: Dict[str, str] = {}
+    for addr in to.split(","):
+        addr = addr.strip()
+        if addr:
+            unique.setdefault(addr.lower(), addr)
+    return list(unique.values())
+
+# Plain-text RFC 5322 assembly without the email.generator policy machinery
+def _header_text(value: str, name: str = "") -> str:
+    value = " ".join((value or "").split())  # no CR/LF can reach the header block
+    if value.isascii() and len(name) + 2 + len(value) <= 78:
+        return value
+    # Fold with CRLF (email.header defaults to a bare LF) so long References chains stay under
+    # the 998-octet line limit; non-ASCII text is RFC 2047-encoded on the way.
+    charset = "us-ascii" if value.isascii() else "utf-8"
+    return MIMEHeader(value, charset, header_name=name).encode(linesep="\r\n")
+
+def _header_addresses(value: str) -> str:
+    # formataddr RFC 2047-encodes non-ASCII display names and leaves the address untouched.
+    return ", ".join(formataddr((name, email), charset="utf-8") for name, email in getaddresses([" ".join((value or "").split())]))
+
+def _build_rfc822(to: str, subject: str, body: str, from_addr: str, extra_headers: Optional[Dict[str, str]] = None) -> bytes:
+    lines = body.splitlines() or [""]
+    if body.isascii() and all(len(line) <= 998 for line in lines):
+        cte, payload = "7bit", "\r\n".join(lines)
+    else:
+        cte, payload = "base64", base64.encodebytes(body.encode("utf-8")).decode("ascii").replace("\n", "\r\n")
+    head = [f"To: {_header_addresses(to)}", f"From: {_header_addresses(from_addr)}", f"Subject: {_header_text(subject, 'Subject')}"]
+    head.extend(f"{name}: {_header_text(value, name)}" for name, value in (extra_headers or {}).items())
+    head += ["MIME-Version: 1.0", 'Content-Type: text/plain; charset="utf-8"', f"Content-Transfer-Encoding: {cte}"]
+    return ("\r\n".join(head) + "\r\n\r\n" + payload + "\r\n").encode("ascii")
 
 # --- Google Helpers ---
+def _google_connected(creds: Any) -> bool:
+    # Expired credentials still count when they can be refreshed.
+    return isinstance(creds, Credentials) and (creds.valid or bool(creds.refresh_token))
+
 def _require_google_creds() -> Credentials:
     creds = _get_google_creds()
-    if not creds or not creds.valid:
+    if not _google_connected(creds):
         raise RuntimeError("Google not connected.")
     return creds
 
-def _gmail_service() -> Any:
-    return build("gmail", "v1", credentials=_require_google_creds(), cache_discovery=False)
+# Discovery documents ship with google-api-python-client; parse them once instead of per build().
+_DISCOVERY_DOCS: Dict[Tuple[str, str], Dict[str, Any]] = {
+    api: json.loads(get_static_doc(*api)) for api in (("calendar", "v3"),)
+}
+
+def _google_service(name: str, version: str) -> Any:
+    # Built services are reused for as long as the session holds the same Credentials object.
+    # Refreshes mutate that object in place, so they don't need a rebuild; reconnecting swaps it.
+    creds = _require_google_creds()
+    services: Dict[Tuple[str, str], Tuple[Credentials, Any]] = _get_session_state().setdefault("google_services", {})
+    cached = services.get((name, version))
+    if cached and cached[0] is creds:
+        return cached[1]
+    service = build_from_document(_DISCOVERY_DOCS[(name, version)], credentials=creds)
+    services[(name, version)] = (creds, service)
+    return service
+
+# googleapiclient blocks, and its httplib2 transport is not thread-safe: requests run on a
+# dedicated pool where every worker thread keeps its own authorized transport per credential.
+_GAPI_POOL = ThreadPoolExecutor(max_workers=16, thread_name_prefix="gapi")
+_GAPI_PER_SESSION = 4
+_gapi_local = threading.local()
+
+def _execute_in_worker(request: Any, creds: Credentials) -> Any:
+    transports: Dict[int, AuthorizedHttp] = _gapi_local.__dict__.setdefault("transports", {})
+    http = transports.get(id(creds))
+    if http is None or http.credentials is not creds:
+        if len(transports) >= 32:
+            transports.clear()
+        http = transports[id(creds)] = AuthorizedHttp(creds, http=httplib2.Http(timeout=60))
+    return request.execute(http=http)
 
 def _calendar_service() -> Any:
-    return build("calendar", "v3", credentials=_require_google_creds(), cache_discovery=False)
+    return _google_service("calendar", "v3")
 
 def _get_email_body(msg: Dict) -> str:
-    body_data = ""
-    if 'parts' in msg.get('payload', {}):
-        for part in msg['payload']['parts']:
-            if part.get('mimeType') == 'text/plain' and 'data' in part.get('body', {}):
-                body_data = base64.urlsafe_b64decode(part['body']['data']).decode('utf-8', errors='ignore')
-                break
-    if not body_data and 'data' in msg.get('payload', {}).get('body', {}):
-        body_data = base64.urlsafe_b64decode(msg['payload']['body']['data']).decode('utf-8', errors='ignore')
-    return body_data
+    payload = msg.get('payload') or {}
+    for part in payload.get('parts') or ():
+        if part.get('mimeType') == 'text/plain':
+            data = (part.get('body') or {}).get('data')
+            if data:
+                return base64.urlsafe_b64decode(data).decode('utf-8', errors='ignore')
+    data = (payload.get('body') or {}).get('data')
+    return base64.urlsafe_b64decode(data).decode('utf-8', errors='ignore') if data else ""
 
 # --- Microsoft Helpers ---
 def _get_msal_app():
@@ -961,35 +1356,99 @@ def _get_msal_app():
         MS_CLIENT_ID, authority=MS_AUTHORITY, client_credential=MS_CLIENT_SECRET
     )
 
-def _require_ms_token() -> str:
-    token = _get_ms_token()
-    if not token:
-        raise RuntimeError("Microsoft not connected.")
-    # Refresh if nearly expired (simple heuristic)
-    refresh_needed = False
-    refresh_token = token.get("refresh_token")
-    if refresh_token:
-        expires_on = token.get("expires_on") or token.get("expires_at")
-        if expires_on:
-            try:
-                expires_on_ts = int(expires_on)
-                if expires_on_ts - int(time.time()) < 60:
-                    refresh_needed = True
-            except ValueError:
-                refresh_needed = False
-        if not refresh_needed:
-            expires_in = token.get("expires_in")
-            if isinstance(expires_in, (int, float)) and expires_in < 60:
-                refresh_needed = True
-    if refresh_needed:
-        new_token = _get_msal_app().acquire_token_by_refresh_token(
-            refresh_token, scopes=MS_SCOPES
-        )
-        if "error" in new_token:
-            raise RuntimeError("Could not refresh token.")
-        _set_ms_token(new_token)
-        token = new_token
-    return token["access_token"]
+# --- OAuth Token Cache ---
+class AsyncTokenCache:
+    """Serves a session's OAuth token without paying refresh latency on the request path.
+
+    Fresh tokens are returned as-is. Inside the last 5% of their lifetime they are "stale": the
+    current token is returned and a single background refresh is started. Expired tokens are
+    refreshed inline. The sync Google/MSAL refresh calls run in a worker thread.
+    """
+
+    STALE_FRACTION = 0.05
+    DEFAULT_LIFETIME = 3600
+
+    def __init__(self, provider: str):
+        self.provider = provider
+        self._lock = asyncio.Lock()
+        self._background: Optional[asyncio.Task] = None
+
+    def _expiry(self) -> Tuple[Optional[float], float]:
+        if self.provider == "google":
+            creds = _get_google_creds()
+            if not creds or not creds.expiry:
+                return None, self.DEFAULT_LIFETIME
+            return creds.expiry.replace(tzinfo=timezone.utc).timestamp(), self.DEFAULT_LIFETIME
+        token = _get_ms_token() or {}
+        expires_at = token.get("expires_at") or token.get("expires_on")
+        try:
+            lifetime = float(token.get("expires_in") or self.DEFAULT_LIFETIME)
+            return (float(expires_at) if expires_at else None), lifetime
+        except (TypeError, ValueError):
+            return None, self.DEFAULT_LIFETIME
+
+    def _is_fresh(self) -> bool:
+        expires_at, lifetime = self._expiry()
+        return expires_at is None or time.time() < expires_at - lifetime * self.STALE_FRACTION
+
+    def _current(self) -> Any:
+        if self.provider == "google":
+            return _require_google_creds()
+        token = _get_ms_token()
+        if not token or not token.get("access_token"):
+            raise RuntimeError("Microsoft not connected.")
+        return token["access_token"]
+
+    async def get(self) -> Any:
+        current = self._current()
+        if self._is_fresh():
+            return current
+        expires_at, _ = self._expiry()
+        if expires_at is not None and time.time() < expires_at:
+            if not self._background or self._background.done():
+                self._background = asyncio.create_task(self._refresh_in_background())
+            return current
+        await self._refresh()
+        return self._current()
+
+    async def _refresh_in_background(self) -> None:
+        try:
+            await self._refresh()
+        except Exception as e:
+            logging.warning("Background %s token refresh failed: %s", self.provider, e)
+
+    async def _refresh(self) -> None:
+        async with self._lock:
+            if self._is_fresh():
+                return  # another caller refreshed while we waited
+            if self.provider == "google":
+                creds = _require_google_creds()
+                if not creds.refresh_token:
+                    raise RuntimeError("Google not connected.")
+                await asyncio.to_thread(creds.refresh, GoogleAuthRequest())
+                _set_google_creds(creds)
+                return
+            token = _get_ms_token() or {}
+            refresh_token = token.get("refresh_token")
+            if not refresh_token:
+                raise RuntimeError("Microsoft not connected.")
+            new_token = await asyncio.to_thread(
+                _get_msal_app().acquire_token_by_refresh_token, refresh_token, scopes=MS_SCOPES
+            )
+            if "error" in new_token:
+                raise RuntimeError("Could not refresh token.")
+            new_token.setdefault("refresh_token", refresh_token)
+            _set_ms_token(new_token)
+
+def _token_cache(provider: str) -> AsyncTokenCache:
+    caches: Dict[str, AsyncTokenCache] = _get_session_state().setdefault("token_caches", {})
+    cache = caches.get(provider)
+    if cache is None:
+        cache = caches[provider] = AsyncTokenCache(provider)
+    return cache
+
+async def _require_ms_token() -> str:
+    return await _token_cache("microsoft").get()
 
 async def graph_request(
     method: str,
@@ -997,7 +1456,7 @@ async def graph_request(
     headers: Optional[Dict[str, str]] = None,
     **kwargs
 ) -> httpx.Response:
-    token = _require_ms_token()
+    token = await _require_ms_token()
     base_headers = {
         "Authorization": f"Bearer {token}",
         "Content-Type": "application/json",
@@ -1005,6 +1464,8 @@ async def graph_request(
     }
     if headers:
         base_headers.update(headers)
+    if "json" in kwargs:
+        kwargs["content"] = orjson.dumps(kwargs.pop("json"))
     url = f"{GRAPH_API_ENDPOINT}{endpoint}"
     r = await _client().request(method, url, headers=base_headers, **kwargs)
     try:
@@ -1014,12 +1475,219 @@ async def graph_request(
         raise RuntimeError(f"Graph error {r.status_code}: {detail}") from e
     return r
 
+_GRAPH_BATCH_MAX = 20
+
+async def graph_batch(requests: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    """Runs up to _GRAPH_BATCH_MAX Graph requests in one $batch round trip; returns each response keyed by its id."""
+    r = await graph_request("POST", "/$batch", json={"requests": requests})
+    return {resp.get("id"): resp for resp in orjson.loads(r.content).get("responses", [])}
+
+_GRAPH_BATCH_RETRIES = 3
+
+def _batch_retry_after(resp: Dict[str, Any]) -> float:
+    headers = {k.lower(): v for k, v in (resp.get("headers") or {}).items()}
+    try:
+        return min(max(float(headers.get("retry-after", 1)), 0.0), 30.0)
+    except (TypeError, ValueError):
+        return 1.0
+
+async def graph_batch_retrying(requests: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    """graph_batch that re-sends the items Graph throttled (429/503) once their Retry-After has passed."""
+    responses = await graph_batch(requests)
+    for _ in range(_GRAPH_BATCH_RETRIES):
+        throttled = [req for req in requests if (responses.get(req["id"]) or {}).get("status") in (429, 503)]
+        if not throttled:
+            break
+        await asyncio.sleep(max(_batch_retry_after(responses[req["id"]]) for req in throttled))
+        responses.update(await graph_batch(throttled))
+    return responses
+
+def _graph_batch_body(resp: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    if not resp or resp.get("status", 500) >= 400:
+        status = resp.get("status") if resp else "missing"
+        raise RuntimeError(f"Graph error {status}: {(resp or {}).get('body')}")
+    return resp.get("body") or {}
+
+async def gmail_request(method: str, path: str, params: Optional[Dict[str, Any]] = None, json: Any = None) -> Dict[str, Any]:
+    # Gmail goes over plain REST on the shared HTTP/2 client, so concurrent calls multiplex on
+    # one connection instead of each taking a worker thread and its own httplib2 transport.
+    creds = await _token_cache("google").get()
+    headers = {"Authorization": f"Bearer {creds.token}"}
+    content = None
+    if json is not None:
+        headers["Content-Type"] = "application/json"
+        content = orjson.dumps(json)
+    r = await _client().request(method, f"{GMAIL_API_ENDPOINT}{path}", headers=headers, params=params, content=content)
+    try:
+        r.raise_for_status()
+    except httpx.HTTPStatusError as e:
+        raise RuntimeError(f"Gmail error {r.status_code}: {r.text}") from e
+    return orjson.loads(r.content) if r.content else {}
+
+async def _gmail_get(path: str, params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    return await gmail_request("GET", path, params=params)
+
+class BatchedWS:
+    """Coalesces JSON messages sent within a few milliseconds into one text frame.
+
+    A frame holding several messages is a JSON array; a lone message is sent as-is. Binary
+    sends and explicit flush() calls push out anything buffered first, so ordering holds.
+    With binary=True the JSON goes out as a FRAME_JSON-tagged binary frame, skipping the
+    bytes -> str decode a text frame needs.
+    """
+
+    FLUSH_DELAY = 0.008
+
+    def __init__(self, ws: WebSocket, binary: bool = False):
+        self.ws = ws
+        self.binary = binary
+        self.buf: List[bytes] = []
+        self.timer: Optional[asyncio.TimerHandle] = None
+        # The timer's flush runs as its own task; keep a reference so it isn't collected, and
+        # serialize every socket write so that task and the caller can't interleave frames.
+        self._flush_task: Optional[asyncio.Task] = None
+        self._send_lock = asyncio.Lock()
+
+    async def send_json(self, obj: Any) -> None:
+        self.buf.append(orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS))
+        if self.timer is None:
+            self.timer = asyncio.get_running_loop().call_later(self.FLUSH_DELAY, self._flush_soon)
+
+    def _flush_soon(self) -> None:
+        self.timer = None
+        self._flush_task = asyncio.create_task(self.flush())
+
+    async def flush(self) -> None:
+        if self.timer is not None:
+            self.timer.cancel()
+            self.timer = None
+        async with self._send_lock:
+            await self._send_buffered()
+
+    async def _send_buffered(self) -> None:
+        # Caller holds _send_lock; the buffer is taken under it so messages leave in queue order.
+        if not self.buf:
+            return
+        items, self.buf = self.buf, []
+        payload = items[0] if len(items) == 1 else b"[" + b",".join(items) + b"]"
+        try:
+            if self.binary:
+                await self.ws.send_bytes(_JSON_FRAME_TAG + payload)
+            else:
+                await self.ws.send_text(payload.decode())
+        except (WebSocketDisconnect, RuntimeError) as e:
+            logging.warning("Dropped %d WebSocket message(s): %s", len(items), e)
+
+    async def send_batch(self, messages: List[Any]) -> None:
+        # Sends everything buffered plus `messages` as one frame right away.
+        self.buf.extend(orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS) for obj in messages)
+        await self.flush()
+
+    async def send_bytes(self, data: bytes) -> None:
+        if self.timer is not None:
+            self.timer.cancel()
+            self.timer = None
+        async with self._send_lock:
+            await self._send_buffered()
+            await self.ws.send_bytes(data)
+
 # ======================= Conversational Logic (Agentic) =======================
 
+# Tool schemas sent with every model call; static, so built once.
+_GOOGLE_TOOLS: List[Dict[str, Any]] = [
+    {"type": "function", "function": {"name": "gmail_search_emails", "description": "Searches for emails in the user's Gmail inbox.", "parameters": {"type": "object", "properties": {"query": {"type": "string"}, "max_results": {"type": "integer", "default": 5}}, "required": []}}},
+    {"type": "function", "function": {"name": "gmail_read_email", "description": "Reads a preview of a Gmail email.", "parameters": {"type": "object", "properties": {"message_id": {"type": "string"}}, "required": []}}},
+    {"type": "function", "function": {"name": "gmail_summarize_email", "description": "Summarizes the Gmail email in context.", "parameters": {"type": "object", "properties": {}}}},
+    {"type": "function", "function": {"name": "gmail_draft_new_email", "description": "Creates a new Gmail draft.", "parameters": {"type": "object", "properties": {"to": {"type": "string"}, "subject": {"type": "string"}, "body": {"type": "string"}}, "required": ["to", "subject", "body"]}}},
+    {"type": "function", "function": {"name": "gmail_draft_reply", "description": "Creates a Gmail reply draft.", "parameters": {"type": "object", "properties": {"body": {"type": "string"}}, "required": ["body"]}}},
+    {"type": "function", "function": {"name": "gmail_send_draft", "description": "Sends the last Gmail draft.", "parameters": {"type": "object", "properties": {}}}},
+    {"type": "function", "function": {"name": "gmail_delete_email", "description": "Deletes a Gmail email.", "parameters": {"type": "object", "properties": {"message_id": {"type": "string"}}, "required": []}}},
+    {"type": "function", "function": {"name": "gmail_archive_email", "description": "Archives a Gmail email.", "parameters": {"type": "object", "properties": {"message_id": {"type": "string"}}, "required": []}}},
+    {"type": "function", "function": {"name": "gmail_mark_as_read", "description": "Marks a Gmail email as read.", "parameters": {"type": "object", "properties": {"message_id": {"type": "string"}}, "required": []}}},
+    {"type": "function", "function": {"name": "gmail_mark_as_unread", "description": "Marks a Gmail email as unread.", "parameters": {"type": "object", "properties": {"message_id": {"type": "string"}}, "required": []}}},
+    {"type": "function", "function": {"name": "gmail_mark_all_read", "description": "Marks every unread Gmail message in the inbox as read.", "parameters": {"type": "object", "properties": {}, "required": []}}},
+    {"type": "function", "function": {"name": "calendar_list_events", "description": "Lists Google Calendar events.", "parameters": {"type": "object", "properties": {"time_min": {"type": "string"}, "time_max": {"type": "string"}, "max_results": {"type": "integer", "default": 10}, "query": {"type": "string"}}, "required": []}}},
+    {"type": "function", "function": {"name": "calendar_quick_add", "description": "Quickly adds a Google Calendar event from text.", "parameters": {"type": "object", "properties": {"text": {"type": "string"}}, "required": ["text"]}}},
+    {"type": "function", "function": {"name": "calendar_create_event", "description": "Creates a detailed Google Calendar event.", "parameters": {"type": "object", "properties": {"summary": {"type": "string"}, "start_time": {"type": "string"}, "end_time": {"type": "string"}, "timezone": {"type": "string"}, "location": {"type": "string"}, "attendees": {"type": "array", "items": {"type": "string"}}}, "required": ["summary", "start_time", "end_time"]}}},
+    {"type": "function", "function": {"name": "calendar_update_event_time", "description": "Updates a Google Calendar event's time.", "parameters": {"type": "object", "properties": {"event_id": {"type": "string"}, "start_time": {"type": "string"}, "end_time": {"type": "string"}, "timezone": {"type": "string"}}, "required": ["event_id", "start_time", "end_time"]}}},
+    {"type": "function", "function": {"name": "calendar_delete_event", "description": "Deletes a Google Calendar event.", "parameters": {"type": "object", "properties": {"event_id": {"type": "string"}}, "required": ["event_id"]}}},
+]
+_MICROSOFT_TOOLS: List[Dict[str, Any]] = [
+    {"type": "function", "function": {
+        "name": "outlook_search_emails",
+        "description": "Searches Outlook inbox. If query is empty, returns the latest emails.",
+        "parameters": {
+            "type": "object",
+            "properties": {
+                "query": {"type": "string", "description": "Free-text search. Leave empty to fetch latest messages."},
+                "max_results": {"type": "integer", "default": 5}
+            },
+            "required": []
+        }
+    }},
+    {"type": "function", "function": {"name": "outlook_read_email", "description": "Reads a preview of an Outlook email.", "parameters": {"type": "object", "properties": {"message_id": {"type": "string"}}, "required": []}}},
+    {"type": "function", "function": {"name": "outlook_summarize_email", "description": "Summarizes the Outlook email in context.", "parameters": {"type": "object", "properties": {}}}},
+    {"type": "function", "function": {"name": "outlook_draft_new_email", "description": "Creates a new Outlook draft.", "parameters": {"type": "object", "properties": {"to": {"type": "string"}, "subject": {"type": "string"}, "body": {"type": "string"}}, "required": ["to", "subject", "body"]}}},
+    {"type": "function", "function": {"name": "outlook_draft_reply", "description": "Creates an Outlook reply draft.", "parameters": {"type": "object", "properties": {"body": {"type": "string"}}, "required": ["body"]}}},
+    {"type": "function", "function": {"name": "outlook_send_draft", "description": "Sends the last Outlook draft.", "parameters": {"type": "object", "properties": {}}}},
+    {"type": "function", "function": {"name": "outlook_delete_email", "description": "Deletes an Outlook email.", "parameters": {"type": "object", "properties": {"message_id": {"type": "string"}}, "required": []}}},
+    {"type": "function", "function": {"name": "outlook_archive_email", "description": "Archives an Outlook email.", "parameters": {"type": "object", "properties": {"message_id": {"type": "string"}}, "required": []}}},
+    {"type": "function", "function": {"name": "outlook_mark_as_read", "description": "Marks an Outlook email as read.", "parameters": {"type": "object", "properties": {"message_id": {"type": "string"}}, "required": []}}},
+    {"type": "function", "function": {"name": "outlook_mark_as_unread", "description": "Marks an Outlook email as unread.", "parameters": {"type": "object", "properties": {"message_id": {"type": "string"}}, "required": []}}},
+    {"type": "function", "function": {"name": "outlook_mark_all_read", "description": "Marks every unread Outlook message in the inbox as read.", "parameters": {"type": "object", "properties": {}, "required": []}}},
+    {"type": "function", "function": {"name": "calendar_list_events", "description": "Lists Microsoft Calendar events.", "parameters": {"type": "object", "properties": {"time_min": {"type": "string"}, "time_max": {"type": "string"}, "max_results": {"type": "integer", "default": 10}, "query": {"type": "string"}}, "required": []}}},
+    {"type": "function", "function": {"name": "calendar_create_event", "description": "Creates a detailed Microsoft Calendar event.", "parameters": {"type": "object", "properties": {"summary": {"type": "string"}, "start_time": {"type": "string"}, "end_time": {"type": "string"}, "timezone": {"type": "string"}, "location": {"type": "string"}, "attendees": {"type": "array", "items": {"type": "string"}}}, "required": ["summary", "start_time", "end_time"]}}},
+    {"type": "function", "function": {"name": "calendar_update_event_time", "description": "Updates a Microsoft Calendar event's time.", "parameters": {"type": "object", "properties": {"event_id": {"type": "string"}, "start_time": {"type": "string"}, "end_time": {"type": "string"}, "timezone": {"type": "string"}}, "required": ["event_id", "start_time", "end_time"]}}},
+    {"type": "function", "function": {"name": "calendar_delete_event", "description": "Deletes a Microsoft Calendar event.", "parameters": {"type": "object", "properties": {"event_id": {"type": "string"}}, "required": ["event_id"]}}},
+]
+
+# Read-only tools whose results may be reused briefly within a session (seconds).
+# Any other tool can change mailbox/calendar state, so calling one drops the cache.
+_TOOL_TTL: Dict[str, float] = {
+    "gmail_search_emails": 30.0,
+    "outlook_search_emails": 30.0,
+    "calendar_list_events": 20.0,
+}
+_TOOL_CACHE_MAX = 64
+# The system prompt makes the model re-run the search/list tools on these; the cache must not answer them.
+_RECHECK_RE = re.compile(r"\b(?:re-?check|check|verify|refresh|reload|again|anything new|any new|still|update)", re.I)
+_HISTORY_MAX = int(os.getenv("HISTORY_MAX_MESSAGES", "64"))
+# Newly announced mail is fetched in full ahead of the user's "read it" / "summarize it".
+_BODY_PREFETCH = 3
+_BODY_CACHE_MAX = 16
+# A prefetched body is only trusted briefly; after that the message may have been read, moved or edited.
+_BODY_CACHE_TTL = 120.0
+# Per-message metadata GETs a Gmail search keeps in flight at once.
+_GMAIL_FETCH_CONCURRENCY = 8
+_OUTLOOK_MESSAGE_SELECT = "id,subject,from,bodyPreview,body,toRecipients,ccRecipients,replyTo,sentDateTime,receivedDateTime,internetMessageId"
+_OUTLOOK_TEXT_BODY = {"Prefer": 'outlook.body-content-type="text"'}
+# Fixed instructions for the summarize tools; only the metadata and body are formatted per call.
+_SUMMARY_PREAMBLE_GMAIL = (
+    "You are preparing a spoken summary of an email for the account owner.\n"
+    "Deliver a warm, professional synopsis that:\n"
+    "- Opens with the sender's name and subject.\n"
+    "- Highlights the main points and any explicit requests or deadlines.\n"
+    "- Calls out the sender's email address if a reply may be needed.\n"
+    "- Ends with a suggested next step or reply idea when appropriate.\n"
+    "Keep it under 170 words.\n\n"
+)
+_SUMMARY_PREAMBLE_OUTLOOK = (
+    "Provide a concise, user-friendly summary of this Outlook email.\n"
+    "Mention the sender by name, include their email address, cover the main points, and note any requests, deadlines, or attachments.\n"
+    "If a response is implied, suggest how the user might reply.\n"
+    "Keep the summary under 170 words.\n\n"
+)
+_GMAIL_CONTACT_HEADERS = frozenset({"from", "subject", "date"})
+# List views only need these headers and the snippet, not the MIME body.
+_GMAIL_METADATA_PARAMS = {"format": "metadata", "metadataHeaders": ["From", "Subject", "Date"]}
+_GMAIL_CONTEXT_HEADERS = frozenset({"from", "reply-to", "to", "cc", "subject", "date", "message-id", "references"})
+_GMAIL_OPS_RE = re.compile(r"(?i)\b(in|is|label):")
+
 class ConversationManager:
-    def __init__(self, ws: WebSocket, service_type: str):
-        self.ws = ws
+    def __init__(self, ws: WebSocket, service_type: str, binary_audio: bool = False):
+        self.ws = BatchedWS(ws, binary=binary_audio)
         self.service_type = service_type
+        self.binary_audio = binary_audio
 
         now = datetime.datetime.now()
         current_time_str = now.strftime("%A, %B %d, %Y, %I:%M %p %Z")
@@ -1050,30 +1718,60 @@ class ConversationManager:
 
         prompt = (google_prompt if service_type == 'google' else microsoft_prompt) + base_instructions
 
-        self.history: List[Dict[str, Any]] = [{"role": "system", "content": prompt}]
+        # The system prompt is pinned; the conversation keeps only the most recent messages so each
+        # completion request stays roughly constant in size however long the session runs.
+        self._system: List[Dict[str, Any]] = [{"role": "system", "content": prompt}]
+        self.history: "deque[Dict[str, Any]]" = deque(maxlen=_HISTORY_MAX)
         self.last_draft_google: Optional[Dict[str, str]] = None
         self.last_draft_microsoft_id: Optional[str] = None
         self.current_email_context: Optional[Dict[str, str]] = None
         self.current_event_context: Optional[Dict[str, str]] = None
-        self.recent_contacts: List[Dict[str, Any]] = []
+        # Most recent first; keyed "e:<email>" or, for senders without an address, "n:<name>".
+        self._contact_index: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
         self.account_identity: Dict[str, str] = {"email": "", "display_name": ""}
         self._outlook_inbox_id: Optional[str] = None
-        self._handled_email_ids: Set[str] = set()
-        self._announced_unread_ids: Set[str] = set()
+        self._handled_email_ids = _BoundedSet()
+        self._announced_unread_ids = _BoundedSet()
         self._new_email_poll_task: Optional[asyncio.Task] = None
         self._new_email_poll_interval: int = 45
+        self._new_email_poll_max_interval: int = 300
+        self._consec_empty_polls = 0
+        # Change cursors for the new-mail poller: Gmail history id / Graph delta link.
+        self._gmail_history_id: Optional[str] = None
+        self._outlook_delta_link: Optional[str] = None
+        self._tool_cache: Dict[Tuple[str, str, bytes], Tuple[float, Any]] = {}
+        self._body_cache: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._archive_folder_id: Optional[str] = None
+        self._gapi_slots = asyncio.Semaphore(_GAPI_PER_SESSION)
+        self._identity_task: Optional[asyncio.Task] = None
         self._active = True
 
-    async def send_audio_response(self, text: str, status_text: str):
+    async def send_audio_response(self, text: str, status_text: str, extra_messages: Optional[List[Dict[str, Any]]] = None):
         display_text, suggestions = _extract_suggestions(text or "")
         if not display_text:
             display_text = "Done."
 
-        await self.ws.send_json({"type": "chat_append", "role": "assistant", "text": display_text})
-        await self.ws.send_json({"type": "suggestions", "items": suggestions})
+        messages = list(extra_messages or [])
+        messages.append({"type": "chat_append", "role": "assistant", "text": display_text})
+        messages.append({"type": "suggestions", "items": suggestions})
 
-        audio_url = await tts_any(display_text)
-        await self.ws.send_json({"type": "play_audio", "url": audio_url, "status_text": status_text})
+        if not self.binary_audio:
+            await self.ws.send_batch(messages)
+            audio_url = await tts_any(display_text)
+            await self.ws.send_json({"type": "play_audio", "url": audio_url, "status_text": status_text})
+            return
+
+        # Synthesize every sentence chunk concurrently, but send them in order as they finish.
+        messages.append({"type": "audio_start", "status_text": status_text})
+        await self.ws.send_batch(messages)
+        tasks = [asyncio.create_task(tts_bytes(chunk)) for chunk in _tts_chunks(display_text)]
+        try:
+            for task in tasks:
+                await self.ws.send_bytes(_AUDIO_FRAME_TAG + await task)
+        finally:
+            for task in tasks:
+                task.cancel()
+            await self.ws.send_json({"type": "audio_end"})
 
     async def append_chat(self, role: str, text: str):
         await self.ws.send_json({"type": "chat_append", "role": role, "text": text})
@@ -1126,12 +1824,11 @@ class ConversationManager:
     async def _fetch_unread_email_contacts(self, max_results: int = 5) -> List[Dict[str, Any]]:
         try:
             if self.service_type == 'google':
-                resp = await self.gmail_search_emails(query="in:inbox is:unread", max_results=max_results, publish=False)
-            else:
-                resp = await self.outlook_search_emails(query="", max_results=max_results, publish=False)
+                return await self._gmail_search(query="in:inbox is:unread", max_results=max_results, publish=False)
+            resp = await self.outlook_search_emails(query="", max_results=max_results, publish=False)
             if not resp or "No emails found" in resp:
                 return []
-            data = json.loads(resp)
+            data = orjson.loads(resp)
             if isinstance(data, list):
                 return [c for c in data if isinstance(c, dict)]
             return []
@@ -1139,12 +1836,95 @@ class ConversationManager:
             print(f"[UNREAD FETCH WARNING] {e}")
             return []
 
+    async def _fetch_new_unread_contacts(self, max_results: int = 5) -> List[Dict[str, Any]]:
+        # Only what changed since the last poll. Without a cursor (first poll, or the cursor
+        # expired) this seeds one and falls back to a full unread search for this round.
+        try:
+            if self.service_type == 'google':
+                contacts = await self._gmail_new_unread_contacts()
+            else:
+                contacts = await self._outlook_new_unread_contacts()
+        except Exception as e:
+            print(f"[CHANGE FEED WARNING] {e}")
+            self._gmail_history_id = None
+            self._outlook_delta_link = None
+            contacts = None
+        if contacts is None:
+            return await self._fetch_unread_email_contacts(max_results)
+        return contacts[:max_results]
+
+    async def _gmail_new_unread_contacts(self) -> Optional[List[Dict[str, Any]]]:
+        if not self._gmail_history_id:
+            self._gmail_history_id = (await _gmail_get("/users/me/profile")).get("historyId")
+            return None
+        added: Dict[str, None] = {}
+        params = {"startHistoryId": self._gmail_history_id, "historyTypes": "messageAdded", "labelId": "INBOX"}
+        while True:
+            page = await _gmail_get("/users/me/history", params=params)
+            for record in page.get("history", []):
+                for item in record.get("messagesAdded", []):
+                    msg = item.get("message") or {}
+                    if msg.get("id") and "UNREAD" in (msg.get("labelIds") or []):
+                        added[msg["id"]] = None
+            if not page.get("nextPageToken"):
+                break
+            params["pageToken"] = page["nextPageToken"]
+        self._gmail_history_id = page.get("historyId") or self._gmail_history_id
+        # History runs oldest to newest; the poller announces the first entry as the newest.
+        new_ids = [mid for mid in reversed(added) if not self._is_handled_email(mid)][:5]
+        metas = await asyncio.gather(*(_gmail_get(f"/users/me/messages/{mid}", params=_GMAIL_METADATA_PARAMS) for mid in new_ids))
+        return [self._gmail_contact(meta) for meta in metas]
+
+    async def _outlook_new_unread_contacts(self) -> Optional[List[Dict[str, Any]]]:
+        seeding = not self._outlook_delta_link
+        if seeding:
+            # Start the feed at "now" so the initial sync doesn't page through the whole inbox.
+            since = datetime.datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+            endpoint = "/me/mailFolders('Inbox')/messages/delta"
+            params: Optional[Dict[str, Any]] = {
+                "$select": "id,subject,from,receivedDateTime,bodyPreview,isRead",
+                "$filter": f"receivedDateTime ge {since}",
+            }
+        else:
+            endpoint, params = self._outlook_delta_link[len(GRAPH_API_ENDPOINT):], None
+        changed: List[Dict[str, Any]] = []
+        while True:
+            page = orjson.loads((await graph_request("GET", endpoint, params=params)).content)
+            changed.extend(page.get("value", []))
+            next_link = page.get("@odata.nextLink")
+            if not next_link:
+                self._outlook_delta_link = page.get("@odata.deltaLink")
+                break
+            endpoint, params = next_link[len(GRAPH_API_ENDPOINT):], None
+        if seeding:
+            return None
+        fresh = [
+            m for m in changed
+            if m.get("id") and "@removed" not in m and m.get("isRead") is False and not self._is_handled_email(m["id"])
+        ]
+        fresh.sort(key=lambda m: m.get("receivedDateTime") or "", reverse=True)
+        return [self._outlook_contact(m) for m in fresh]
+
+    async def _gapi(self, request: Any) -> Any:
+        # At most _GAPI_PER_SESSION Google calls in flight per socket, so one session can't hog the pool.
+        creds = request.http.credentials
+        async with self._gapi_slots:
+            return await asyncio.get_running_loop().run_in_executor(_GAPI_POOL, _execute_in_worker, request, creds)
+
+    async def _refresh_credentials(self) -> None:
+        # Lets the token cache start a refresh before tool calls; Google's client would otherwise refresh inline.
+        try:
+            await _token_cache(self.service_type).get()
+        except Exception as e:
+            print(f"[TOKEN WARNING] {e}")
+
     async def _poll_for_new_emails(self):
         try:
             await asyncio.sleep(15)
             while self._active:
                 try:
-                    contacts = await self._fetch_unread_email_contacts()
+                    await self._refresh_credentials()
+                    contacts = await self._fetch_new_unread_contacts()
                     new_contacts: List[Dict[str, Any]] = []
                     for contact in contacts:
                         cid = contact.get("id")
@@ -1152,10 +1932,11 @@ class ConversationManager:
                             continue
                         self._announced_unread_ids.add(cid)
                         new_contacts.append(contact)
+                    self._consec_empty_polls = 0 if new_contacts else self._consec_empty_polls + 1
                     if new_contacts:
+                        self._tool_cache.clear()
                         for contact in new_contacts:
                             self._merge_contact(contact)
-                        await self._publish_people_list()
                         first = new_contacts[0]
                         count = len(new_contacts)
                         sender = first.get("from") or first.get("from_name") or first.get("from_email") or "someone"
@@ -1171,15 +1952,21 @@ class ConversationManager:
                                 {"label": "Reply", "prompt": "Draft a quick reply to the latest email."}
                             ]
                         }
-                        message = f"{spoken} <suggestions>{json.dumps(suggestions)}</suggestions>"
+                        message = f"{spoken} <suggestions>{orjson.dumps(suggestions).decode()}</suggestions>"
                         display_text, _ = _extract_suggestions(message)
                         self.history.append({"role": "assistant", "content": display_text})
-                        await self.send_audio_response(message, "New email arrived.")
+                        await asyncio.gather(
+                            self.send_audio_response(message, "New email arrived.", extra_messages=[self._people_list_message()]),
+                            *(self._prefetch_email(c["id"]) for c in new_contacts[:_BODY_PREFETCH]),
+                        )
                 except asyncio.CancelledError:
                     raise
                 except Exception as e:
                     print(f"[EMAIL POLL WARNING] {e}")
-                await asyncio.sleep(self._new_email_poll_interval)
+                    self._consec_empty_polls += 1
+                # Back off while the inbox is quiet (or the API is failing); jitter spreads sessions out.
+                interval = min(self._new_email_poll_interval * (1.5 ** self._consec_empty_polls), self._new_email_poll_max_interval)
+                await asyncio.sleep(interval * random.uniform(0.8, 1.2))
         except asyncio.CancelledError:
             pass
         finally:
@@ -1194,10 +1981,33 @@ class ConversationManager:
             except asyncio.CancelledError:
                 pass
             self._new_email_poll_task = None
+        self._body_cache.clear()
+
+    async def _fetch_email_message(self, message_id: str) -> Dict[str, Any]:
+        if self.service_type == 'google':
+            return await _gmail_get(f"/users/me/messages/{message_id}", params={"format": "full"})
+        r = await graph_request("GET", f"/me/messages/{message_id}", params={"$select": _OUTLOOK_MESSAGE_SELECT}, headers=_OUTLOOK_TEXT_BODY)
+        return orjson.loads(r.content)
+
+    async def _prefetch_email(self, message_id: str) -> None:
+        try:
+            msg = await self._fetch_email_message(message_id)
+        except Exception as e:
+            print(f"[EMAIL PREFETCH WARNING] {e}")
+            return
+        self._body_cache[message_id] = (time.monotonic() + _BODY_CACHE_TTL, msg)
+        while len(self._body_cache) > _BODY_CACHE_MAX:
+            self._body_cache.popitem(last=False)
+
+    def _take_prefetched(self, message_id: str) -> Optional[Dict[str, Any]]:
+        entry = self._body_cache.pop(message_id, None)
+        if entry is None or entry[0] < time.monotonic():
+            return None
+        return entry[1]
 
     async def _load_gmail_email_into_context(self, message_id: str, mark_read: bool = False) -> Tuple[Dict[str, Any], str]:
-        msg = _gmail_service().users().messages().get(userId='me', id=message_id, format='full').execute()
-        headers = self._parse_headers(msg.get('payload', {}).get('headers', []))
+        msg = self._take_prefetched(message_id) or await self._fetch_email_message(message_id)
+        headers = self._parse_headers(msg.get('payload', {}).get('headers'))
         sender = _identity_from_header(headers.get('from'))
         reply_to_list = _identities_from_header(headers.get('reply-to')) or ([sender] if sender.get("email") or sender.get("name") else [])
         to_recipients = _identities_from_header(headers.get('to'))
@@ -1225,8 +2035,8 @@ class ConversationManager:
         }
         self.current_email_context = context
         self.current_event_context = None
-        await self.update_context_display()
-        await self._ensure_account_identity()
+        # The /me lookup and the context push are independent; the contact merge needs the identity.
+        await asyncio.gather(self.update_context_display(), self._ensure_account_identity())
         self._merge_contact({
             "id": context['id'],
             "name": context.get('from_name'),
@@ -1246,16 +2056,18 @@ class ConversationManager:
         return context, body_text
 
     async def _load_outlook_email_into_context(self, message_id: str, mark_read: bool = False) -> Tuple[Dict[str, Any], str]:
-        params = {
-            "$select": "id,subject,from,bodyPreview,body,toRecipients,ccRecipients,replyTo,sentDateTime,receivedDateTime,internetMessageId",
-        }
-        r = await graph_request(
-            "GET",
-            f"/me/messages/{message_id}",
-            params=params,
-            headers={"Prefer": 'outlook.body-content-type="text"'}
-        )
-        msg = r.json()
+        msg = self._take_prefetched(message_id)
+        if msg is None and self.account_identity.get("email"):
+            msg = await self._fetch_email_message(message_id)
+        elif msg is None:
+            # Identity not loaded yet: fetch it in the same round trip as the message.
+            responses = await graph_batch([
+                {"id": "message", "method": "GET", "url": f"/me/messages/{message_id}?$select={_OUTLOOK_MESSAGE_SELECT}", "headers": _OUTLOOK_TEXT_BODY},
+                {"id": "me", "method": "GET", "url": f"/me?$select={_GRAPH_IDENTITY_SELECT}"},
+            ])
+            msg = _graph_batch_body(responses.get("message"))
+            if (responses.get("me") or {}).get("status") == 200:
+                self._set_graph_identity(responses["me"].get("body") or {})
         sender = _identity_from_graph((msg.get('from', {}) or {}).get('emailAddress'))
         reply_to_list = _identities_from_graph(msg.get('replyTo')) or ([sender] if sender.get("email") or sender.get("name") else [])
         to_recipients = _identities_from_graph(msg.get('toRecipients'))
@@ -1279,11 +2091,12 @@ class ConversationManager:
             'date': received,
             'internet_message_id': msg.get('internetMessageId', ''),
             'body_preview': body_text[:1000],
+            'body_length': len(body_text),
         }
         self.current_email_context = context
         self.current_event_context = None
-        await self.update_context_display()
-        await self._ensure_account_identity()
+        # The /me lookup and the context push are independent; the contact merge needs the identity.
+        await asyncio.gather(self.update_context_display(), self._ensure_account_identity())
         self._merge_contact({
             "id": context['id'],
             "name": context.get('from_name'),
@@ -1352,10 +2165,7 @@ class ConversationManager:
             name = email.split("@")[0]
         display = (contact.get("display") or contact.get("from") or "").strip()
         if not display:
-            if name and email:
-                display = f"{name} <{email}>"
-            else:
-                display = name or email or "Unknown Sender"
+            display = _format_display(name, email) or "Unknown Sender"
         normalized = {
             "id": contact.get("id") or contact.get("message_id") or "",
             "name": name or display or "Unknown Sender",
@@ -1376,28 +2186,33 @@ class ConversationManager:
         if not key_email and key_name and account_name and key_name == account_name:
             return
 
-        merged = False
-        for existing in self.recent_contacts:
-            existing_email = (existing.get("email") or "").lower()
-            existing_name = (existing.get("name") or "").lower()
-            if key_email and existing_email == key_email:
-                for k, v in normalized.items():
-                    if v:
-                        existing[k] = v
-                merged = True
-                break
-            if not key_email and key_name and existing_name == key_name:
-                for k, v in normalized.items():
-                    if v:
-                        existing[k] = v
-                merged = True
-                break
-        if not merged:
-            self.recent_contacts.insert(0, normalized)
-        self.recent_contacts = self.recent_contacts[:15]
+        existing = None
+        if key_email:
+            existing = self._contact_index.get(f"e:{key_email}")
+        elif key_name:
+            existing = self._contact_index.get(f"n:{key_name}") or next(
+                (c for c in self._contact_index.values() if (c.get("name") or "").lower() == key_name), None
+            )
+        if existing is not None:
+            for k, v in normalized.items():
+                if v:
+                    existing[k] = v
+            return
+        key = f"e:{key_email}" if key_email else f"n:{key_name or ''}"
+        self._contact_index[key] = normalized
+        self._contact_index.move_to_end(key, last=False)
+        while len(self._contact_index) > 15:
+            self._contact_index.popitem(last=True)
+
+    @property
+    def recent_contacts(self) -> List[Dict[str, Any]]:
+        return list(self._contact_index.values())
+
+    def _people_list_message(self) -> Dict[str, Any]:
+        return {"type": "people_list", "people": self.recent_contacts}
 
     async def _publish_people_list(self):
-        await self.ws.send_json({"type": "people_list", "people": self.recent_contacts})
+        await self.ws.send_json(self._people_list_message())
 
     async def _after_bulk_mark_read(self, processed_ids: Set[str]) -> None:
         if not processed_ids:
@@ -1408,133 +2223,127 @@ class ConversationManager:
             self.current_email_context = None
             await self.update_context_display()
 
+    def _set_graph_identity(self, data: Dict[str, Any]) -> None:
+        email = (data.get("mail") or data.get("userPrincipalName") or "").strip()
+        self.account_identity = {
+            "email": email.lower(),
+            "display_name": (data.get("displayName") or email).strip(),
+        }
+
     async def _ensure_account_identity(self):
+        # Single flight: concurrent callers share one in-progress lookup.
         if self.account_identity.get("email"):
             return
+        if not self._identity_task or self._identity_task.done():
+            self._identity_task = asyncio.create_task(self._load_account_identity())
+        await asyncio.shield(self._identity_task)
+
+    async def _load_account_identity(self):
         try:
             if self.service_type == 'google':
-                profile = _gmail_service().users().getProfile(userId='me').execute()
+                profile = await _gmail_get("/users/me/profile")
                 email = (profile.get("emailAddress") or "").strip()
-                display_name = email
+                self.account_identity = {
+                    "email": email.lower(),
+                    "display_name": email,
+                }
             else:
-                resp = await graph_request("GET", "/me", params={"$select": "displayName,mail,userPrincipalName"})
-                data = resp.json()
-                email = (data.get("mail") or data.get("userPrincipalName") or "").strip()
-                display_name = (data.get("displayName") or email).strip()
-            self.account_identity = {
-                "email": email.lower(),
-                "display_name": display_name,
-            }
+                resp = await graph_request("GET", "/me", params={"$select": _GRAPH_IDENTITY_SELECT})
+                self._set_graph_identity(orjson.loads(resp.content))
         except Exception as e:
             print(f"[IDENTITY WARNING] Unable to load account identity: {e}")
             self.account_identity = {"email": "", "display_name": ""}
 
+    def _messages(self) -> List[Dict[str, Any]]:
+        # A tool result whose assistant tool_calls message has rolled off would be rejected by the API.
+        window = list(self.history)
+        start = 0
+        while start < len(window) and window[start].get("role") == "tool":
+            start += 1
+        return self._system + window[start:]
+
     @property
     def tools(self):
-        google_tools = [
-            {"type": "function", "function": {"name": "gmail_search_emails", "description": "Searches for emails in the user's Gmail inbox.", "parameters": {"type": "object", "properties": {"query": {"type": "string"}, "max_results": {"type": "integer", "default": 5}}, "required": []}}},
-            {"type": "function", "function": {"name": "gmail_read_email", "description": "Reads a preview of a Gmail email.", "parameters": {"type": "object", "properties": {"message_id": {"type": "string"}}, "required": []}}},
-            {"type": "function", "function": {"name": "gmail_summarize_email", "description": "Summarizes the Gmail email in context.", "parameters": {"type": "object", "properties": {}}}},
-            {"type": "function", "function": {"name": "gmail_draft_new_email", "description": "Creates a new Gmail draft.", "parameters": {"type": "object", "properties": {"to": {"type": "string"}, "subject": {"type": "string"}, "body": {"type": "string"}}, "required": ["to", "subject", "body"]}}},
-            {"type": "function", "function": {"name": "gmail_draft_reply", "description": "Creates a Gmail reply draft.", "parameters": {"type": "object", "properties": {"body": {"type": "string"}}, "required": ["body"]}}},
-            {"type": "function", "function": {"name": "gmail_send_draft", "description": "Sends the last Gmail draft.", "parameters": {"type": "object", "properties": {}}}},
-            {"type": "function", "function": {"name": "gmail_delete_email", "description": "Deletes a Gmail email.", "parameters": {"type": "object", "properties": {"message_id": {"type": "string"}}, "required": []}}},
-            {"type": "function", "function": {"name": "gmail_archive_email", "description": "Archives a Gmail email.", "parameters": {"type": "object", "properties": {"message_id": {"type": "string"}}, "required": []}}},
-            {"type": "function", "function": {"name": "gmail_mark_as_read", "description": "Marks a Gmail email as read.", "parameters": {"type": "object", "properties": {"message_id": {"type": "string"}}, "required": []}}},
-            {"type": "function", "function": {"name": "gmail_mark_as_unread", "description": "Marks a Gmail email as unread.", "parameters": {"type": "object", "properties": {"message_id": {"type": "string"}}, "required": []}}},
-            {"type": "function", "function": {"name": "gmail_mark_all_read", "description": "Marks every unread Gmail message in the inbox as read.", "parameters": {"type": "object", "properties": {}, "required": []}}},
-            {"type": "function", "function": {"name": "calendar_list_events", "description": "Lists Google Calendar events.", "parameters": {"type": "object", "properties": {"time_min": {"type": "string"}, "time_max": {"type": "string"}, "max_results": {"type": "integer", "default": 10}, "query": {"type": "string"}}, "required": []}}},
-            {"type": "function", "function": {"name": "calendar_quick_add", "description": "Quickly adds a Google Calendar event from text.", "parameters": {"type": "object", "properties": {"text": {"type": "string"}}, "required": ["text"]}}},
-            {"type": "function", "function": {"name": "calendar_create_event", "description": "Creates a detailed Google Calendar event.", "parameters": {"type": "object", "properties": {"summary": {"type": "string"}, "start_time": {"type": "string"}, "end_time": {"type": "string"}, "timezone": {"type": "string"}, "location": {"type": "string"}, "attendees": {"type": "array", "items": {"type": "string"}}}, "required": ["summary", "start_time", "end_time"]}}},
-            {"type": "function", "function": {"name": "calendar_update_event_time", "description": "Updates a Google Calendar event's time.", "parameters": {"type": "object", "properties": {"event_id": {"type": "string"}, "start_time": {"type": "string"}, "end_time": {"type": "string"}, "timezone": {"type": "string"}}, "required": ["event_id", "start_time", "end_time"]}}},
-            {"type": "function", "function": {"name": "calendar_delete_event", "description": "Deletes a Google Calendar event.", "parameters": {"type": "object", "properties": {"event_id": {"type": "string"}}, "required": ["event_id"]}}},
-        ]
-        microsoft_tools = [
-            {"type": "function", "function": {
-                "name": "outlook_search_emails",
-                "description": "Searches Outlook inbox. If query is empty, returns the latest emails.",
-                "parameters": {
-                    "type": "object",
-                    "properties": {
-                        "query": {"type": "string", "description": "Free-text search. Leave empty to fetch latest messages."},
-                        "max_results": {"type": "integer", "default": 5}
-                    },
-                    "required": []
-                }
-            }},
-            {"type": "function", "function": {"name": "outlook_read_email", "description": "Reads a preview of an Outlook email.", "parameters": {"type": "object", "properties": {"message_id": {"type": "string"}}, "required": []}}},
-            {"type": "function", "function": {"name": "outlook_summarize_email", "description": "Summarizes the Outlook email in context.", "parameters": {"type": "object", "properties": {}}}},
-            {"type": "function", "function": {"name": "outlook_draft_new_email", "description": "Creates a new Outlook draft.", "parameters": {"type": "object", "properties": {"to": {"type": "string"}, "subject": {"type": "string"}, "body": {"type": "string"}}, "required": ["to", "subject", "body"]}}},
-            {"type": "function", "function": {"name": "outlook_draft_reply", "description": "Creates an Outlook reply draft.", "parameters": {"type": "object", "properties": {"body": {"type": "string"}}, "required": ["body"]}}},
-            {"type": "function", "function": {"name": "outlook_send_draft", "description": "Sends the last Outlook draft.", "parameters": {"type": "object", "properties": {}}}},
-            {"type": "function", "function": {"name": "outlook_delete_email", "description": "Deletes an Outlook email.", "parameters": {"type": "object", "properties": {"message_id": {"type": "string"}}, "required": []}}},
-            {"type": "function", "function": {"name": "outlook_archive_email", "description": "Archives an Outlook email.", "parameters": {"type": "object", "properties": {"message_id": {"type": "string"}}, "required": []}}},
-            {"type": "function", "function": {"name": "outlook_mark_as_read", "description": "Marks an Outlook email as read.", "parameters": {"type": "object", "properties": {"message_id": {"type": "string"}}, "required": []}}},
-            {"type": "function", "function": {"name": "outlook_mark_as_unread", "description": "Marks an Outlook email as unread.", "parameters": {"type": "object", "properties": {"message_id": {"type": "string"}}, "required": []}}},
-            {"type": "function", "function": {"name": "outlook_mark_all_read", "description": "Marks every unread Outlook message in the inbox as read.", "parameters": {"type": "object", "properties": {}, "required": []}}},
-            {"type": "function", "function": {"name": "calendar_list_events", "description": "Lists Microsoft Calendar events.", "parameters": {"type": "object", "properties": {"time_min": {"type": "string"}, "time_max": {"type": "string"}, "max_results": {"type": "integer", "default": 10}, "query": {"type": "string"}}, "required": []}}},
-            {"type": "function", "function": {"name": "calendar_create_event", "description": "Creates a detailed Microsoft Calendar event.", "parameters": {"type": "object", "properties": {"summary": {"type": "string"}, "start_time": {"type": "string"}, "end_time": {"type": "string"}, "timezone": {"type": "string"}, "location": {"type": "string"}, "attendees": {"type": "array", "items": {"type": "string"}}}, "required": ["summary", "start_time", "end_time"]}}},
-            {"type": "function", "function": {"name": "calendar_update_event_time", "description": "Updates a Microsoft Calendar event's time.", "parameters": {"type": "object", "properties": {"event_id": {"type": "string"}, "start_time": {"type": "string"}, "end_time": {"type": "string"}, "timezone": {"type": "string"}}, "required": ["event_id", "start_time", "end_time"]}}},
-            {"type": "function", "function": {"name": "calendar_delete_event", "description": "Deletes a Microsoft Calendar event.", "parameters": {"type": "object", "properties": {"event_id": {"type": "string"}}, "required": ["event_id"]}}},
-        ]
-        return google_tools if self.service_type == 'google' else microsoft_tools
+        return _GOOGLE_TOOLS if self.service_type == 'google' else _MICROSOFT_TOOLS
 
     # --- GOOGLE TOOL IMPLEMENTATIONS ---
-    def _parse_headers(self, headers: List[Dict]) -> Dict[str, str]:
-        return {h['name'].lower(): h['value'] for h in headers}
+    @staticmethod
+    def _parse_headers(headers: Optional[List[Dict]], wanted: frozenset = _GMAIL_CONTEXT_HEADERS) -> Dict[str, str]:
+        # One pass over the header list, keeping only the names the caller reads (keys lowercased).
+        out: Dict[str, str] = {}
+        for h in headers or ():
+            name = h['name'].lower()
+            if name in wanted:
+                out[name] = h['value']
+        return out
+
+    def _gmail_contact(self, meta: Dict[str, Any]) -> Dict[str, Any]:
+        headers = self._parse_headers(meta.get('payload', {}).get('headers'), _GMAIL_CONTACT_HEADERS)
+        from_header = headers.get('from')
+        sender = _identity_from_header(from_header)
+        return {
+            "id": meta['id'],
+            "from": sender.get("display") or from_header or "...",
+            "from_name": sender.get("name") or "",
+            "from_email": sender.get("email") or "",
+            "subject": headers.get('subject', '(No Subject)'),
+            "received": headers.get('date', ''),
+            # Contacts come from metadata-only fetches: the snippet is the preview (Gmail HTML-escapes it).
+            "body_preview": html.unescape(meta.get('snippet') or '')[:200],
+            "service": self.service_type,
+        }
 
     async def gmail_search_emails(self, query: str, max_results: int = 5, publish: bool = True) -> str:
-        s = _gmail_service()
+        email_list = await self._gmail_search(query, max_results, publish)
+        if not email_list:
+            return f"No emails found for '{query}'"
+        return orjson.dumps(email_list).decode()
+
+    async def _gmail_search(self, query: str, max_results: int = 5, publish: bool = True) -> List[Dict[str, Any]]:
+        # Contact dicts for internal callers; the tool wrapper above serializes them once.
         if publish:
             await self._ensure_account_identity()
         normalized_query = (query or "").strip()
-        if "in:" not in normalized_query.lower():
+        ops = {m.group(1).lower() for m in _GMAIL_OPS_RE.finditer(normalized_query)}
+        if "in" not in ops:
             normalized_query = f"in:inbox {normalized_query}".strip()
-        if "is:" not in normalized_query.lower() and "label:" not in normalized_query.lower():
+        if "is" not in ops and "label" not in ops:
             normalized_query = f"{normalized_query} is:unread".strip()
-        results = s.users().messages().list(
-            userId='me',
-            q=normalized_query,
-            labelIds=['INBOX', 'UNREAD'],
-            includeSpamTrash=False,
-            maxResults=max_results
-        ).execute()
+        results = await _gmail_get("/users/me/messages", params={
+            "q": normalized_query,
+            "labelIds": ['INBOX', 'UNREAD'],
+            "includeSpamTrash": "false",
+            "maxResults": max_results,
+        })
         messages = results.get('messages', [])
+        handled = self._handled_email_ids
+        ids = [mid for msg in messages if (mid := msg.get('id')) and mid not in handled][:max_results]
+        slots = asyncio.Semaphore(_GMAIL_FETCH_CONCURRENCY)
+
+        async def fetch_meta(mid: str) -> Dict[str, Any]:
+            async with slots:
+                return await _gmail_get(f"/users/me/messages/{mid}", params=_GMAIL_METADATA_PARAMS)
+
+        metas = await asyncio.gather(*(fetch_meta(mid) for mid in ids), return_exceptions=True)
         email_list = []
-        for msg in messages:
-            if self._is_handled_email(msg.get('id')):
+        for meta in metas:
+            if isinstance(meta, Exception):
+                print(f"[Gmail search warning] {meta}")
                 continue
-            meta = s.users().messages().get(userId='me', id=msg['id'], format='full').execute()
-            headers = self._parse_headers(meta.get('payload', {}).get('headers', []))
-            sender = _identity_from_header(headers.get('from'))
-            body_preview = (_get_email_body(meta) or meta.get('snippet', '') or '')[:200]
-            contact = {
-                "id": msg['id'],
-                "from": sender.get("display") or headers.get('from', '...') or "...",
-                "from_name": sender.get("name") or "",
-                "from_email": sender.get("email") or "",
-                "subject": headers.get('subject', '(No Subject)'),
-                "received": headers.get('date', ''),
-                "body_preview": body_preview,
-                "service": self.service_type,
-            }
+            contact = self._gmail_contact(meta)
             email_list.append(contact)
             if publish:
                 self._merge_contact(contact)
-            if len(email_list) >= max_results:
-                break
-        if not email_list:
-            return f"No emails found for '{query}'"
-        if publish:
+        if email_list and publish:
             await self._publish_people_list()
-        return json.dumps(email_list)
+        return email_list
 
     async def gmail_read_email(self, message_id: Optional[str] = None) -> str:
         target_id = message_id or (self.current_email_context and self.current_email_context.get('id'))
         if not target_id:
             return "Error: No message ID."
         context, body_text = await self._load_gmail_email_into_context(target_id, mark_read=True)
-        return json.dumps({
+        return orjson.dumps({
             "id": context['id'],
             "from": context['from'],
             "from_name": context.get('from_name', ''),
@@ -1545,12 +2354,12 @@ class ConversationManager:
             "cc": context.get('cc', ''),
             "received": context.get('date', ''),
             "body_preview": body_text[:1000]
-        })
+        }).decode()
 
     async def gmail_summarize_email(self) -> str:
         if not self.current_email_context:
             return "Error: No email in context."
-        msg = _gmail_service().users().messages().get(userId='me', id=self.current_email_context['id'], format='full').execute()
+        msg = await self._fetch_email_message(self.current_email_context['id'])
         body_text = _get_email_body(msg)
         sender_name = self.current_email_context.get('from_name') or ""
         sender_email = self.current_email_context.get('from_email') or ""
@@ -1558,22 +2367,14 @@ class ConversationManager:
         to_line = self.current_email_context.get('to') or "(you)"
         cc_line = self.current_email_context.get('cc') or ""
         received = self.current_email_context.get('date') or ""
-        prompt = (
-            "You are preparing a spoken summary of an email for the account owner.\n"
-            "Deliver a warm, professional synopsis that:\n"
-            "- Opens with the sender's name and subject.\n"
-            "- Highlights the main points and any explicit requests or deadlines.\n"
-            "- Calls out the sender's email address if a reply may be needed.\n"
-            "- Ends with a suggested next step or reply idea when appropriate.\n"
-            "Keep it under 170 words.\n\n"
+        prompt = _SUMMARY_PREAMBLE_GMAIL + (
             f"Metadata:\nSubject: {subject}\nFrom: {sender_name} <{sender_email}>\nTo: {to_line}\nCc: {cc_line}\nReceived: {received}\n\n"
             f"Email Body:\n```\n{body_text}\n```"
         )
         payload = {"model": REALTIME_MODEL, "messages": [{"role": "user", "content": prompt}], "temperature": 0.4}
-        headers = {"Authorization": f"Bearer {OPENAI_API_KEY}"}
-        r = await _client().post(f"{OPENAI_BASE_URL.rstrip('/')}/v1/chat/completions", json=payload, headers=headers)
+        r = await _openai_chat(payload)
         r.raise_for_status()
-        summary = r.json()["choices"][0]["message"]["content"]
+        summary = orjson.loads(r.content)["choices"][0]["message"]["content"]
         if self.current_email_context and not self._is_handled_email(self.current_email_context.get('id')):
             try:
                 await self.gmail_mark_as_read(self.current_email_context['id'])
@@ -1584,16 +2385,16 @@ class ConversationManager:
     async def gmail_draft_new_email(self, to: str, subject: str, body: str) -> str:
         self.current_email_context = None
         await self.update_context_display()
-        recipients = _split_recipients(to)
-        self.last_draft_google = {"to": ", ".join(recipients), "subject": subject, "body": body}
-        await self.show_draft(", ".join(recipients), subject, body)
+        to_line = ", ".join(_split_recipients(to))
+        self.last_draft_google = {"to": to_line, "subject": subject, "body": body}
+        await self.show_draft(to_line, subject, body)
         return "Draft created. Ask user to confirm."
 
     async def gmail_draft_reply(self, body: str) -> str:
         if not await self._ensure_email_context(mark_read=True):
             return "Error: No email context to reply to."
         subject = self.current_email_context.get('subject', '')
-        if not subject.lower().startswith("re:"):
+        if subject[:3].lower() != "re:":
             subject = f"Re: {subject}"
         reply_to_recipients = self.current_email_context.get('reply_to_recipients') or []
         if not reply_to_recipients:
@@ -1611,49 +2412,61 @@ class ConversationManager:
     async def gmail_send_draft(self) -> str:
         if not self.last_draft_google:
             return "Error: No draft to send."
-        s = _gmail_service()
-        profile = s.users().getProfile(userId='me').execute()
-        message = EmailMessage()
-        message.set_content(self.last_draft_google['body'])
-        message['To'] = self.last_draft_google['to']
-        message['From'] = profile['emailAddress']
-        message['Subject'] = self.last_draft_google['subject']
+        # The account identity already holds the profile address; it is loaded once per session.
+        await self._ensure_account_identity()
+        from_addr = self.account_identity.get("email")
+        if not from_addr:
+            from_addr = (await _gmail_get("/users/me/profile"))['emailAddress']
+        draft = self.last_draft_google
+        extra_headers: Dict[str, str] = {}
         if self.current_email_context and self.current_email_context.get('message-id'):
-            message['In-Reply-To'] = self.current_email_context['message-id']
+            extra_headers['In-Reply-To'] = self.current_email_context['message-id']
             refs = self.current_email_context.get('references', '').strip()
-            message['References'] = (refs + " " if refs else "") + self.current_email_context['message-id']
-            body = {'raw': base64.urlsafe_b64encode(message.as_bytes()).decode(), 'threadId': self.current_email_context['threadId']}
-        else:
-            body = {'raw': base64.urlsafe_b64encode(message.as_bytes()).decode()}
-        s.users().messages().send(userId='me', body=body).execute()
-        if self.current_email_context:
-            await self.gmail_mark_as_read(self.current_email_context['id'])
-        await self.clear_draft()
+            extra_headers['References'] = (refs + " " if refs else "") + self.current_email_context['message-id']
+        raw = _build_rfc822(draft['to'], draft['subject'], draft['body'], from_addr, extra_headers)
+        body = {'raw': base64.urlsafe_b64encode(raw).decode("ascii")}
+        if extra_headers:
+            body['threadId'] = self.current_email_context['threadId']
+        await gmail_request("POST", "/users/me/messages/send", json=body)
+        handled_id = self.current_email_context.get('id') if self.current_email_context else None
         self.current_email_context = None
-        await self.update_context_display()
+
+        async def _mark_read() -> None:
+            # The message is already sent; a failed mark-as-read must not turn that into an error.
+            try:
+                await self.gmail_mark_as_read(handled_id)
+            except Exception as e:
+                print(f"[Gmail send mark-as-read warning] {e}")
+
+        # The mark-as-read round trip runs alongside the two UI pushes instead of ahead of them.
+        await asyncio.gather(
+            _mark_read() if handled_id else asyncio.sleep(0),
+            self.clear_draft(),
+            self.update_context_display(),
+        )
         return "Email sent."
 
-    async def _gmail_context_action(self, message_id: Optional[str], action_func: callable, success_msg: str, clear_ctx: bool = True) -> str:
+    async def _gmail_context_action(self, message_id: Optional[str], action: str, body: Optional[Dict[str, Any]], success_msg: str, clear_ctx: bool = True) -> str:
         target_id = message_id or (self.current_email_context and self.current_email_context.get('id'))
         if not target_id:
             return "Error: No message ID."
-        action_func(userId='me', id=target_id).execute()
+        await gmail_request("POST", f"/users/me/messages/{target_id}/{action}", json=body)
         if clear_ctx and self.current_email_context and self.current_email_context.get('id') == target_id:
             self.current_email_context = None
             await self.update_context_display()
         return success_msg
 
     async def gmail_delete_email(self, message_id: Optional[str] = None) -> str:
-        return await self._gmail_context_action(message_id, _gmail_service().users().messages().trash, "Email deleted.")
+        return await self._gmail_context_action(message_id, "trash", None, "Email deleted.")
 
     async def gmail_archive_email(self, message_id: Optional[str] = None) -> str:
-        return await self._gmail_context_action(message_id, lambda **kwargs: _gmail_service().users().messages().modify(**kwargs, body={'removeLabelIds': ['INBOX']}), "Email archived.")
+        return await self._gmail_context_action(message_id, "modify", {'removeLabelIds': ['INBOX']}, "Email archived.")
 
     async def gmail_mark_as_read(self, message_id: Optional[str] = None) -> str:
         target_id = message_id or (self.current_email_context and self.current_email_context.get('id'))
         if not target_id:
             return "Error: No message ID."
-        result = await self._gmail_context_action(target_id, lambda **kwargs: _gmail_service().users().messages().modify(**kwargs, body={'removeLabelIds': ['UNREAD']}), "Email marked as read.", clear_ctx=False)
+        result = await self._gmail_context_action(target_id, "modify", {'removeLabelIds': ['UNREAD']}, "Email marked as read.", clear_ctx=False)
         self._remember_handled_email(target_id)
         self._announced_unread_ids.discard(target_id)
         return result
@@ -1662,39 +2475,31 @@ class ConversationManager:
         target_id = message_id or (self.current_email_context and self.current_email_context.get('id'))
         if not target_id:
             return "Error: No message ID."
-        result = await self._gmail_context_action(target_id, lambda **kwargs: _gmail_service().users().messages().modify(**kwargs, body={'addLabelIds': ['UNREAD']}), "Email marked as unread.", clear_ctx=False)
+        result = await self._gmail_context_action(target_id, "modify", {'addLabelIds': ['UNREAD']}, "Email marked as unread.", clear_ctx=False)
         self._forget_handled_email(target_id)
         self._announced_unread_ids.discard(target_id)
         return result
 
     async def gmail_mark_all_read(self) -> str:
-        service = _gmail_service()
         processed_ids: Set[str] = set()
         max_loops = 40
         loop_count = 0
         try:
             while loop_count < max_loops:
                 loop_count += 1
-                response = service.users().messages().list(
-                    userId="me",
-                    q="in:inbox is:unread",
-                    maxResults=500,
-                ).execute()
+                response = await _gmail_get("/users/me/messages", params={"q": "in:inbox is:unread", "maxResults": 500})
                 messages = response.get("messages", [])
                 if not messages:
                     break
                 ids = [m.get("id") for m in messages if m.get("id")]
                 if not ids:
                     break
-                service.users().messages().batchModify(
-                    userId="me",
-                    body={"ids": ids, "removeLabelIds": ["UNREAD"]},
-                ).execute()
+                await gmail_request("POST", "/users/me/messages/batchModify", json={"ids": ids, "removeLabelIds": ["UNREAD"]})
                 processed_ids.update(ids)
                 if len(messages) < 500:
                     # likely no more unread messages; loop reiterates to confirm
                     continue
-        except HttpError as exc:
+        except RuntimeError as exc:
             await self._after_bulk_mark_read(processed_ids)
             return f"Error marking Gmail messages as read: {exc}"
 
@@ -1711,11 +2516,28 @@ class ConversationManager:
         return "Your Gmail inbox is already clear."
 
     # --- MICROSOFT TOOL IMPLEMENTATIONS ---
+    def _outlook_contact(self, m: Dict[str, Any]) -> Dict[str, Any]:
+        sender = (m.get('from', {}) or {}).get('emailAddress', {}) or {}
+        sender_name = (sender.get('name') or "").strip()
+        sender_email = (sender.get('address') or "").strip()
+        return {
+            "id": m.get('id'),
+            "from": _format_display(sender_name, sender_email) or "...",
+            "from_name": sender_name,
+            "from_email": sender_email,
+            "subject": m.get('subject') or "(No Subject)",
+            "received": m.get('receivedDateTime', ""),
+            "body_preview": (m.get('bodyPreview') or "")[:200],
+            "service": self.service_type,
+        }
+
     async def outlook_search_emails(self, query: str = "", max_results: int = 5, publish: bool = True) -> str:
         if publish:
             await self._ensure_account_identity()
         inbox_endpoint = "/me/mailFolders('Inbox')/messages"
-        if not query or not query.strip():
+        # A double quote inside the phrase would end the $search string early and fail the request.
+        safe_query = (query or "").strip().replace('"', '')
+        if not safe_query:
             params = {
                 "$orderby": "receivedDateTime desc",
                 "$top": max_results,
@@ -1724,54 +2546,40 @@ class ConversationManager:
             }
             r = await graph_request("GET", inbox_endpoint, params=params)
         else:
+            # Graph rejects $filter alongside $search on messages, and isRead is not a searchable
+            # property, so over-fetch and drop read and handled mail below.
             params = {
-                "$search": f'"{query}"',
+                "$search": f'"{safe_query}"',
                 "$top": max_results * 3,
                 "$select": "id,subject,from,receivedDateTime,bodyPreview,isRead"
             }
             r = await graph_request("GET", inbox_endpoint, params=params)
 
-        messages = r.json().get("value", [])
+        messages = orjson.loads(r.content).get("value", [])
         email_list = []
         for m in messages:
             if m.get("isRead"):
                 continue
             if self._is_handled_email(m.get('id')):
                 continue
-            sender = (m.get('from', {}) or {}).get('emailAddress', {}) or {}
-            sender_name = (sender.get('name') or "").strip()
-            sender_email = (sender.get('address') or "").strip()
-            if sender_name and sender_email:
-                sender_display = f"{sender_name} <{sender_email}>"
-            else:
-                sender_display = sender_name or sender_email or "..."
-            contact = {
-                "id": m.get('id'),
-                "from": sender_display,
-                "from_name": sender_name,
-                "from_email": sender_email,
-                "subject": m.get('subject') or "(No Subject)",
-                "received": m.get('receivedDateTime', ""),
-                "body_preview": (m.get('bodyPreview') or "")[:200],
-                "service": self.service_type,
-            }
+            contact = self._outlook_contact(m)
             email_list.append(contact)
             if publish:
                 self._merge_contact(contact)
             if len(email_list) >= max_results:
                 break
         if not email_list:
-            return "No emails found." if not query.strip() else f"No emails found for '{query}'"
+            return "No emails found." if not safe_query else f"No emails found for '{query}'"
         if publish:
             await self._publish_people_list()
-        return json.dumps(email_list)
+        return orjson.dumps(email_list).decode()
 
     async def outlook_read_email(self, message_id: Optional[str] = None) -> str:
         target_id = message_id or (self.current_email_context and self.current_email_context.get('id'))
         if not target_id:
             return "Error: No message ID."
         context, body_text = await self._load_outlook_email_into_context(target_id, mark_read=True)
-        return json.dumps({
+        return orjson.dumps({
             "id": context['id'],
             "from": context['from'],
             "from_name": context.get('from_name', ''),
@@ -1782,37 +2590,37 @@ class ConversationManager:
             "cc": context.get('cc', ''),
             "received": context.get('date', ''),
             "body_preview": body_text[:1000]
-        })
+        }).decode()
 
     async def outlook_summarize_email(self) -> str:
         if not self.current_email_context:
             return "Error: No email in context."
-        r = await graph_request(
-            "GET",
-            f"/me/messages/{self.current_email_context['id']}",
-            params={"$select": "body"},
-            headers={"Prefer": 'outlook.body-content-type="text"'}
-        )
-        body_text = ((r.json().get('body', {}) or {}).get('content', '') or '')
+        preview = self.current_email_context.get('body_preview') or ""
+        if preview and len(preview) >= self.current_email_context.get('body_length', len(preview) + 1):
+            # The whole text body already fit in the preview when the email was loaded.
+            body_text = preview
+        else:
+            r = await graph_request(
+                "GET",
+                f"/me/messages/{self.current_email_context['id']}",
+                params={"$select": "body"},
+                headers={"Prefer": 'outlook.body-content-type="text"'}
+            )
+            body_text = ((orjson.loads(r.content).get('body', {}) or {}).get('content', '') or '')
         sender_name = self.current_email_context.get('from_name') or ""
         sender_email = self.current_email_context.get('from_email') or ""
         subject = self.current_email_context.get('subject') or ""
         to_line = self.current_email_context.get('to') or "(you)"
         cc_line = self.current_email_context.get('cc') or ""
         received = self.current_email_context.get('date') or ""
-        prompt = (
-            "Provide a concise, user-friendly summary of this Outlook email.\n"
-            "Mention the sender by name, include their email address, cover the main points, and note any requests, deadlines, or attachments.\n"
-            "If a response is implied, suggest how the user might reply.\n"
-            "Keep the summary under 170 words.\n\n"
+        prompt = _SUMMARY_PREAMBLE_OUTLOOK + (
             f"Metadata:\nSubject: {subject}\nFrom: {sender_name} <{sender_email}>\nTo: {to_line}\nCc: {cc_line}\nReceived: {received}\n\n"
             f"Email Body:\n```\n{body_text}\n```"
         )
         payload = {"model": REALTIME_MODEL, "messages": [{"role": "user", "content": prompt}], "temperature": 0.4}
-        headers = {"Authorization": f"Bearer {OPENAI_API_KEY}"}
-        resp = await _client().post(f"{OPENAI_BASE_URL.rstrip('/')}/v1/chat/completions", json=payload, headers=headers)
+        resp = await _openai_chat(payload)
         resp.raise_for_status()
-        summary = resp.json()["choices"][0]["message"]["content"]
+        summary = orjson.loads(resp.content)["choices"][0]["message"]["content"]
         if self.current_email_context and not self._is_handled_email(self.current_email_context.get('id')):
             try:
                 await self.outlook_mark_as_read(self.current_email_context['id'])
@@ -1830,7 +2638,7 @@ class ConversationManager:
             "toRecipients": [{"emailAddress": {"address": addr}} for addr in recipients]
         }
         r = await graph_request("POST", "/me/messages", json=message)
-        self.last_draft_microsoft_id = r.json().get("id")
+        self.last_draft_microsoft_id = orjson.loads(r.content).get("id")
         await self.show_draft(", ".join(recipients), subject, body)
         return "Draft created. Ask user to confirm."
 
@@ -1839,7 +2647,7 @@ class ConversationManager:
             return "Error: No email context to reply to."
         reply_payload = {"comment": body}
         r = await graph_request("POST", f"/me/messages/{self.current_email_context['id']}/createReply", json=reply_payload)
-        draft = r.json() if r.content else {}
+        draft = orjson.loads(r.content) if r.content else {}
         draft_id = draft.get('id')
         if not draft_id:
             try:
@@ -1847,9 +2655,8 @@ class ConversationManager:
                     "GET",
                     "/me/messages?$filter=isDraft eq true&$orderby=receivedDateTime desc&$top=10&$select=id,subject,toRecipients"
                 )
-                for m in search_r.json().get("value", []):
-                    subj = (m.get("subject") or "").lower()
-                    if subj.startswith("re:") or subj.startswith("fw:"):
+                for m in orjson.loads(search_r.content).get("value", []):
+                    if (m.get("subject") or "")[:3].lower() in ("re:", "fw:"):
                         draft_id = m.get("id")
                         draft = m
                         break
@@ -1865,19 +2672,26 @@ class ConversationManager:
     async def outlook_send_draft(self) -> str:
         if not self.last_draft_microsoft_id:
             return "Error: No draft to send."
+        handled_id = self.current_email_context.get('id') if self.current_email_context else None
+        mark_read = bool(handled_id) and not self._is_handled_email(handled_id)
+        # The send and the mark-as-read of the message being answered share one $batch round trip.
+        requests = [{"id": "send", "method": "POST", "url": f"/me/messages/{self.last_draft_microsoft_id}/send", "body": {}, "headers": {"Content-Type": "application/json"}}]
+        if mark_read:
+            requests.append({"id": "read", "method": "PATCH", "url": f"/me/messages/{handled_id}", "body": {"isRead": True}, "headers": {"Content-Type": "application/json"}})
         try:
-            await graph_request("POST", f"/me/messages/{self.last_draft_microsoft_id}/send")
+            responses = await graph_batch(requests)
+            _graph_batch_body(responses.get("send"))
         except Exception as e:
             return f"Error: Could not send the draft. {e}"
-        handled_id = self.current_email_context.get('id') if self.current_email_context else None
-        await self.clear_draft()
-        if handled_id and not self._is_handled_email(handled_id):
+        if mark_read:
             try:
-                await self.outlook_mark_as_read(handled_id)
+                _graph_batch_body(responses.get("read"))
+                self._remember_handled_email(handled_id)
+                self._announced_unread_ids.discard(handled_id)
             except Exception as e:
                 print(f"[Outlook send mark-as-read warning] {e}")
         self.current_email_context = None
-        await self.update_context_display()
+        await asyncio.gather(self.clear_draft(), self.update_context_display())
         return "Email sent."
 
     async def outlook_delete_email(self, message_id: Optional[str] = None) -> str:
@@ -1894,11 +2708,14 @@ class ConversationManager:
         target_id = message_id or (self.current_email_context and self.current_email_context.get('id'))
         if not target_id:
             return "Error: No message ID."
-        r = await graph_request("GET", "/me/mailFolders?$filter=wellKnownName eq 'archive'")
-        folders = r.json().get("value", [])
-        if not folders:
-            return "Error: Could not find Archive folder."
-        await graph_request("POST", f"/me/messages/{target_id}/move", json={"destinationId": folders[0]['id']})
+        if not self._archive_folder_id:
+            # Folder ids are stable for the mailbox, so the lookup happens once per session.
+            r = await graph_request("GET", "/me/mailFolders?$filter=wellKnownName eq 'archive'")
+            folders = orjson.loads(r.content).get("value", [])
+            if not folders:
+                return "Error: Could not find Archive folder."
+            self._archive_folder_id = folders[0]['id']
+        await graph_request("POST", f"/me/messages/{target_id}/move", json={"destinationId": self._archive_folder_id})
         if self.current_email_context and self.current_email_context.get('id') == target_id:
             self.current_email_context = None
             await self.update_context_display()
@@ -1938,17 +2755,32 @@ class ConversationManager:
                     "$select": "id",
                 }
                 response = await graph_request("GET", "/me/mailFolders('Inbox')/messages", params=params)
-                messages = response.json().get("value", [])
+                messages = orjson.loads(response.content).get("value", [])
                 ids = [m.get("id") for m in messages if m.get("id")]
                 if not ids:
                     break
-                for mid in ids:
+                # One $batch per 20 PATCHes. Graph throttles a mailbox at a few concurrent requests,
+                # so the batches go one after another (that is the in-flight cap) and throttled
+                # items are retried after their Retry-After.
+                patches = [
+                    {"id": str(i), "method": "PATCH", "url": f"/me/messages/{mid}", "body": {"isRead": True}, "headers": {"Content-Type": "application/json"}}
+                    for i, mid in enumerate(ids)
+                ]
+                responses: Dict[str, Dict[str, Any]] = {}
+                for i in range(0, len(patches), _GRAPH_BATCH_MAX):
+                    responses.update(await graph_batch_retrying(patches[i:i + _GRAPH_BATCH_MAX]))
+                page_ok = 0
+                for i, mid in enumerate(ids):
                     try:
-                        await graph_request("PATCH", f"/me/messages/{mid}", json={"isRead": True})
+                        _graph_batch_body(responses.get(str(i)))
                         processed_ids.add(mid)
+                        page_ok += 1
                     except RuntimeError as exc:
                         failures += 1
                         print(f"[OUTLOOK MARK ALL WARNING] Failed to update {mid}: {exc}")
+                if not page_ok:
+                    # Nothing on this page could be updated; re-reading it would return the same ids.
+                    break
                 if len(ids) < batch_size:
                     continue
         except RuntimeError as exc:
@@ -1975,53 +2807,42 @@ class ConversationManager:
 
     # --- UNIFIED CALENDAR TOOL IMPLEMENTATIONS ---
     async def calendar_list_events(self, time_min: Optional[str] = None, time_max: Optional[str] = None, max_results: int = 10, query: Optional[str] = None) -> str:
-        now_utc = datetime.datetime.utcnow()
-        start_dt = time_min or now_utc.isoformat()
-        end_dt = time_max or (now_utc + datetime.timedelta(days=7)).isoformat()
+        now_utc = datetime.datetime.now(datetime.timezone.utc)
+        start_dt = time_min or now_utc.strftime(_ZULU_FMT)
+        end_dt = time_max or (now_utc + datetime.timedelta(days=7)).strftime(_ZULU_FMT)
 
         if self.service_type == 'google':
             s = _calendar_service()
-            events_result = s.events().list(
+            events_result = await self._gapi(s.events().list(
                 calendarId='primary',
-                timeMin=start_dt + "Z",
-                timeMax=end_dt + "Z",
+                timeMin=_as_zulu(start_dt),
+                timeMax=_as_zulu(end_dt),
                 maxResults=max_results,
                 q=query or None,
                 singleEvents=True,
                 orderBy='startTime'
-            ).execute()
+            ))
             items = events_result.get('items', [])
             if not items:
                 return "No upcoming events found."
-            out = [{
+            return orjson.dumps([{
                 "id": ev.get('id'),
                 "summary": ev.get('summary', '(No title)'),
-                "start": ev.get('start', {}).get('dateTime'),
-                "end": ev.get('end', {}).get('dateTime'),
+                "start": (ev.get('start') or {}).get('dateTime'),
+                "end": (ev.get('end') or {}).get('dateTime'),
                 "location": ev.get('location', '')
-            } for ev in items]
-            return json.dumps(out)
+            } for ev in items]).decode()
         else:
-            params = {"startDateTime": start_dt, "endDateTime": end_dt, "$top": max_results, "$orderby": "start/dateTime"}
-            if query:
-                params["$filter"] = f"contains(subject,'{query}')"
-            r = await graph_request("GET", "/me/calendarView", params=params)
-            items = r.json().get("value", [])
+            r = await graph_request("GET", "/me/calendarView", params=_calendar_view_params(start_dt, end_dt, max_results, query))
+            items = orjson.loads(r.content).get("value", [])
             if not items:
                 return "No upcoming events found."
-            out = [{
-                "id": ev.get('id'),
-                "summary": ev.get('subject', '(No title)'),
-                "start": ev.get('start', {}).get('dateTime'),
-                "end": ev.get('end', {}).get('dateTime'),
-                "location": ev.get('location', {}).get('displayName', '')
-            } for ev in items]
-            return json.dumps(out)
+            return orjson.dumps(_outlook_event_rows(items)).decode()
 
     async def calendar_quick_add(self, text: str) -> str:
         if self.service_type != 'google':
             return "Quick add is only available for Google Calendar."
-        ev = _calendar_service().events().quickAdd(calendarId='primary', text=text).execute()
+        ev = await self._gapi(_calendar_service().events().quickAdd(calendarId='primary', text=text))
         return f"Event created: {ev.get('summary', '(No title)')}"
 
     async def calendar_create_event(self, summary: str, start_time: str, end_time: str, timezone: Optional[str] = None, location: Optional[str] = None, attendees: Optional[List[str]] = None) -> str:
@@ -2034,7 +2855,7 @@ class ConversationManager:
                 body["location"] = location
             if attendees:
                 body["attendees"] = [{"email": e} for e in attendees]
-            ev = _calendar_service().events().insert(calendarId='primary', body=body, sendUpdates="all").execute()
+            ev = await self._gapi(_calendar_service().events().insert(calendarId='primary', body=body, sendUpdates="all"))
             return f"Event created: {ev.get('summary', summary)}."
         else:
             body = {
@@ -2046,27 +2867,27 @@ class ConversationManager:
                 body["location"] = {"displayName": location}
             if attendees:
                 body["attendees"] = [{"emailAddress": {"address": e}, "type": "required"} for e in attendees]
-            ev = (await graph_request("POST", "/me/events", json=body)).json()
+            ev = orjson.loads((await graph_request("POST", "/me/events", json=body)).content)
             return f"Event created: {ev.get('subject', summary)}."
 
     async def calendar_update_event_time(self, event_id: str, start_time: str, end_time: str, timezone: Optional[str] = None) -> str:
         start_rfc, end_rfc = _parse_rfc3339(start_time), _parse_rfc3339(end_time)
         if self.service_type == 'google':
             s = _calendar_service()
-            ev = s.events().get(calendarId='primary', eventId=event_id).execute()
+            ev = await self._gapi(s.events().get(calendarId='primary', eventId=event_id))
             ev['start']['dateTime'], ev['end']['dateTime'] = start_rfc, end_rfc
             if timezone:
                 ev['start']['timeZone'] = timezone; ev['end']['timeZone'] = timezone
-            ev_updated = s.events().update(calendarId='primary', eventId=event_id, body=ev, sendUpdates="all").execute()
+            ev_updated = await self._gapi(s.events().update(calendarId='primary', eventId=event_id, body=ev, sendUpdates="all"))
             return f"Event time updated for '{ev_updated.get('summary', '')}'."
         else:
             body = {"start": {"dateTime": start_rfc, "timeZone": timezone or "UTC"}, "end": {"dateTime": end_rfc, "timeZone": timezone or "UTC"}}
-            ev_updated = (await graph_request("PATCH", f"/me/events/{event_id}", json=body)).json()
+            ev_updated = orjson.loads((await graph_request("PATCH", f"/me/events/{event_id}", json=body)).content)
             return f"Event time updated for '{ev_updated.get('subject', '')}'."
 
     async def calendar_delete_event(self, event_id: str) -> str:
         if self.service_type == 'google':
-            _calendar_service().events().delete(calendarId='primary', eventId=event_id, sendUpdates="all").execute()
+            await self._gapi(_calendar_service().events().delete(calendarId='primary', eventId=event_id, sendUpdates="all"))
         else:
             await graph_request("DELETE", f"/me/events/{event_id}")
         if self.current_event_context and self.current_event_context.get("id") == event_id:
@@ -2075,34 +2896,31 @@ class ConversationManager:
         return "Event deleted."
 
     # --- AGENTIC CORE ---
-    async def _get_unread_email_summary(self) -> Tuple[str, List[Dict[str, Any]]]:
+    async def _get_unread_email_summary(self, prefetched: Optional[Dict[str, Any]] = None) -> Tuple[str, List[Dict[str, Any]]]:
         contacts: List[Dict[str, Any]] = []
         try:
             await self._ensure_account_identity()
-            now_utc = datetime.datetime.now(timezone.utc)
-            start_of_yesterday_utc = (now_utc - datetime.timedelta(days=1)).replace(
-                hour=0, minute=0, second=0, microsecond=0
-            )
-            start_time_iso_utc = start_of_yesterday_utc.isoformat().replace('+00:00', 'Z')
+            start_of_yesterday_utc = _start_of_yesterday_utc()
 
             if self.service_type == 'google':
                 after_date_str = start_of_yesterday_utc.strftime('%Y/%m/%d')
                 query = f"in:inbox is:unread after:{after_date_str}"
-                unread_json = await self.gmail_search_emails(query=query, max_results=5, publish=False)
+                emails_raw = await self._gmail_search(query=query, max_results=5, publish=False)
             else:
-                params = {
-                    "$filter": f"isRead eq false and receivedDateTime ge {start_time_iso_utc}",
-                    "$top": 5,
-                    "$select": "id,subject,from,receivedDateTime,bodyPreview"
-                }
-                r = await graph_request("GET", "/me/mailFolders('Inbox')/messages", params=params)
-                messages = r.json().get("value", [])
-                if not messages:
-                    return "You have no new emails since yesterday.", contacts
-                out = []
+                messages = None
+                if prefetched is not None:
+                    try:
+                        messages = _graph_batch_body(prefetched).get("value", [])
+                    except RuntimeError as e:
+                        # A per-item 429/5xx inside the batch: retry this read on its own.
+                        print(f"[STARTUP WARNING] batched mail read failed, retrying: {e}")
+                if messages is None:
+                    r = await graph_request("GET", "/me/mailFolders('Inbox')/messages", params=_outlook_unread_params(start_of_yesterday_utc))
+                    messages = orjson.loads(r.content).get("value", [])
+                emails_raw = []
                 for m in messages:
                     sender = _identity_from_graph((m.get('from', {}) or {}).get('emailAddress'))
-                    out.append({
+                    emails_raw.append({
                         "id": m.get('id'),
                         "from": sender.get('display') or sender.get('email') or sender.get('name') or "...",
                         "from_name": sender.get('name') or "",
@@ -2112,12 +2930,9 @@ class ConversationManager:
                         "body_preview": (m.get('bodyPreview') or "")[:200],
                         "service": self.service_type,
                     })
-                unread_json = json.dumps(out)
-
-            if "No emails found" in unread_json:
-                return "You have no new emails since yesterday.", contacts
 
-            emails = [e for e in json.loads(unread_json) if not self._is_handled_email(e.get("id"))]
+            handled = self._handled_email_ids
+            emails = [e for e in emails_raw if e.get("id") not in handled]
             if not emails:
                 return "You have no new emails since yesterday.", contacts
             for e in emails:
@@ -2146,22 +2961,26 @@ class ConversationManager:
             print(f"[STARTUP ERROR] checking unread mail: {e}")
             return "Could not check for new emails.", contacts
 
-    async def _get_todays_events_summary(self) -> str:
+    async def _get_todays_events_summary(self, prefetched: Optional[Dict[str, Any]] = None) -> str:
         try:
-            now = datetime.datetime.now().astimezone()
-            start_of_day = now.replace(hour=0, minute=0, second=0, microsecond=0)
-            end_of_day = now.replace(hour=23, minute=59, second=59, microsecond=999999)
-
-            events_json = await self.calendar_list_events(
-                time_min=start_of_day.isoformat(),
-                time_max=end_of_day.isoformat(),
-                max_results=5
-            )
+            events = None
+            if prefetched is not None:
+                try:
+                    events = _outlook_event_rows(_graph_batch_body(prefetched).get("value", []))
+                except RuntimeError as e:
+                    print(f"[STARTUP WARNING] batched calendar read failed, retrying: {e}")
+            if events is None:
+                start_of_day, end_of_day = _today_bounds()
+                events_json = await self.calendar_list_events(
+                    time_min=start_of_day,
+                    time_max=end_of_day,
+                    max_results=5
+                )
+                events = [] if "No upcoming events found" in events_json else orjson.loads(events_json)
 
-            if "No upcoming events found" in events_json:
+            if not events:
                 return "You have no events scheduled for today."
 
-            events = json.loads(events_json)
             count = len(events)
             plural = "s" if count > 1 else ""
             titles = [e['summary'] for e in events[:3]]
@@ -2175,14 +2994,26 @@ class ConversationManager:
 
     async def _get_startup_summary(self) -> str:
         try:
+            mail_page = events_page = None
+            if self.service_type != 'google':
+                # Outlook: the inbox and calendar reads share one $batch round trip. If the batch
+                # or one of its items fails, that summary falls back to its own request.
+                try:
+                    responses = await graph_batch([
+                        {"id": "mail", "method": "GET", "url": _graph_url("/me/mailFolders('Inbox')/messages", _outlook_unread_params(_start_of_yesterday_utc()))},
+                        {"id": "events", "method": "GET", "url": _graph_url("/me/calendarView", _calendar_view_params(*_today_bounds(), 5))},
+                    ])
+                    mail_page, events_page = responses.get("mail"), responses.get("events")
+                except Exception as e:
+                    print(f"[STARTUP WARNING] Graph batch failed: {e}")
             (email_summary, contacts), event_summary = await asyncio.gather(
-                self._get_unread_email_summary(),
-                self._get_todays_events_summary()
+                self._get_unread_email_summary(mail_page),
+                self._get_todays_events_summary(events_page)
             )
-            self.recent_contacts = []
+            self._contact_index.clear()
             for contact in contacts:
                 self._merge_contact(contact)
-            self._announced_unread_ids = {contact.get("id") for contact in contacts if contact.get("id")}
+            self._announced_unread_ids = _BoundedSet(contact.get("id") for contact in contacts if contact.get("id"))
             await self._publish_people_list()
             return f"{email_summary} {event_summary}"
         except Exception as e:
@@ -2192,6 +3023,11 @@ class ConversationManager:
     async def start(self):
         try:
             await self.ws.send_json({"type": "update_status", "text": "Checking for updates..."})
+            await self.ws.flush()
+            await self._refresh_credentials()
+            if self.service_type == 'google':
+                # Build the session's Calendar service off the loop; later calls reuse it.
+                await asyncio.to_thread(_calendar_service)
             await self._ensure_account_identity()
             startup_summary = await self._get_startup_summary()
 
@@ -2200,15 +3036,13 @@ class ConversationManager:
                 "content": f"Here is the user's current status: {startup_summary}. Formulate a friendly and proactive welcome message based on this information, then ask them what they'd like to do. Be conversational."
             })
 
-            client = _client()
-            payload = {"model": REALTIME_MODEL, "messages": self.history, "temperature": 0.7}
-            headers = {"Authorization": f"Bearer {OPENAI_API_KEY}"}
-            r = await client.post(f"{OPENAI_BASE_URL.rstrip('/')}/v1/chat/completions", json=payload, headers=headers)
+            payload = {"model": REALTIME_MODEL, "messages": self._messages(), "temperature": 0.7}
+            r = await _openai_chat(payload)
             if r.status_code >= 400:
                 print(f"[OPENAI 4xx on start] {r.status_code} :: {r.text[:5000]}")
                 initial_greeting = "Hello. I could not load your status, but I am ready. What do you want to do?"
             else:
-                response_message = r.json()["choices"][0]["message"]
+                response_message = orjson.loads(r.content)["choices"][0]["message"]
                 initial_greeting = response_message.get("content", "Hello! How can I help you today?")
                 self.history.append(response_message)
 
@@ -2228,17 +3062,19 @@ class ConversationManager:
         await self.append_chat("user", transcript)
         await self.ws.send_json({"type": "suggestions", "items": []})
         await self.ws.send_json({"type": "update_status", "text": "Thinking..."})
+        await self.ws.flush()
         self.history.append({"role": "user", "content": transcript})
+        if _RECHECK_RE.search(transcript):
+            self._tool_cache.clear()
         try:
-            client = _client()
-            payload = {"model": REALTIME_MODEL, "messages": self.history, "tools": self.tools, "tool_choice": "auto"}
-            headers = {"Authorization": f"Bearer {OPENAI_API_KEY}"}
-            r = await client.post(f"{OPENAI_BASE_URL.rstrip('/')}/v1/chat/completions", json=payload, headers=headers)
+            await self._refresh_credentials()
+            payload = {"model": REALTIME_MODEL, "messages": self._messages(), "tools": self.tools, "tool_choice": "auto"}
+            r = await _openai_chat(payload)
             if r.status_code >= 400:
                 print(f"[OPENAI 4xx] {r.status_code} :: {r.text[:5000]}")
                 await self.send_audio_response("I had trouble understanding that. Can you rephrase?", "Tap the mic to reply...")
                 return
-            response_message = r.json()["choices"][0]["message"]
+            response_message = orjson.loads(r.content)["choices"][0]["message"]
             self.history.append(response_message)
             if response_message.get("tool_calls"):
                 await self.execute_tool_calls(response_message["tool_calls"])
@@ -2248,6 +3084,28 @@ class ConversationManager:
             print(f"[AGENT ERROR] {traceback.format_exc()}")
             await self.send_audio_response("I hit an error. Please try again.", "Error")
 
+    async def _get_cached_or_call(self, name: str, function: Any, args: Dict[str, Any]) -> Any:
+        ttl = _TOOL_TTL.get(name)
+        if not ttl:
+            self._tool_cache.clear()
+            return await function(**args)
+        # Mail search is case-insensitive, so "Invoices " and "invoices" share an entry.
+        key_args = {**args, "query": args["query"].strip().lower()} if isinstance(args.get("query"), str) else args
+        key = (self.service_type, name, orjson.dumps(key_args, option=orjson.OPT_SORT_KEYS))
+        now = time.monotonic()
+        hit = self._tool_cache.get(key)
+        if hit and hit[0] > now:
+            return hit[1]
+        result = await function(**args)
+        if not str(result).startswith("Error"):
+            self._tool_cache[key] = (now + ttl, result)
+            overflow = len(self._tool_cache) - _TOOL_CACHE_MAX
+            if overflow > 0:
+                # Evict the entries closest to expiring first.
+                for old_key in sorted(self._tool_cache, key=lambda k: self._tool_cache[k][0])[:overflow]:
+                    self._tool_cache.pop(old_key, None)
+        return result
+
     async def execute_tool_calls(self, tool_calls: List[Dict]):
         tool_functions = {
             # Gmail
@@ -2271,7 +3129,7 @@ class ConversationManager:
         }
         for tool_call in tool_calls:
             function_name = tool_call['function']['name']
-            function_args = json.loads(tool_call['function']['arguments'] or "{}")
+            function_args = orjson.loads(tool_call['function']['arguments'] or "{}")
             function = tool_functions.get(function_name)
             if not function:
                 warning = f"Tool '{function_name}' is not implemented."
@@ -2282,22 +3140,21 @@ class ConversationManager:
             status_msg = _tool_status_message(function_name, function_args, self.service_type)
             if status_msg:
                 await self.ws.send_json({"type": "update_status", "text": status_msg})
+                await self.ws.flush()
 
             try:
-                function_response = await function(**function_args)
+                function_response = await self._get_cached_or_call(function_name, function, function_args)
             except Exception:
                 function_response = f"Error executing tool: {traceback.format_exc().splitlines()[-1]}"
             self.history.append({"tool_call_id": tool_call['id'], "role": "tool", "name": function_name, "content": function_response})
 
-        client = _client()
-        payload = {"model": REALTIME_MODEL, "messages": self.history}
-        headers = {"Authorization": f"Bearer {OPENAI_API_KEY}"}
-        r = await client.post(f"{OPENAI_BASE_URL.rstrip('/')}/v1/chat/completions", json=payload, headers=headers)
+        payload = {"model": REALTIME_MODEL, "messages": self._messages()}
+        r = await _openai_chat(payload)
         if r.status_code >= 400:
             print(f"[OPENAI 4xx after tools] {r.status_code} :: {r.text[:5000]}")
             await self.send_audio_response("Done. Anything else?", "Tap the mic to reply...")
             return
-        final_response = r.json()["choices"][0]["message"]
+        final_response = orjson.loads(r.content)["choices"][0]["message"]
         self.history.append(final_response)
         await self.send_audio_response(final_response.get("content", ""), "Tap the mic to reply...")
 
@@ -2319,7 +3176,17 @@ class ConversationManager:
 async def home(request: Request):
     session_id = _ensure_session_id(request.session)
     _get_session_state(session_id)
-    return HTMLResponse(CONVERSATIONAL_HTML)
+    headers = {"Cache-Control": "private, max-age=300", "Vary": "Accept-Encoding", "ETag": _HTML_ETAG}
+    if request.headers.get("if-none-match") == _HTML_ETAG:
+        return Response(status_code=304, headers=headers)
+    accept = request.headers.get("accept-encoding", "")
+    if _HTML_BR and "br" in accept:
+        return Response(content=_HTML_BR, media_type="text/html; charset=utf-8", headers={**headers, "Content-Encoding": "br"})
+    if "gzip" in accept:
+        return Response(content=_HTML_GZ, media_type="text/html; charset=utf-8", headers={**headers, "Content-Encoding": "gzip"})
+    return Response(content=_HTML_BYTES, media_type="text/html; charset=utf-8", headers=headers)
+
+_RANGE_RE = re.compile(r"bytes=(\d+)-(\d*)")
 
 @app.get("/audio/{audio_id}")
 async def get_audio(audio_id: str, request: Request, range: Optional[str] = Header(None)):
@@ -2327,23 +3194,39 @@ async def get_audio(audio_id: str, request: Request, range: Optional[str] = Head
     if not session_id:
         return PlainTextResponse("Not Found", status_code=404)
     audio_data = _get_audio_bytes(session_id, audio_id)
+    if isinstance(audio_data, SpeechStream):
+        if not audio_data.done:
+            # Still generating: stream it (no ranges until the length is known).
+            return StreamingResponse(audio_data.iter_bytes(), media_type="audio/mpeg", headers={"Cache-Control": "no-store"})
+        if audio_data.error is not None:
+            # A stream that failed partway holds a truncated MP3; don't serve it as a good file.
+            return PlainTextResponse("Speech generation failed", status_code=502)
+        # Finished streams no longer grow, so a view over the buffer stands in for a copy.
+        audio_data = memoryview(audio_data.buf)
     if not audio_data:
         return PlainTextResponse("Not Found", status_code=404)
     file_size = len(audio_data)
     headers = {"Content-Type": "audio/mpeg", "Accept-Ranges": "bytes", "Cache-Control": "no-store"}
     if range is None:
         headers["Content-Length"] = str(file_size)
+        if isinstance(audio_data, memoryview):
+            return StreamingResponse(_iter_view(audio_data), headers=headers, status_code=200)
         return Response(content=audio_data, headers=headers, status_code=200)
-    match = re.search(r"bytes=(\d+)-(\d*)", range)
+    match = _RANGE_RE.match(range.strip())
     if not match:
         return PlainTextResponse("Invalid Range header", status_code=416)
     start, end = int(match.group(1)), int(match.group(2)) if match.group(2) else file_size - 1
+    end = min(end, file_size - 1)
     if start >= file_size or start > end:
         return PlainTextResponse("Range not satisfiable", status_code=416)
-    content = audio_data[start:end + 1]
-    headers["Content-Length"] = str(len(content))
+    headers["Content-Length"] = str(end + 1 - start)
     headers["Content-Range"] = f"bytes {start}-{end}/{file_size}"
-    return Response(content=content, headers=headers, status_code=206)
+    return StreamingResponse(_iter_view(memoryview(audio_data)[start:end + 1]), headers=headers, status_code=206)
+
+async def _iter_view(view: memoryview, chunk_size: int = 65536):
+    # Copies one chunk at a time out of the cached audio instead of slicing the whole range.
+    for offset in range(0, len(view), chunk_size):
+        yield view[offset:offset + chunk_size].tobytes()
 
 @app.websocket("/ws")
 async def websocket_endpoint(websocket: WebSocket):
@@ -2354,13 +3237,13 @@ async def websocket_endpoint(websocket: WebSocket):
         service = "none"
         state = _get_session_state()
         google_creds = state.get("google_creds")
-        if isinstance(google_creds, Credentials) and getattr(google_creds, "valid", False):
+        if _google_connected(google_creds):
             service = "google"
         else:
             ms_token = state.get("ms_token")
             if ms_token and ms_token.get("access_token"):
                 try:
-                    _require_ms_token()
+                    await _require_ms_token()
                     service = "microsoft"
                 except RuntimeError:
                     service = "none"
@@ -2369,17 +3252,37 @@ async def websocket_endpoint(websocket: WebSocket):
             await websocket.close(code=1008, reason="No service connected")
             return
 
-        manager = ConversationManager(websocket, service_type=service)
-        await manager.start()
+        binary_audio = websocket.query_params.get("binary_audio") == "1"
+        manager = ConversationManager(websocket, service_type=service, binary_audio=binary_audio)
+        # Other tabs of this session may still be playing /audio URLs; count the open sockets.
+        state["open_sockets"] = state.get("open_sockets", 0) + 1
+        mic_queue: Optional[asyncio.Queue] = None
+        mic_upload: Optional[asyncio.Task] = None
         try:
+            await manager.start()
             while True:
                 packet = await websocket.receive()
                 if packet.get("type") == "websocket.disconnect":
                     break
                 if packet.get("bytes"):
+                    data = packet["bytes"]
+                    header = data[0]
+                    if header in (MIC_CONTINUE, MIC_END):
+                        if mic_upload is None:
+                            mic_queue = asyncio.Queue()
+                            mic_upload = asyncio.create_task(transcribe_stream(mic_queue))
+                        if len(data) > 1:
+                            mic_queue.put_nowait(data[1:])
+                        if header == MIC_CONTINUE:
+                            continue
+                        mic_queue.put_nowait(None)
                     transcript = ""
                     try:
-                        transcript = await transcribe_bytes(packet["bytes"])
+                        if mic_upload is not None:
+                            upload, mic_upload, mic_queue = mic_upload, None, None
+                            transcript = await upload
+                        else:
+                            transcript = await transcribe_bytes(data)
                     except Exception as e:
                         print(f"[STT ERROR] {e}")
                     if not transcript:
@@ -2388,13 +3291,18 @@ async def websocket_endpoint(websocket: WebSocket):
                     await manager.process_user_message(transcript)
                 elif packet.get("text"):
                     try:
-                        await manager.handle_ws_packet(json.loads(packet["text"]))
+                        await manager.handle_ws_packet(orjson.loads(packet["text"]))
                     except Exception:
                         continue
         except WebSocketDisconnect:
             print("Client disconnected.")
         finally:
+            if mic_upload is not None:
+                mic_upload.cancel()
             await manager.stop()
+            state["open_sockets"] -= 1
+            if not state["open_sockets"]:
+                state["audio_cache"].clear()
 
 # --- AUTH ENDPOINTS ---
 @app.get("/api/status")
@@ -2403,15 +3311,20 @@ def get_auth_status(request: Request):
     if not session_id:
         session_id = _ensure_session_id(request.session)
     available = [name for name, enabled in AVAILABLE_SERVICES.items() if enabled]
+    connected = "none"
     if session_id:
         state = _get_session_state(session_id)
         google_creds = state.get("google_creds")
-        if isinstance(google_creds, Credentials) and getattr(google_creds, "valid", False):
-            return {"connected_service": "google", "available_services": available}
-        ms_token = state.get("ms_token") or {}
-        if ms_token.get("access_token"):
-            return {"connected_service": "microsoft", "available_services": available}
-    return {"connected_service": "none", "available_services": available}
+        if _google_connected(google_creds):
+            connected = "google"
+        elif (state.get("ms_token") or {}).get("access_token"):
+            connected = "microsoft"
+    body = orjson.dumps({"connected_service": connected, "available_services": available})
+    etag = f'"{hashlib.blake2b(body, digest_size=8).hexdigest()}"'
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
 
 # Google OAuth
 @app.get("/gmail/login")
@@ -3,12 +3,16 @@
 Email→Voice Assistant + Gmail Inbox (Single File, Conversational)
 - Greets you and announces unread email count on start.
 - Guides you through emails via voice commands.
-- "Hear all" or select → summarize each + speak (Realtime WS → HTTP fallback)
+- "Hear all" or select → summarize each + speak, streamed to the browser (Realtime WS → HTTP fallback)
 - After each email, you can speak a command: respond / confirm / ignore
+  (mic PCM is streamed over /assistant/stream and transcribed live by the Realtime API)
 
 Install:
-  pip install fastapi uvicorn httpx "websockets>=12" python-dotenv twilio \
+  pip install fastapi uvicorn "httpx[http2]" "websockets>=12" orjson python-dotenv twilio \
               google-auth google-auth-oauthlib google-api-python-client
+  Optional: pip install redisvl   (semantic cache for chat completions, set REDIS_URL)
+            pip install selectolax (HTML email bodies → text before summarizing)
+            pip install faster-whisper (local command transcription, set LOCAL_WHISPER_MODEL=small.en)
 
 Run:
   uvicorn app:app --host 0.0.0.0 --port 8000 --reload
@@ -17,14 +21,14 @@ Env (.env):
   (Same as before)
 """
 
-import os, io, json, base64, re
-from typing import Optional, List, Dict, Any
-from email.message import EmailMessage
+import os, base64, binascii, re, secrets, asyncio, hashlib, threading, html, gzip
+from typing import Optional, List, Dict, Any, AsyncIterator
+from email.header import Header
 
-import httpx, websockets
-from fastapi import FastAPI, Form, UploadFile, Query, Request
+import httpx, websockets, orjson
+from fastapi import FastAPI, Query, Request, Response, BackgroundTasks, WebSocket, WebSocketDisconnect
 from fastapi.responses import (
-    HTMLResponse, StreamingResponse, JSONResponse, PlainTextResponse, RedirectResponse
+    HTMLResponse, StreamingResponse, ORJSONResponse, PlainTextResponse, RedirectResponse
 )
 from dotenv import load_dotenv
 
@@ -39,6 +43,17 @@ from google_auth_oauthlib.flow import Flow
 from googleapiclient.discovery import build
 from googleapiclient.errors import HttpError
 
+# faster-whisper (optional – transcribe commands locally instead of via the Realtime API)
+try:
+    import numpy as np
+    from faster_whisper import WhisperModel
+except ImportError:
+    WhisperModel = None
+
+# selectolax (optional – faster, more accurate HTML→text for email bodies)
+try: from selectolax.parser import HTMLParser
+except ImportError: HTMLParser = None
+
 
 load_dotenv()
 
@@ -47,6 +62,12 @@ OPENAI_API_KEY   = os.getenv("OPENAI_API_KEY")
 OPENAI_BASE_URL  = os.getenv("OPENAI_BASE_URL", "https://api.openai.com")
 REALTIME_MODEL   = os.getenv("REALTIME_MODEL", "gpt-4o-mini")
 REALTIME_VOICE   = os.getenv("REALTIME_VOICE", "shimmer") # Let's use a different voice for variety
+TRANSCRIBE_MODEL = os.getenv("TRANSCRIBE_MODEL", "gpt-4o-mini-transcribe")
+LOCAL_WHISPER_MODEL = os.getenv("LOCAL_WHISPER_MODEL")  # e.g. "small.en"; empty = Realtime API
+TTS_FORMAT       = os.getenv("TTS_FORMAT", "opus")  # opus (Ogg) is far smaller than mp3 at speech bitrates
+# Ask the realtime server for raw binary audio frames instead of base64 JSON deltas (where supported)
+REALTIME_BINARY_AUDIO = os.getenv("REALTIME_BINARY_AUDIO", "false").lower() in ("1", "true", "yes")
+_MEDIA_TYPES     = {"opus": "audio/ogg", "mp3": "audio/mpeg", "aac": "audio/aac", "wav": "audio/wav"}
 
 # ---------- Twilio (optional) ----------
 TWILIO_ACCOUNT_SID    = os.getenv("TWILIO_ACCOUNT_SID")
@@ -60,113 +81,300 @@ GOOGLE_CLIENT_SECRET = os.getenv("GOOGLE_CLIENT_SECRET")
 GOOGLE_REDIRECT_URI  = os.getenv("GOOGLE_REDIRECT_URI", "http://localhost:8000/gmail/oauth2callback")
 GMAIL_SCOPES         = ["https://www.googleapis.com/auth/gmail.modify"]
 
+# ---------- Semantic LLM cache (optional) ----------
+REDIS_URL = os.getenv("REDIS_URL")
+_INTENT_CACHE = _SUMMARY_CACHE = None
+if REDIS_URL:
+    try:
+        from redisvl.extensions.cache.llm import SemanticCache
+        from redisvl.utils.vectorize import HFTextVectorizer
+        from redisvl.query.filter import Tag
+        _vec = HFTextVectorizer("redis/langcache-embed-v1")
+        # Intents are short and must match tightly; summaries tolerate more drift (recurring newsletters)
+        _INTENT_CACHE = SemanticCache(name="va_intent", redis_url=REDIS_URL, distance_threshold=0.05,
+                                      vectorizer=_vec, filterable_fields=[{"name": "context", "type": "tag"}])
+        _SUMMARY_CACHE = SemanticCache(name="va_summary", redis_url=REDIS_URL, distance_threshold=0.15,
+                                       vectorizer=_vec)
+    except Exception as e:
+        print("[Semantic cache disabled]:", e)
+
 if not OPENAI_API_KEY:
     raise RuntimeError("Set OPENAI_API_KEY in environment")
 
-app = FastAPI()
+app = FastAPI(default_response_class=ORJSONResponse)
+
+# Shared HTTP/2 client: keeps the TLS connection to the OpenAI API warm across calls
+_HTTP = httpx.AsyncClient(timeout=60, http2=True,
+                          limits=httpx.Limits(max_connections=100, max_keepalive_connections=20))
+
+@app.on_event("shutdown")
+async def _shutdown():
+    _cancel_prefetches()
+    await _HTTP.aclose()
 
 # In-memory demo state (single user)
-_LAST_AUDIO: bytes = b""
 _GMAIL_CREDS: Optional[Credentials] = None
+_GMAIL_LOCAL = threading.local()  # per-thread service (httplib2 isn't thread-safe), rebuilt on new creds
+_MY_EMAIL: Optional[str] = None   # our own address, looked up once per login
+_PENDING_FEEDBACK: Dict[str, str] = {}  # token -> feedback text, synthesized on fetch
+_SUMMARY_PREFETCH: Dict[str, "asyncio.Task[str]"] = {}  # email id -> in-flight/finished summary
+_WHISPER: Any = None  # faster-whisper model, loaded at startup when LOCAL_WHISPER_MODEL is set
+_TTS_CACHE: Dict[tuple, bytes] = {}  # (voice, fmt, md5(text)) -> finished audio for the canned phrases
+_TTS_CACHE_MAX_BYTES = int(os.getenv("TTS_CACHE_MAX_BYTES", str(4 * 1024 * 1024)))
+_tts_cache_bytes = 0
 
 # ======================= OpenAI Helpers =======================
+_CHAT_URL     = f"{OPENAI_BASE_URL}/v1/chat/completions"
+_JSON_HEADERS = {"Authorization": f"Bearer {OPENAI_API_KEY}", "Content-Type": "application/json"}
+
+async def _cache_lookup(cache: Any, prompt: str, tag: Optional[str] = None) -> Optional[str]:
+    if cache is None: return None
+    try:
+        hits = await cache.acheck(prompt=prompt, num_results=1,
+                                  filter_expression=(Tag("context") == tag) if tag else None)
+        return hits[0]["response"] if hits else None
+    except Exception as e:
+        print("[Semantic cache lookup failed]:", e); return None
+
+async def _cache_store(cache: Any, prompt: str, response: str, tag: Optional[str] = None):
+    if cache is None: return
+    try: await cache.astore(prompt=prompt, response=response, filters={"context": tag} if tag else None)
+    except Exception as e: print("[Semantic cache store failed]:", e)
 
 async def summarize_with_gpt(text: str, max_words: int = 60) -> str:
+    cached = await _cache_lookup(_SUMMARY_CACHE, text)
+    if cached: return cached
     system = (
         f"You write extremely concise summaries for drivers. "
         f"Keep it under {max_words} words. Keep names, dates, and amounts."
     )
-    url = f"{OPENAI_BASE_URL}/v1/chat/completions"
-    headers = {"Authorization": f"Bearer {OPENAI_API_KEY}", "Content-Type": "application/json"}
     payload = {"model": "gpt-4o-mini",
                "messages": [{"role": "system", "content": system},
                             {"role": "user", "content": f"Summarize clearly:\n\n{text}"}]}
-    async with httpx.AsyncClient(timeout=60) as client:
-        r = await client.post(url, headers=headers, json=payload)
-        r.raise_for_status()
-        return r.json()["choices"][0]["message"]["content"].strip()
+    r = await _HTTP.post(_CHAT_URL, headers=_JSON_HEADERS, json=payload)
+    r.raise_for_status()
+    summary = orjson.loads(r.content)["choices"][0]["message"]["content"].strip()
+    await _cache_store(_SUMMARY_CACHE, text, summary)
+    return summary
 
 
-async def tts_via_realtime(text: str, voice: Optional[str] = None, fmt: str = "mp3") -> bytes:
+async def tts_stream_realtime(text: str, voice: Optional[str] = None, fmt: str = TTS_FORMAT) -> AsyncIterator[bytes]:
     voice = voice or REALTIME_VOICE
     url = f"wss://api.openai.com/v1/realtime?model={REALTIME_MODEL}"
     headers = [("Authorization", f"Bearer {OPENAI_API_KEY}"), ("OpenAI-Beta", "realtime=v1")]
-    audio = io.BytesIO()
+    audio_cfg = {"voice": voice, "format": fmt}
+    if REALTIME_BINARY_AUDIO: audio_cfg["binary"] = True
     async with websockets.connect(url, extra_headers=headers, max_size=None) as ws:
-        await ws.send(json.dumps({
+        await ws.send(orjson.dumps({
             "type": "response.create",
-            "response": {"modalities": ["audio"], "instructions": text,
-                         "audio": {"voice": voice, "format": fmt}}
-        }))
+            "response": {"modalities": ["audio"], "instructions": text, "audio": audio_cfg}
+        }).decode())
         while True:
             msg = await ws.recv()
-            if isinstance(msg, (bytes, bytearray)): audio.write(msg); continue
-            try: evt = json.loads(msg)
+            if isinstance(msg, (bytes, bytearray)): yield bytes(msg); continue
+            try: evt = orjson.loads(msg)
             except Exception: continue
             t = evt.get("type")
-            if t == "response.output_audio.delta":
+            if t == "response.output_audio.delta" and not REALTIME_BINARY_AUDIO:
                 b64 = evt.get("delta")
-                if b64: audio.write(base64.b64decode(b64))
+                if b64: yield binascii.a2b_base64(b64)  # ASCII str in, bytes out: no validation pass or str->bytes copy
             elif t == "response.completed": break
             elif t == "error": raise RuntimeError(str(evt))
-    return audio.getvalue()
 
-async def tts_http_fallback(text: str, voice: Optional[str] = None, fmt: str = "mp3") -> bytes:
+async def tts_http_fallback(text: str, voice: Optional[str] = None, fmt: str = TTS_FORMAT) -> AsyncIterator[bytes]:
     voice = voice or REALTIME_VOICE
     url = f"{OPENAI_BASE_URL}/v1/audio/speech"
     headers = {"Authorization": f"Bearer {OPENAI_API_KEY}", "Content-Type": "application/json"}
     payload = {"model": "tts-1", "voice": voice, "input": text, "response_format": fmt}
-    async with httpx.AsyncClient(timeout=60) as client:
-        r = await client.post(url, headers=headers, json=payload)
+    async with _HTTP.stream("POST", url, headers=headers, json=payload) as r:
         r.raise_for_status()
-        return r.content
-
-async def tts_any(text: str, voice: Optional[str] = None, fmt: str = "mp3") -> bytes:
+        async for chunk in r.aiter_bytes():
+            yield chunk
+
+def _tts_key(text: str, voice: Optional[str] = None, fmt: str = TTS_FORMAT) -> tuple:
+    return (voice or REALTIME_VOICE, fmt, hashlib.md5(text.encode()).hexdigest())
+
+def _tts_cache_put(key: tuple, audio: bytes):
+    # Only fixed phrases are kept (summaries and replies are one-offs), bounded by total bytes
+    global _tts_cache_bytes
+    if key in _TTS_CACHE or len(audio) > _TTS_CACHE_MAX_BYTES: return
+    _TTS_CACHE[key] = audio
+    _tts_cache_bytes += len(audio)
+    while _tts_cache_bytes > _TTS_CACHE_MAX_BYTES: _tts_cache_bytes -= len(_TTS_CACHE.pop(next(iter(_TTS_CACHE))))
+
+async def tts_any(text: str, voice: Optional[str] = None, fmt: str = TTS_FORMAT) -> AsyncIterator[bytes]:
+    key = _tts_key(text, voice, fmt)
+    cached = _TTS_CACHE.get(key)
+    if cached is not None:
+        yield cached; return
+    # Falls back to HTTP only if the realtime socket fails before the first chunk;
+    # once audio has reached the browser we can't splice in a second stream.
+    started, buf = False, bytearray()
     try:
-        return await tts_via_realtime(text, voice=voice, fmt=fmt)
+        async for chunk in tts_stream_realtime(text, voice=voice, fmt=fmt):
+            started = True
+            buf += chunk
+            yield chunk
     except Exception as e:
+        if started: raise
         print(f"[Realtime failed → fallback]:", e)
-        return await tts_http_fallback(text, voice=voice, fmt=fmt)
-
-async def transcribe_bytes(audio_bytes: bytes, filename: str = "audio.mp3") -> str:
-    url = f"{OPENAI_BASE_URL}/v1/audio/transcriptions"
-    headers = {"Authorization": f"Bearer {OPENAI_API_KEY}"}
-    files = {"file": (filename, audio_bytes, "audio/mpeg")}
-    data = {"model": "whisper-1"}
-    async with httpx.AsyncClient(timeout=60) as client:
-        r = await client.post(url, headers=headers, data=data, files=files)
-        r.raise_for_status()
-        return r.json().get("text", "").strip()
+        async for chunk in tts_http_fallback(text, voice=voice, fmt=fmt):
+            buf += chunk
+            yield chunk
+    # Only cache complete audio; a client disconnect mid-stream never reaches this line.
+    if text in _CANNED_SET: _tts_cache_put(key, bytes(buf))
+
+def _greeting_text(count: int) -> str:
+    if count == 0: return "Hello! You have no unread emails. Looks like you're all caught up."
+    if count == 1: return "Hello! You have one new email. Would you like me to read the summary?"
+    return f"Hello! You have {count} unread emails. Would you like me to read the summaries?"
+
+_FIXED_PHRASES = [
+    "Okay, starting with the first email.", "Got it. Moving to the next email.",
+    "Okay, your reply has been sent.", "You're all caught up. Have a great day!",
+    "Alright. Let me know when you're ready.", "Sorry, I didn't understand.", "Sorry, an error occurred.",
+]
+# Greetings are cacheable too, but fill on first use rather than costing ~20 TTS calls per boot
+_CANNED_SET = frozenset(_FIXED_PHRASES + [_greeting_text(n) for n in range(21)])
+
+async def _prewarm_tts():
+    for text in _FIXED_PHRASES:
+        try:
+            async for _ in tts_any(text, voice=REALTIME_VOICE): pass
+        except Exception as e: print(f"[TTS prewarm] {text!r}: {e}")
+
+@app.on_event("startup")
+async def _startup():
+    global _WHISPER
+    if LOCAL_WHISPER_MODEL:
+        if WhisperModel is None: print("[Whisper] LOCAL_WHISPER_MODEL set but faster-whisper is not installed")
+        else: _WHISPER = await asyncio.to_thread(WhisperModel, LOCAL_WHISPER_MODEL, device="auto", compute_type="int8")
+    # Don't hold up startup on the synth calls; the cache fills in the background.
+    app.state.tts_prewarm = asyncio.create_task(_prewarm_tts())
+
+def _audio_stream(text: str) -> StreamingResponse:
+    return StreamingResponse(tts_any(text, voice=REALTIME_VOICE, fmt=TTS_FORMAT),
+                             media_type=_MEDIA_TYPES.get(TTS_FORMAT, "application/octet-stream"))
+
+def _cached_audio(request: Request, text: str) -> Response:
+    # Same text/voice/format always yields the same audio, so let the browser keep it -- but only
+    # once complete bytes exist; a live stream that fails partway must not be cached for a day.
+    etag = '"' + hashlib.md5(f"{REALTIME_VOICE}|{TTS_FORMAT}|{text}".encode()).hexdigest() + '"'
+    headers = {"Cache-Control": "public, max-age=86400, immutable", "ETag": etag}
+    if request.headers.get("if-none-match") == etag: return Response(status_code=304, headers=headers)
+    cached = _TTS_CACHE.get(_tts_key(text, REALTIME_VOICE, TTS_FORMAT))
+    if cached is not None:
+        return Response(cached, media_type=_MEDIA_TYPES.get(TTS_FORMAT, "application/octet-stream"), headers=headers)
+    resp = _audio_stream(text)
+    resp.headers["Cache-Control"] = "no-store"
+    return resp
+
+def _stash_feedback(text: str) -> str:
+    token = secrets.token_urlsafe(8)
+    _PENDING_FEEDBACK[token] = text
+    while len(_PENDING_FEEDBACK) > 32: _PENDING_FEEDBACK.pop(next(iter(_PENDING_FEEDBACK)))
+    return f"/assistant/feedback/{token}"
+
+async def _client_audio(client: WebSocket) -> AsyncIterator[bytes]:
+    # pcm16/24kHz frames from the browser; a text frame from the client ends the turn
+    while True:
+        msg = await client.receive()
+        if msg["type"] == "websocket.disconnect": raise WebSocketDisconnect(msg.get("code", 1000))
+        if msg.get("bytes"): yield msg["bytes"]
+        elif msg.get("text") is not None: return
+
+def _transcribe_local(pcm: bytes) -> str:
+    audio = np.frombuffer(pcm, dtype=np.int16).astype(np.float32) / 32768.0
+    # Whisper expects 16 kHz; the page captures at 24 kHz, so resample 3:2 (raw PCM, no ffmpeg needed)
+    audio = np.interp(np.arange(0, len(audio), 1.5), np.arange(len(audio)), audio).astype(np.float32)
+    segments, _ = _WHISPER.transcribe(audio, language="en", beam_size=1)
+    return " ".join(seg.text.strip() for seg in segments).strip()
+
+async def transcribe_stream(client: WebSocket) -> str:
+    """Transcribe one spoken command. With a local Whisper model the PCM is collected and run in a
+    worker thread; otherwise it's relayed into a Realtime transcription session while the user speaks."""
+    if _WHISPER is not None:
+        pcm = b"".join([frame async for frame in _client_audio(client)])
+        return await asyncio.to_thread(_transcribe_local, pcm) if pcm else ""
+    url = "wss://api.openai.com/v1/realtime?intent=transcription"
+    headers = [("Authorization", f"Bearer {OPENAI_API_KEY}"), ("OpenAI-Beta", "realtime=v1")]
+    async with websockets.connect(url, extra_headers=headers, max_size=None) as oai:
+        await oai.send(orjson.dumps({
+            "type": "transcription_session.update",
+            "session": {"input_audio_format": "pcm16", "turn_detection": None,
+                        "input_audio_transcription": {"model": TRANSCRIBE_MODEL}}
+        }).decode())
+        got_audio = False
+        async for frame in _client_audio(client):
+            got_audio = True
+            await oai.send(orjson.dumps({"type": "input_audio_buffer.append",
+                                         "audio": base64.b64encode(frame).decode()}).decode())
+        if not got_audio: return ""
+        await oai.send(orjson.dumps({"type": "input_audio_buffer.commit"}).decode())
+        while True:
+            try: evt = orjson.loads(await oai.recv())
+            except orjson.JSONDecodeError: continue
+            t = evt.get("type")
+            if t == "conversation.item.input_audio_transcription.completed":
+                return (evt.get("transcript") or "").strip()
+            elif t == "error": raise RuntimeError(str(evt))
 
-async def interpret_intent(text: str, context: str) -> str:
-    system_prompt = ""
+# Local rules for the short, common answers; anything else still goes to the model.
+_FILLER = r'[\s,.!]*(?:please|thanks|thank you)?[\s.!]*'
+# Only "reply/respond/tell [them] saying X" or "... that X" is a local reply, and "that" must be
+# followed by a space or separator (so "that's fine" is not one); everything else goes to the model.
+_REPLY_RE   = re.compile(r'^\s*(?:reply|respond|tell)(?:\s+(?:back\s+)?(?:to\s+)?(?:them|him|her))?[\s,]+'
+                         r'(?:saying|that)(?=[\s,:;-])(?![\s,:;-]*(?:again|one more time)\b)[\s,:;-]*(?=[^\w]*\w)(\S.*?)\s*$',
+                         re.I | re.S)
+_CONFIRM_RE = re.compile(r'^\s*(?:okay|ok|got it|confirm|next|continue|move on|yes|yeah|yep|sure|proceed|go ahead)'
+                         + _FILLER + r'$', re.I)
+_DECLINE_RE = re.compile(r'^\s*(?:no|nope|not now|later|stop|cancel|skip it)' + _FILLER + r'$', re.I)
+
+def _match_intent(text: str, context: str) -> Optional[str]:
     if context == "initial_greeting":
-        system_prompt = (
-            "You are an intent detection system. The user is responding to the question 'Would you like to hear your emails?'. "
-            "If they say yes, 'sure', 'okay', 'proceed', etc., output 'PROCEED'. "
-            "If they say no, 'not now', 'later', etc., output 'DECLINE'. "
-            "Otherwise, output 'UNKNOWN'."
-        )
-    else: # context is an email_id
-        system_prompt = (
-            "You are an intent detection system for a voice-based email client. "
-            "The possible actions are: 'reply' or 'confirm'.\n"
-            "- If the command is to reply, output 'REPLY:' followed by the verbatim message. Example: 'REPLY: I will be there in 10 minutes.'\n"
-            "- If the command is to confirm, acknowledge, or mark as read (e.g., 'got it', 'okay', 'confirm', 'next'), output 'CONFIRM'.\n"
-            "- Otherwise, output 'UNKNOWN'."
-        )
-
-    url = f"{OPENAI_BASE_URL}/v1/chat/completions"
-    headers = {"Authorization": f"Bearer {OPENAI_API_KEY}", "Content-Type": "application/json"}
-    messages = [{"role": "system", "content": system_prompt}, {"role": "user", "content": text}]
-    payload = {"model": "gpt-4o-mini", "messages": messages, "temperature": 0.1}
-    async with httpx.AsyncClient(timeout=60) as client:
-        r = await client.post(url, headers=headers, json=payload)
-        r.raise_for_status()
-        return r.json()["choices"][0]["message"]["content"].strip()
+        if _CONFIRM_RE.match(text): return "PROCEED"
+        if _DECLINE_RE.match(text): return "DECLINE"
+        return None
+    m = _REPLY_RE.match(text)
+    if m: return f"REPLY: {m.group(1)}"
+    if _CONFIRM_RE.match(text): return "CONFIRM"
+    return None
+
+_SYS_GREETING = (
+    "You are an intent detection system. The user is responding to the question 'Would you like to hear your emails?'. "
+    "If they say yes, 'sure', 'okay', 'proceed', etc., output 'PROCEED'. "
+    "If they say no, 'not now', 'later', etc., output 'DECLINE'. "
+    "Otherwise, output 'UNKNOWN'."
+)
+_SYS_EMAIL = (
+    "You are an intent detection system for a voice-based email client. "
+    "The possible actions are: 'reply' or 'confirm'.\n"
+    "- If the command is to reply, output 'REPLY:' followed by the verbatim message. Example: 'REPLY: I will be there in 10 minutes.'\n"
+    "- If the command is to confirm, acknowledge, or mark as read (e.g., 'got it', 'okay', 'confirm', 'next'), output 'CONFIRM'.\n"
+    "- Otherwise, output 'UNKNOWN'."
+)
+
+async def interpret_intent(text: str, context: str) -> str:
+    local = _match_intent(text, context)
+    if local: return local
+    # Email ids all share one namespace so they don't pollute the greeting answers
+    tag = "initial_greeting" if context == "initial_greeting" else "email"
+    cached = await _cache_lookup(_INTENT_CACHE, text, tag)
+    if cached: return cached
+    system_prompt = _SYS_GREETING if context == "initial_greeting" else _SYS_EMAIL  # else: an email_id
+    payload = {"model": "gpt-4o-mini", "temperature": 0.1,
+               "messages": [{"role": "system", "content": system_prompt}, {"role": "user", "content": text}]}
+    r = await _HTTP.post(_CHAT_URL, headers=_JSON_HEADERS, json=payload)
+    r.raise_for_status()
+    intent = orjson.loads(r.content)["choices"][0]["message"]["content"].strip()
+    # REPLY carries the user's verbatim text; a near-match would send the wrong message
+    if not intent.upper().startswith("REPLY:"): await _cache_store(_INTENT_CACHE, text, intent, tag)
+    return intent
 
 
 # ======================= Gmail Helpers =======================
+_ADDR_RE = re.compile(r'<([^>]+)>')
+
 def _require_gmail() -> Credentials:
     global _GMAIL_CREDS
     if not _GMAIL_CREDS or not _GMAIL_CREDS.valid:
@@ -175,26 +383,59 @@ def _require_gmail() -> Credentials:
 
 def _gmail_service() -> Any:
     creds = _require_gmail()
-    return build("gmail", "v1", credentials=creds, cache_discovery=False)
+    if getattr(_GMAIL_LOCAL, "creds", None) is not creds:
+        _GMAIL_LOCAL.service = build("gmail", "v1", credentials=creds, cache_discovery=False)
+        _GMAIL_LOCAL.creds = creds
+    return _GMAIL_LOCAL.service
+
+def _my_email(service: Any) -> str:
+    global _MY_EMAIL
+    if _MY_EMAIL is None: _MY_EMAIL = service.users().getProfile(userId='me').execute()['emailAddress']
+    return _MY_EMAIL
+
+_WANTED_HEADERS = ("from", "subject", "date", "to", "message-id", "references")
 
 def _parse_headers(payload_headers: List[Dict[str, str]]) -> Dict[str, str]:
-    h = {k["name"].lower(): k["value"] for k in payload_headers}
-    return {"from": h.get("from", ""), "subject": h.get("subject", ""), "date": h.get("date", ""),
-            "to": h.get("to", ""), "message-id": h.get("message-id", ""), "references": h.get("references", "")}
+    out = dict.fromkeys(_WANTED_HEADERS, "")
+    for k in payload_headers:
+        name = k["name"].lower()
+        if name in out: out[name] = k["value"]
+    return out
 
 def _decode_body(msg: Dict[str, Any]) -> str:
     payload = msg.get("payload", {})
     parts = payload.get("parts")
     data = payload.get("body", {}).get("data")
-    if data: return base64.urlsafe_b64decode(data.encode()).decode("utf-8", errors="ignore")
-    if parts:
-        for p in parts:
-            if p.get("mimeType") == "text/plain" and p.get("body", {}).get("data"):
-                return base64.urlsafe_b64decode(p["body"]["data"].encode()).decode("utf-8", errors="ignore")
-        for p in parts:
-            if p.get("body", {}).get("data"):
-                return base64.urlsafe_b64decode(p["body"]["data"].encode()).decode("utf-8", errors="ignore")
-    return ""
+    if data: return base64.urlsafe_b64decode(data).decode("utf-8", errors="ignore")
+    # One pass: return the first text/plain part, else remember the first part with any data
+    fallback = None
+    for p in parts or ():
+        pdata = p.get("body", {}).get("data")
+        if not pdata: continue
+        if p.get("mimeType") == "text/plain": return base64.urlsafe_b64decode(pdata).decode("utf-8", errors="ignore")
+        if fallback is None: fallback = pdata
+    return base64.urlsafe_b64decode(fallback).decode("utf-8", errors="ignore") if fallback else ""
+
+_HTML_HINT_RE = re.compile(r'<(?:html|body|div|p|br|table|span|a)[\s/>]', re.I)
+_TAG_RE       = re.compile(r'<(script|style)\b.*?</\1>|<[^>]+>', re.S | re.I)
+_QUOTE_HDR_RE = re.compile(r'^On .+ wrote:\s*$', re.M)
+_QUOTED_RE    = re.compile(r'^>.*\n?', re.M)
+_SPACES_RE    = re.compile(r'[ \t\r\f\v\xa0]+')
+_BLANKS_RE    = re.compile(r'\n(?: ?\n)+')
+
+def _clean_body(text: str, limit: int = 4000) -> str:
+    """Strip markup, quoted history and extra whitespace so the summarizer only reads the new message."""
+    if _HTML_HINT_RE.search(text):
+        if HTMLParser is not None:
+            tree = HTMLParser(text)
+            for node in tree.css("script, style"): node.decompose()
+            text = tree.text(separator="\n")
+        else: text = html.unescape(_TAG_RE.sub("\n", text))
+    m = _QUOTE_HDR_RE.search(text)
+    if m: text = text[:m.start()]
+    text = _QUOTED_RE.sub("", text)
+    text = _BLANKS_RE.sub("\n", _SPACES_RE.sub(" ", text)).strip()
+    return text[:limit]
 
 def _mark_as_read(service: Any, msg_id: str):
     try:
@@ -202,25 +443,37 @@ def _mark_as_read(service: Any, msg_id: str):
         print(f"[GMAIL] Marked message {msg_id} as read.")
     except HttpError as error: print(f"[GMAIL] Error marking as read: {error}")
 
+def _hdr(value: str, name: str = "") -> str:
+    value = " ".join(value.split())  # no CR/LF can reach the header block
+    if value.isascii() and len(name) + 2 + len(value) <= 78: return value
+    # CRLF folding (email.header defaults to bare LF); also keeps long References under 998 octets.
+    return Header(value, "us-ascii" if value.isascii() else "utf-8", header_name=name).encode(linesep="\r\n")
+
+def _build_reply_raw(to: str, frm: str, subject: str, in_reply_to: str, references: str, body: str) -> bytes:
+    """Plain-text RFC 5322 message; 7bit when the body is short-lined ASCII, else base64 UTF-8."""
+    lines = body.splitlines() or [""]
+    if body.isascii() and all(len(l) <= 998 for l in lines):
+        cte, payload = "7bit", "\r\n".join(lines)
+    else:
+        cte, payload = "base64", base64.encodebytes(body.encode("utf-8")).decode("ascii").replace("\n", "\r\n")
+    head = [f"To: {_hdr(to)}", f"From: {_hdr(frm)}", f"Subject: {_hdr(subject, 'Subject')}",
+            f"In-Reply-To: {_hdr(in_reply_to, 'In-Reply-To')}", f"References: {_hdr(references, 'References')}",
+            "MIME-Version: 1.0", 'Content-Type: text/plain; charset="utf-8"', f"Content-Transfer-Encoding: {cte}"]
+    return ("\r\n".join(head) + "\r\n\r\n" + payload + "\r\n").encode("ascii")
+
 def _create_and_send_reply(service: Any, original_msg_id: str, reply_body: str):
     try:
         original_msg = service.users().messages().get(userId="me", id=original_msg_id, format="metadata",
             metadataHeaders=["Subject", "From", "To", "Message-ID", "References"]).execute()
         headers = _parse_headers(original_msg["payload"]["headers"])
-        message = EmailMessage()
-        message.set_content(reply_body)
-        sender_email = re.search(r'<(.*?)>', headers["from"])
-        recipient_email = re.search(r'<(.*?)>', headers["to"])
-        my_profile = service.users().getProfile(userId='me').execute()
-        my_email = my_profile['emailAddress']
+        sender_email = _ADDR_RE.search(headers["from"])
+        recipient_email = _ADDR_RE.search(headers["to"])
+        my_email = _my_email(service)
         reply_to_address = sender_email.group(1) if sender_email else headers["from"]
         if my_email in reply_to_address: reply_to_address = recipient_email.group(1) if recipient_email else headers["to"]
-        message["To"] = reply_to_address
-        message["From"] = my_email
-        message["Subject"] = "Re: " + headers["subject"]
-        message["In-Reply-To"] = headers["message-id"]
-        message["References"] = headers.get("references", "") + " " + headers["message-id"]
-        encoded_message = base64.urlsafe_b64encode(message.as_bytes()).decode()
+        raw = _build_reply_raw(reply_to_address, my_email, "Re: " + headers["subject"], headers["message-id"],
+                               headers.get("references", "") + " " + headers["message-id"], reply_body)
+        encoded_message = base64.urlsafe_b64encode(raw).decode()
         create_message = {"raw": encoded_message, "threadId": original_msg["threadId"]}
         sent_message = service.users().messages().send(userId="me", body=create_message).execute()
         print(f"[GMAIL] Reply sent: {sent_message['id']}")
@@ -261,11 +514,11 @@ const statusEl = document.getElementById('status');
 const spinnerEl = document.getElementById('spinner');
 
 async function checkAuth(){
-  statusEl.textContent = 'Checking Gmail connection...';
-  const r = await fetch('/gmail/status'); const j = await r.json();
+  statusEl.textContent = 'Checking for new mail...';
+  const r = await fetch('/assistant/start'); const j = await r.json();
   if(j.connected){
     document.getElementById('authBox').style.display='none';
-    startConversation();
+    startConversation(j);
   }else{
     document.getElementById('authBox').style.display='block';
     statusEl.textContent = 'Please connect your Gmail account to begin.';
@@ -273,12 +526,10 @@ async function checkAuth(){
   }
 }
 
-async function startConversation() {
-  statusEl.textContent = "Checking for new mail...";
-  const r = await fetch('/gmail/unread');
-  unreadEmails = (await r.json()).items;
+async function startConversation(start) {
+  unreadEmails = start.items;
   
-  const greetingAudio = new Audio('/assistant/greeting?cb=' + Date.now());
+  const greetingAudio = new Audio(start.greeting_audio_url);
   await greetingAudio.play();
   
   if (unreadEmails.length > 0) {
@@ -292,7 +543,7 @@ async function startConversation() {
 async function processNextEmail() {
   if (emailCursor >= unreadEmails.length) {
     statusEl.textContent = "You're all caught up!";
-    const outroAudio = new Audio('/assistant/outro?cb=' + Date.now());
+    const outroAudio = new Audio('/assistant/outro');
     await outroAudio.play();
     conversationContext = 'idle';
     return;
@@ -301,59 +552,82 @@ async function processNextEmail() {
   conversationContext = email.id;
   
   statusEl.textContent = `Reading email ${emailCursor + 1} of ${unreadEmails.length}...`;
-  await fetch('/gmail/speak?id='+encodeURIComponent(email.id), {method:'POST'});
-  const summaryAudio = new Audio('/audio.mp3?cb=' + Date.now());
+  const next = unreadEmails[emailCursor + 1];
+  const summaryAudio = new Audio('/gmail/speak?id=' + encodeURIComponent(email.id) +
+    (next ? '&next_id=' + encodeURIComponent(next.id) : ''));
   await summaryAudio.play();
   summaryAudio.onended = () => listenForCommand();
 }
 
+// Converts mic float samples to pcm16 in the audio thread and hands them to the page.
+const PCM_WORKLET = `
+class PcmTap extends AudioWorkletProcessor {
+  process(inputs) {
+    const ch = inputs[0][0];
+    if (ch) {
+      const pcm = new Int16Array(ch.length);
+      for (let i = 0; i < ch.length; i++) {
+        const s = Math.max(-1, Math.min(1, ch[i]));
+        pcm[i] = s < 0 ? s * 0x8000 : s * 0x7fff;
+      }
+      this.port.postMessage(pcm.buffer, [pcm.buffer]);
+    }
+    return true;
+  }
+}
+registerProcessor('pcm-tap', PcmTap);`;
+
+async function handleCommandResult(data) {
+    statusEl.textContent = data.text_feedback;
+    const feedbackAudio = new Audio(data.audio_url);
+    feedbackAudio.onended = () => {
+        if(data.action === 'PROCEED') {
+            emailCursor = 0;
+            processNextEmail();
+        } else if (data.action === 'CONTINUE') {
+            emailCursor++;
+            processNextEmail();
+        } else if (data.action === 'DECLINE' || data.action === 'END') {
+            statusEl.textContent = "Okay, have a great day!";
+        }
+    };
+    await feedbackAudio.play();
+}
+
 async function listenForCommand() {
     statusEl.textContent = "Listening for your command...";
     spinnerEl.style.display = 'block';
+    let stream;
     try {
-        const stream = await navigator.mediaDevices.getUserMedia({audio: true});
-        const rec = new MediaRecorder(stream, {mimeType: 'audio/webm'});
-        let chunks = [];
-        rec.ondataavailable = e => chunks.push(e.data);
-        rec.onstop = async () => {
-            stream.getTracks().forEach(track => track.stop());
-            spinnerEl.style.display = 'none';
-            if (chunks.length === 0) {
-                statusEl.textContent = "Didn't hear anything.";
-                return;
-            }
-            statusEl.textContent = 'Processing...';
-            const blob = new Blob(chunks, {type: 'audio/webm'});
-            const fd = new FormData();
-            fd.append('file', blob, 'command.webm');
-            fd.append('context', conversationContext);
-
-            const res = await fetch('/assistant/command', {method: 'POST', body: fd});
-            const data = await res.json();
-
-            const feedbackAudio = new Audio(data.audio_url + '?cb=' + Date.now());
-            await feedbackAudio.play();
-            statusEl.textContent = data.text_feedback;
-            
-            feedbackAudio.onended = () => {
-                if(data.action === 'PROCEED') {
-                    emailCursor = 0;
-                    processNextEmail();
-                } else if (data.action === 'CONTINUE') {
-                    emailCursor++;
-                    processNextEmail();
-                } else if (data.action === 'DECLINE' || data.action === 'END') {
-                    statusEl.textContent = "Okay, have a great day!";
-                }
-            };
-        };
-        rec.start();
-        setTimeout(() => { if (rec.state === 'recording') rec.stop(); }, 5000);
+        stream = await navigator.mediaDevices.getUserMedia({audio: true});
     } catch (e) {
         console.warn('Mic err', e);
         statusEl.textContent = 'Microphone permission denied.';
         spinnerEl.style.display = 'none';
+        return;
     }
+    const ctx = new AudioContext({sampleRate: 24000});
+    await ctx.audioWorklet.addModule(URL.createObjectURL(new Blob([PCM_WORKLET], {type: 'application/javascript'})));
+    const ws = new WebSocket((location.protocol === 'https:' ? 'wss://' : 'ws://') + location.host + '/assistant/stream');
+    ws.binaryType = 'arraybuffer';
+    ws.onmessage = e => handleCommandResult(JSON.parse(e.data));
+    ws.onerror = () => { statusEl.textContent = 'Connection error.'; spinnerEl.style.display = 'none'; };
+    await new Promise(resolve => { ws.onopen = resolve; });
+    ws.send(JSON.stringify({context: conversationContext}));
+
+    const src = ctx.createMediaStreamSource(stream);
+    const tap = new AudioWorkletNode(ctx, 'pcm-tap');
+    tap.port.onmessage = e => { if (ws.readyState === WebSocket.OPEN) ws.send(e.data); };
+    src.connect(tap);
+    tap.connect(ctx.destination); // keeps the node pulled; it outputs silence
+    setTimeout(() => {
+        src.disconnect(); tap.disconnect();
+        stream.getTracks().forEach(track => track.stop());
+        ctx.close();
+        spinnerEl.style.display = 'none';
+        statusEl.textContent = 'Processing...';
+        if (ws.readyState === WebSocket.OPEN) ws.send(JSON.stringify({type: 'stop'}));
+    }, 5000);
 }
 
 window.onload = checkAuth;
@@ -367,13 +641,29 @@ window.onload = checkAuth;
 async def home():
     return RedirectResponse("/inbox")
 
-@app.get("/inbox", response_class=HTMLResponse)
-async def inbox_page():
-    return HTMLResponse(CONVERSATIONAL_HTML)
+# Compressed once at import rather than via GZipMiddleware, which would also run over the audio streams
+_INBOX_BYTES = CONVERSATIONAL_HTML.encode()
+_INBOX_GZ    = gzip.compress(_INBOX_BYTES, 9)
+_INBOX_ETAG  = '"' + hashlib.md5(_INBOX_BYTES).hexdigest() + '"'
+
+def _accepts_gzip(accept_encoding: str) -> bool:
+    # "gzip;q=0" is an explicit refusal, so read q-values; an explicit gzip entry beats "*"
+    qs: Dict[str, float] = {}
+    for part in accept_encoding.lower().split(","):
+        coding, _, params = part.partition(";")
+        params = params.strip()
+        try: qs[coding.strip()] = float(params[2:]) if params.startswith("q=") else 1.0
+        except ValueError: qs[coding.strip()] = 0.0
+    q = qs.get("gzip", qs.get("x-gzip", qs.get("*", 0.0)))
+    return q > 0
 
-@app.get("/audio.mp3")
-async def audio_mp3():
-    return StreamingResponse(io.BytesIO(_LAST_AUDIO), media_type="audio/mpeg")
+@app.get("/inbox", response_class=HTMLResponse)
+async def inbox_page(request: Request):
+    headers = {"Cache-Control": "no-cache, must-revalidate", "ETag": _INBOX_ETAG, "Vary": "Accept-Encoding"}
+    if request.headers.get("if-none-match") == _INBOX_ETAG: return Response(status_code=304, headers=headers)
+    if _accepts_gzip(request.headers.get("accept-encoding", "")):
+        return HTMLResponse(_INBOX_GZ, headers={**headers, "Content-Encoding": "gzip"})
+    return HTMLResponse(_INBOX_BYTES, headers=headers)
 
 # ======================= Gmail Flow =======================
 @app.get("/gmail/status")
@@ -401,71 +691,131 @@ def gmail_oauth2callback(request: Request, code: str, state: str):
     flow = Flow.from_client_config(cfg, scopes=GMAIL_SCOPES, state=state)
     flow.redirect_uri = GOOGLE_REDIRECT_URI
     flow.fetch_token(code=code)
-    global _GMAIL_CREDS
+    global _GMAIL_CREDS, _MY_EMAIL
     _GMAIL_CREDS = flow.credentials
+    _MY_EMAIL = None
+    _cancel_prefetches()  # summaries from the previous login
     return RedirectResponse("/inbox")
 
 ONLY_PRIMARY = os.getenv("ONLY_PRIMARY", "false").lower() in ("1", "true", "yes")
 @app.get("/gmail/unread")
-def gmail_unread(max: int = 20):
-    svc = _gmail_service()
+async def gmail_unread(max: int = 20):
     base_labels = ["INBOX", "UNREAD"]
     if ONLY_PRIMARY: base_labels.append("CATEGORY_PERSONAL")
+    # One batched HTTP round trip for all metadata instead of one GET per message
+    found: Dict[str, Dict[str, Any]] = {}
+    def _collect(request_id, response, exception):
+        if exception is not None: print(f"[GMAIL] get {request_id} error: {exception}"); return
+        found[request_id] = response
+    def _list_and_fetch() -> List[Dict[str, Any]]:
+        # The service is per-thread, so resolve it on the same worker that runs execute()
+        svc = _gmail_service()
+        msgs = svc.users().messages().list(
+            userId="me", labelIds=base_labels, maxResults=max, includeSpamTrash=False).execute().get("messages", [])
+        if msgs:
+            batch = svc.new_batch_http_request(callback=_collect)
+            for m in msgs:
+                batch.add(svc.users().messages().get(userId="me", id=m["id"], format="metadata",
+                          metadataHeaders=["From", "Subject", "Date"]), request_id=m["id"])
+            batch.execute()
+        return msgs
     items = []
     try:
-        msgs = svc.users().messages().list(userId="me", labelIds=base_labels, maxResults=max,
-                                           includeSpamTrash=False).execute().get("messages", [])
+        msgs = await asyncio.to_thread(_list_and_fetch)
         for m in msgs:
-            full = svc.users().messages().get(userId="me", id=m["id"], format="metadata",
-                metadataHeaders=["From", "Subject", "Date"]).execute()
+            full = found.get(m["id"])
+            if full is None: continue
             h = _parse_headers(full.get("payload", {}).get("headers", []))
             items.append({"id": m["id"], "from": h["from"], "subject": h["subject"], "date": h["date"]})
     except Exception as e: print(f"[GMAIL] list error: {e}")
     return {"count": len(items), "items": items}
 
-@app.post("/gmail/speak")
-async def gmail_speak(id: str = Query(...)):
-    svc = _gmail_service()
-    full = svc.users().messages().get(userId="me", id=id, format="full").execute()
-    body = _decode_body(full) or full.get("snippet", "(no body)")
-    summary = await summarize_with_gpt(body)
-    global _LAST_AUDIO
-    _LAST_AUDIO = await tts_any(summary, voice=REALTIME_VOICE)
-    return {"ok": True}
+async def _summarize_message(msg_id: str) -> str:
+    full = await asyncio.to_thread(
+        lambda: _gmail_service().users().messages().get(userId="me", id=msg_id, format="full").execute())
+    body = _clean_body(_decode_body(full)) or full.get("snippet", "(no body)")
+    return await summarize_with_gpt(body)
+
+def _consume_prefetch_error(task: "asyncio.Task[str]"):
+    # A prefetch nobody ends up awaiting must not log "Task exception was never retrieved"
+    if not task.cancelled() and task.exception() is not None:
+        print(f"[GMAIL] summary prefetch failed: {task.exception()}")
+
+def _cancel_prefetches():
+    for task in _SUMMARY_PREFETCH.values(): task.cancel()
+    _SUMMARY_PREFETCH.clear()
+
+async def _prefetch_summary(msg_id: str):
+    if msg_id in _SUMMARY_PREFETCH: return
+    task = asyncio.create_task(_summarize_message(msg_id))
+    task.add_done_callback(_consume_prefetch_error)
+    _SUMMARY_PREFETCH[msg_id] = task
+    while len(_SUMMARY_PREFETCH) > 8: _SUMMARY_PREFETCH.pop(next(iter(_SUMMARY_PREFETCH))).cancel()
+
+@app.api_route("/gmail/speak", methods=["GET", "POST"])
+async def gmail_speak(background_tasks: BackgroundTasks, id: str = Query(...), next_id: Optional[str] = None):
+    pending = _SUMMARY_PREFETCH.pop(id, None)
+    try: summary = await pending if pending else await _summarize_message(id)
+    except Exception as e:
+        print(f"[GMAIL] prefetched summary failed, retrying: {e}")
+        summary = await _summarize_message(id)
+    # Warm the next email while this one plays; runs after the audio stream finishes.
+    if next_id: background_tasks.add_task(_prefetch_summary, next_id)
+    return _audio_stream(summary)
 
 # ======================= Conversational Endpoints =======================
 
+@app.get("/assistant/start")
+async def assistant_start():
+    # One Gmail listing feeds both the email list and the greeting
+    if not (_GMAIL_CREDS and _GMAIL_CREDS.valid): return {"connected": False}
+    unread_data = await gmail_unread()
+    return {"connected": True, **unread_data,
+            "greeting_audio_url": f"/assistant/greeting?count={unread_data['count']}"}
+
 @app.get("/assistant/greeting")
-async def assistant_greeting():
+async def assistant_greeting(request: Request, count: Optional[int] = None):
     try:
-        unread_data = gmail_unread()
-        count = unread_data["count"]
-        if count == 0:
-            text = "Hello! You have no unread emails. Looks like you're all caught up."
-        elif count == 1:
-            text = "Hello! You have one new email. Would you like me to read the summary?"
-        else:
-            text = f"Hello! You have {count} unread emails. Would you like me to read the summaries?"
-        
-        global _LAST_AUDIO
-        _LAST_AUDIO = await tts_any(text, voice=REALTIME_VOICE)
-        return StreamingResponse(io.BytesIO(_LAST_AUDIO), media_type="audio/mpeg")
+        if count is None: return _audio_stream(_greeting_text((await gmail_unread())["count"]))
+        return _cached_audio(request, _greeting_text(count))
     except Exception as e:
         print(f"[ERROR] assistant_greeting: {e}")
         return PlainTextResponse("Error generating greeting", status_code=500)
 
 @app.get("/assistant/outro")
-async def assistant_outro():
-    global _LAST_AUDIO
-    _LAST_AUDIO = await tts_any("You're all caught up. Have a great day!", voice=REALTIME_VOICE)
-    return StreamingResponse(io.BytesIO(_LAST_AUDIO), media_type="audio/mpeg")
+async def assistant_outro(request: Request):
+    _cancel_prefetches()
+    return _cached_audio(request, "You're all caught up. Have a great day!")
+
+@app.get("/assistant/feedback/{token}")
+async def assistant_feedback(token: str):
+    text = _PENDING_FEEDBACK.get(token)
+    if text is None: return PlainTextResponse("Not found", status_code=404)
+    return _audio_stream(text)
+
+@app.websocket("/assistant/stream")
+async def assistant_stream(ws: WebSocket):
+    await ws.accept()
+    try:
+        context = orjson.loads(await ws.receive_text()).get("context", "")
+        _require_gmail()
+        transcript = await transcribe_stream(ws)
+        result = await _handle_command(transcript, context)
+    except WebSocketDisconnect:
+        _cancel_prefetches()  # the listener left; summaries queued for the next emails are moot
+        return
+    except Exception as e:
+        print(f"[ERROR] assistant_stream failed: {e}")
+        result = _command_error()
+    await ws.send_text(orjson.dumps(result).decode())
+    await ws.close()
+
+def _command_error() -> Dict[str, str]:
+    return {"action": "END", "text_feedback": "An error occurred.",
+            "audio_url": _stash_feedback("Sorry, an error occurred.")}
 
-@app.post("/assistant/command")
-async def assistant_command(file: UploadFile, context: str = Form(...)):
+async def _handle_command(transcript: str, context: str) -> Dict[str, str]:
     try:
-        svc = _gmail_service()
-        audio_bytes = await file.read()
-        transcript = await transcribe_bytes(audio_bytes, file.filename or "command.webm")
         print(f"[COMMAND] Context: {context}, Transcript: '{transcript}'")
         
         if not transcript: raise ValueError("Empty transcript")
@@ -486,31 +836,24 @@ async def assistant_command(file: UploadFile, context: str = Form(...)):
         else: # Context is an email_id
             if intent.startswith("REPLY:"):
                 reply_text = intent.split("REPLY:", 1)[1].strip()
-                _create_and_send_reply(svc, context, reply_text)
-                _mark_as_read(svc, context)
+                # Independent Gmail calls; each thread gets its own service (httplib2 isn't thread-safe).
+                await asyncio.gather(
+                    asyncio.to_thread(lambda: _create_and_send_reply(_gmail_service(), context, reply_text)),
+                    asyncio.to_thread(lambda: _mark_as_read(_gmail_service(), context)),
+                )
                 feedback_text = "Okay, your reply has been sent."
                 action = 'CONTINUE' # Move to next email
             elif intent == "CONFIRM":
-                _mark_as_read(svc, context)
+                await asyncio.to_thread(lambda: _mark_as_read(_gmail_service(), context))
                 feedback_text = "Got it. Moving to the next email."
                 action = 'CONTINUE'
-        
-        global _LAST_AUDIO
-        _LAST_AUDIO = await tts_any(feedback_text, voice=REALTIME_VOICE)
-        
-        return JSONResponse({
+
+        return {
             "action": action,
             "text_feedback": feedback_text,
-            "audio_url": "/audio.mp3"
-        })
+            "audio_url": _stash_feedback(feedback_text)
+        }
 
     except Exception as e:
-        print(f"[ERROR] assistant_command failed: {e}")
-        # ### THIS IS THE FIXED BLOCK ###
-        global _LAST_AUDIO
-        _LAST_AUDIO = await tts_any("Sorry, an error occurred.", voice=REALTIME_VOICE)
-        return JSONResponse({
-            "action": "END",
-            "text_feedback": "An error occurred.",
-            "audio_url": "/audio.mp3"
-        }, status_code=500)
\ No newline at end of file
+        print(f"[ERROR] command failed: {e}")
+        return _command_error()
\ No newline at end of file
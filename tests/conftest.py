@@ -0,0 +1,165 @@
+import os
+
+# app.py reads its settings at import time.
+os.environ.setdefault("OPENAI_API_KEY", "test")
+os.environ["SESSION_PERSISTENCE_ENABLED"] = "0"
+
+import asyncio
+from collections import OrderedDict
+
+import httpx
+import orjson
+import pytest
+from fastapi.testclient import TestClient
+
+import app as voice_app
+
+
+@pytest.fixture
+def tts_cache(monkeypatch):
+    """An empty process-wide TTS cache for the test."""
+    cache = OrderedDict()
+    monkeypatch.setattr(voice_app, "_TTS_CACHE", cache)
+    monkeypatch.setattr(voice_app, "_tts_cache_bytes", 0)
+    return cache
+
+
+@pytest.fixture
+def fake_openai(monkeypatch, tts_cache):
+    """Routes the shared HTTP client to a fake OpenAI; set .chunks / .fail_after to shape TTS replies."""
+
+    class FakeOpenAI:
+        chunks = [b"x" * 100]
+        fail_after = None
+
+        async def _body(self):
+            for i, chunk in enumerate(self.chunks):
+                if self.fail_after is not None and i >= self.fail_after:
+                    raise httpx.ReadError("upstream reset")
+                yield chunk
+
+        def handler(self, request):
+            return httpx.Response(200, content=self._body())
+
+    fake = FakeOpenAI()
+    client = httpx.AsyncClient(transport=httpx.MockTransport(fake.handler))
+    monkeypatch.setattr(voice_app, "_client", lambda: client)
+    return fake
+
+
+@pytest.fixture
+def session_client():
+    """A TestClient holding a live session, and a helper that stores audio under that session."""
+    client = TestClient(voice_app.app)
+    known = set(voice_app._SESSION_STATE)
+    assert client.get("/").status_code == 200
+    (session_id,) = set(voice_app._SESSION_STATE) - known
+
+    def store(audio):
+        with voice_app._session_scope(session_id):
+            return voice_app._store_audio_bytes(audio)
+
+    client.store_audio = store
+    yield client
+    voice_app._SESSION_STATE.pop(session_id, None)
+
+
+class FakeWebSocket:
+    """Records what the app sends; stands in for a connected starlette WebSocket.
+
+    yield_on_send makes each write suspend once, as a real socket write can, and max_in_flight
+    records how many writes ever overlapped; fail makes writes raise.
+    """
+
+    def __init__(self, yield_on_send=False, fail=None):
+        self.sent = []
+        self.yield_on_send = yield_on_send
+        self.fail = fail
+        self.in_flight = self.max_in_flight = 0
+
+    async def _send(self, data):
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            if self.yield_on_send:
+                await asyncio.sleep(0)
+            if self.fail is not None:
+                raise self.fail
+            self.sent.append(data)
+        finally:
+            self.in_flight -= 1
+
+    async def send_text(self, data):
+        await self._send(data)
+
+    async def send_bytes(self, data):
+        await self._send(data)
+
+
+@pytest.fixture
+def fake_ws():
+    """Factory for FakeWebSocket instances."""
+    return FakeWebSocket
+
+
+@pytest.fixture
+def fake_graph(monkeypatch):
+    """Answers graph_request from a {path: payload or callable(method, kwargs)} map and records the paths called."""
+
+    class FakeGraph:
+        def __init__(self):
+            self.calls = []
+            self.routes = {"/me": {"mail": "me@example.com", "displayName": "Me"}}
+
+        async def request(self, method, path, headers=None, **kwargs):
+            self.calls.append(path)
+            route = self.routes.get(path, {})
+            payload = route(method, kwargs) if callable(route) else route
+            return httpx.Response(200, content=orjson.dumps(payload))
+
+    fake = FakeGraph()
+    monkeypatch.setattr(voice_app, "graph_request", fake.request)
+    return fake
+
+
+@pytest.fixture
+def fake_gmail(monkeypatch):
+    """Answers gmail_request from a {path: payload or callable(method, kwargs)} map.
+
+    Paths without a route go to .default(path) when set. Records (method, path, json) and the
+    peak number of requests in flight (each request yields once, like a network call).
+    """
+
+    class FakeGmail:
+        def __init__(self):
+            self.calls = []
+            self.routes = {"/users/me/profile": {"emailAddress": "me@example.com"}}
+            self.default = None
+            self.in_flight = self.peak_in_flight = 0
+
+        async def request(self, method, path, params=None, json=None):
+            self.calls.append((method, path, json))
+            self.in_flight += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+            try:
+                await asyncio.sleep(0)
+            finally:
+                self.in_flight -= 1
+            if path not in self.routes and self.default is not None:
+                return self.default(path)
+            route = self.routes.get(path, {})
+            return route(method, {"params": params, "json": json}) if callable(route) else route
+
+    fake = FakeGmail()
+    monkeypatch.setattr(voice_app, "gmail_request", fake.request)
+    return fake
+
+
+@pytest.fixture
+def make_manager():
+    """Builds a ConversationManager over a FakeWebSocket; call it inside the test's event loop."""
+
+    def make(service_type="microsoft", **kwargs):
+        return voice_app.ConversationManager(FakeWebSocket(), service_type, **kwargs)
+
+    return make
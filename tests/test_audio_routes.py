@@ -0,0 +1,75 @@
+import asyncio
+
+import app as voice_app
+
+AUDIO = bytes(range(256)) * 40
+
+
+def test_audio_full_body(session_client):
+    audio_id = session_client.store_audio(AUDIO)
+    r = session_client.get(f"/audio/{audio_id}")
+    assert r.status_code == 200
+    assert r.content == AUDIO
+    assert r.headers["accept-ranges"] == "bytes"
+
+
+def test_audio_range(session_client):
+    audio_id = session_client.store_audio(AUDIO)
+    r = session_client.get(f"/audio/{audio_id}", headers={"Range": "bytes=100-199"})
+    assert r.status_code == 206
+    assert r.content == AUDIO[100:200]
+    assert r.headers["content-range"] == f"bytes 100-199/{len(AUDIO)}"
+
+
+def test_audio_open_ended_range_is_clamped(session_client):
+    audio_id = session_client.store_audio(AUDIO)
+    r = session_client.get(f"/audio/{audio_id}", headers={"Range": f"bytes=10-{len(AUDIO) * 2}"})
+    assert r.status_code == 206
+    assert r.content == AUDIO[10:]
+    assert r.headers["content-length"] == str(len(AUDIO) - 10)
+
+
+def test_audio_unsatisfiable_range(session_client):
+    audio_id = session_client.store_audio(AUDIO)
+    r = session_client.get(f"/audio/{audio_id}", headers={"Range": f"bytes={len(AUDIO)}-"})
+    assert r.status_code == 416
+
+
+async def _generate(stream):
+    async for _ in stream.iter_bytes():
+        pass
+
+
+def test_stream_is_charged_final_size_and_evicted(fake_openai):
+    fake_openai.chunks = [b"y" * 250, b"y" * 250]
+
+    async def run():
+        lru = voice_app.AudioLRU(cap=10, ttl=600, max_bytes=1000)
+        lru.put("old", b"x" * 600)
+        stream = voice_app.SpeechStream("hello")
+        lru.put("new", stream)
+        assert lru.total_bytes == 600
+        await _generate(stream)
+        return lru, stream
+
+    lru, stream = asyncio.run(run())
+    assert lru.total_bytes == 500
+    assert lru.get("old") is None
+    assert lru.get("new") is stream
+
+
+def test_partially_failed_stream_returns_502(fake_openai, session_client):
+    fake_openai.chunks = [AUDIO[:100], AUDIO[100:200]]
+    fake_openai.fail_after = 1
+
+    async def run():
+        stream = voice_app.SpeechStream("hello")
+        try:
+            await _generate(stream)
+        except RuntimeError:
+            pass
+        return stream
+
+    stream = asyncio.run(run())
+    assert stream.error is not None and len(stream) == 100
+    assert session_client.get(f"/audio/{session_client.store_audio(stream)}").status_code == 502
@@ -0,0 +1,40 @@
+import pytest
+from fastapi.testclient import TestClient
+
+import back_up_2
+
+
+@pytest.mark.parametrize("header, expected", [
+    ("gzip, deflate, br", True),
+    ("gzip;q=0, deflate", False),
+    ("br;q=1.0, gzip;q=0.5", True),
+    ("*", True),
+    ("*;q=0", False),
+    ("gzip, *;q=0", True),
+    ("identity", False),
+    ("", False),
+])
+def test_accepts_gzip_honours_q_values(header, expected):
+    assert back_up_2._accepts_gzip(header) is expected
+
+
+@pytest.fixture
+def backup_client(monkeypatch):
+    async def fake_realtime(text, voice=None, fmt=None):
+        yield b"audio"
+
+    monkeypatch.setattr(back_up_2, "_TTS_CACHE", {})
+    monkeypatch.setattr(back_up_2, "_tts_cache_bytes", 0)
+    monkeypatch.setattr(back_up_2, "tts_stream_realtime", fake_realtime)
+    # Not entered as a context manager: startup would prewarm TTS and shutdown closes the shared client.
+    return TestClient(back_up_2.app)
+
+
+def test_live_outro_stream_is_not_cacheable_but_cached_bytes_are(backup_client):
+    first = backup_client.get("/assistant/outro")
+    assert first.content == b"audio"
+    assert first.headers["cache-control"] == "no-store"
+    assert "etag" not in first.headers
+    second = backup_client.get("/assistant/outro")
+    assert second.headers["cache-control"].startswith("public, max-age=86400")
+    assert backup_client.get("/assistant/outro", headers={"If-None-Match": second.headers["etag"]}).status_code == 304
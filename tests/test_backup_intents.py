@@ -0,0 +1,27 @@
+import pytest
+
+import back_up_2
+
+
+@pytest.mark.parametrize("utterance, body", [
+    ("reply to him saying I'll be there at five.", "I'll be there at five."),
+    ("Reply saying sounds good", "sounds good"),
+    ("Respond that: the invoice is attached", "the invoice is attached"),
+    ("tell them that I'm running late", "I'm running late"),
+])
+def test_explicit_reply_is_matched_locally(utterance, body):
+    assert back_up_2._match_intent(utterance, "msg-1") == f"REPLY: {body}"
+
+
+@pytest.mark.parametrize("utterance", [
+    "Reply.",
+    "reply that",
+    "Say that again.",
+    "Say that one more time.",
+    "Tell her that again",
+    "Tell her that's fine",
+    "reply to him thanks",
+    "say hello",
+])
+def test_ambiguous_reply_goes_to_the_model(utterance):
+    assert back_up_2._match_intent(utterance, "msg-1") is None
@@ -0,0 +1,42 @@
+import asyncio
+
+import pytest
+
+import back_up_2
+
+
+@pytest.fixture
+def backup_tts(monkeypatch):
+    """back_up_2 with an empty TTS cache and a fake realtime synth that counts its calls."""
+    calls = []
+
+    async def fake_realtime(text, voice=None, fmt=None):
+        calls.append(text)
+        yield b"a" * 600
+
+    monkeypatch.setattr(back_up_2, "_TTS_CACHE", {})
+    monkeypatch.setattr(back_up_2, "_tts_cache_bytes", 0)
+    monkeypatch.setattr(back_up_2, "tts_stream_realtime", fake_realtime)
+    return calls
+
+
+def _speak(text):
+    async def run():
+        return b"".join([chunk async for chunk in back_up_2.tts_any(text)])
+    return asyncio.run(run())
+
+
+def test_only_canned_phrases_are_cached(backup_tts):
+    for _ in range(2):
+        _speak("Sorry, I didn't understand.")
+        _speak("Summary: the invoice is overdue.")
+    assert backup_tts.count("Sorry, I didn't understand.") == 1
+    assert backup_tts.count("Summary: the invoice is overdue.") == 2
+
+
+def test_tts_cache_is_bounded_by_bytes(backup_tts, monkeypatch):
+    monkeypatch.setattr(back_up_2, "_TTS_CACHE_MAX_BYTES", 1000)
+    _speak("Sorry, I didn't understand.")
+    _speak("Sorry, an error occurred.")
+    assert back_up_2._tts_cache_bytes == 600
+    assert list(back_up_2._TTS_CACHE) == [back_up_2._tts_key("Sorry, an error occurred.")]
@@ -0,0 +1,32 @@
+import asyncio
+
+import orjson
+
+import app as voice_app
+
+
+def test_timer_flush_never_overlaps_a_direct_send(fake_ws):
+    ws = fake_ws(yield_on_send=True)
+
+    async def run():
+        batched = voice_app.BatchedWS(ws)
+        await batched.send_json({"n": 1})
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + 1
+        while not ws.in_flight and loop.time() < deadline:
+            await asyncio.sleep(0)  # until the timer's flush is part-way through its write
+        await batched.send_bytes(b"audio")
+        await batched.flush()
+
+    asyncio.run(run())
+    assert ws.max_in_flight == 1
+    assert ws.sent == [orjson.dumps({"n": 1}).decode(), b"audio"]
+
+
+def test_dropped_frames_are_logged(fake_ws, caplog):
+    async def run():
+        batched = voice_app.BatchedWS(fake_ws(fail=RuntimeError("socket closed")))
+        await batched.send_batch([{"n": 1}, {"n": 2}])
+
+    asyncio.run(run())
+    assert "Dropped 2 WebSocket message(s)" in caplog.text
@@ -0,0 +1,58 @@
+import asyncio
+
+import app as voice_app
+
+MESSAGE = {"id": "m1", "threadId": "t1", "payload": {"headers": [{"name": "From", "value": "Ann <ann@example.com>"}]}}
+
+
+def _message_gets(fake_gmail):
+    return [path for method, path, json in fake_gmail.calls if path == "/users/me/messages/m1"]
+
+
+def test_prefetched_body_is_used_while_fresh(fake_gmail, make_manager):
+    fake_gmail.routes["/users/me/messages/m1"] = MESSAGE
+
+    async def run():
+        manager = make_manager("google")
+        await manager._prefetch_email("m1")
+        await manager._load_gmail_email_into_context("m1")
+
+    asyncio.run(run())
+    assert len(_message_gets(fake_gmail)) == 1
+
+
+def test_stale_prefetch_is_refetched(fake_gmail, make_manager, monkeypatch):
+    monkeypatch.setattr(voice_app, "_BODY_CACHE_TTL", -1.0)
+    fake_gmail.routes["/users/me/messages/m1"] = MESSAGE
+
+    async def run():
+        manager = make_manager("google")
+        await manager._prefetch_email("m1")
+        await manager._load_gmail_email_into_context("m1")
+
+    asyncio.run(run())
+    assert len(_message_gets(fake_gmail)) == 2
+
+
+def test_stop_drops_prefetched_bodies(fake_gmail, make_manager):
+    fake_gmail.routes["/users/me/messages/m1"] = MESSAGE
+
+    async def run():
+        manager = make_manager("google")
+        await manager._prefetch_email("m1")
+        await manager.stop()
+        await manager._load_gmail_email_into_context("m1")
+
+    asyncio.run(run())
+    assert len(_message_gets(fake_gmail)) == 2
+
+
+def test_search_metadata_fetches_are_capped(fake_gmail, make_manager):
+    fake_gmail.routes["/users/me/messages"] = {"messages": [{"id": f"m{i}"} for i in range(30)]}
+    fake_gmail.default = lambda path: {"id": path.rsplit("/", 1)[-1], "threadId": "t", "payload": {"headers": []}}
+
+    async def run():
+        return await make_manager("google")._gmail_search("", max_results=30, publish=False)
+
+    assert len(asyncio.run(run())) == 30
+    assert fake_gmail.peak_in_flight == voice_app._GMAIL_FETCH_CONCURRENCY
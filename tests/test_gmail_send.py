@@ -0,0 +1,32 @@
+import asyncio
+import base64
+from email import message_from_bytes
+
+
+def _sent_message(fake_gmail):
+    (body,) = [json for method, path, json in fake_gmail.calls if path == "/users/me/messages/send"]
+    return message_from_bytes(base64.urlsafe_b64decode(body["raw"]))
+
+
+def test_from_header_is_the_account_address_not_its_display_name(fake_gmail, make_manager):
+    async def run():
+        manager = make_manager("google")
+        manager.account_identity = {"email": "me@example.com", "display_name": "Morgan Example"}
+        await manager.gmail_draft_new_email("ann@example.com", "Hi", "Hello there")
+        return await manager.gmail_send_draft()
+
+    assert asyncio.run(run()) == "Email sent."
+    assert _sent_message(fake_gmail)["From"] == "me@example.com"
+
+
+def test_from_header_falls_back_to_the_profile(fake_gmail, make_manager):
+    calls = iter([{"emailAddress": ""}, {"emailAddress": "me@example.com"}])
+    fake_gmail.routes["/users/me/profile"] = lambda method, kwargs: next(calls)
+
+    async def run():
+        manager = make_manager("google")
+        await manager.gmail_draft_new_email("ann@example.com", "Hi", "Hello there")
+        return await manager.gmail_send_draft()
+
+    assert asyncio.run(run()) == "Email sent."
+    assert _sent_message(fake_gmail)["From"] == "me@example.com"
@@ -0,0 +1,36 @@
+import asyncio
+
+
+def test_mark_all_read_retries_throttled_batch_items(fake_graph, make_manager):
+    pages = [{"value": [{"id": "a"}, {"id": "b"}]}, {"value": []}]
+    fake_graph.routes["/me/mailFolders('Inbox')/messages"] = lambda method, kwargs: pages.pop(0)
+    batches = []
+
+    def batch(method, kwargs):
+        requests = kwargs["json"]["requests"]
+        batches.append([r["id"] for r in requests])
+        if len(batches) == 1:
+            return {"responses": [
+                {"id": "0", "status": 200, "body": {}},
+                {"id": "1", "status": 429, "headers": {"Retry-After": "0"}, "body": {}},
+            ]}
+        return {"responses": [{"id": r["id"], "status": 200, "body": {}} for r in requests]}
+
+    fake_graph.routes["/$batch"] = batch
+
+    async def run():
+        return await make_manager("microsoft").outlook_mark_all_read()
+
+    assert asyncio.run(run()) == "Marked 2 unread Outlook emails as read."
+    assert batches == [["0", "1"], ["1"]]
+
+
+def test_mark_all_read_stops_when_a_page_cannot_be_updated(fake_graph, make_manager):
+    fake_graph.routes["/me/mailFolders('Inbox')/messages"] = {"value": [{"id": "a"}]}
+    fake_graph.routes["/$batch"] = {"responses": [{"id": "0", "status": 403, "body": {}}]}
+
+    async def run():
+        return await make_manager("microsoft").outlook_mark_all_read()
+
+    asyncio.run(run())
+    assert fake_graph.calls.count("/me/mailFolders('Inbox')/messages") == 1
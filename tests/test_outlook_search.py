@@ -0,0 +1,37 @@
+import asyncio
+
+import orjson
+
+
+def _message(mid, is_read=False):
+    return {"id": mid, "subject": "Invoice", "isRead": is_read,
+            "from": {"emailAddress": {"name": "Ann", "address": "ann@example.com"}}}
+
+
+def test_search_overfetches_and_filters_read_mail_locally(fake_graph, make_manager):
+    seen = []
+
+    def inbox(method, kwargs):
+        seen.append(kwargs["params"])
+        return {"value": [_message("r1", is_read=True), _message("u1"), _message("r2", is_read=True), _message("u2")]}
+
+    fake_graph.routes["/me/mailFolders('Inbox')/messages"] = inbox
+
+    async def run():
+        return await make_manager("microsoft").outlook_search_emails('the "Q3" invoice', max_results=2, publish=False)
+
+    results = orjson.loads(asyncio.run(run()))
+    assert [m["id"] for m in results] == ["u1", "u2"]
+    assert seen[0]["$search"] == '"the Q3 invoice"'
+    assert seen[0]["$top"] == 6
+
+
+def test_search_of_only_quotes_lists_unread(fake_graph, make_manager):
+    seen = []
+    fake_graph.routes["/me/mailFolders('Inbox')/messages"] = lambda method, kwargs: seen.append(kwargs["params"]) or {"value": []}
+
+    async def run():
+        return await make_manager("microsoft").outlook_search_emails('""', publish=False)
+
+    assert asyncio.run(run()) == "No emails found."
+    assert "$search" not in seen[0] and seen[0]["$filter"] == "isRead eq false"
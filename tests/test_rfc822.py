@@ -0,0 +1,25 @@
+from email import message_from_bytes
+from email.header import decode_header, make_header
+
+import app as voice_app
+
+
+def _lines(raw):
+    head = raw.split(b"\r\n\r\n", 1)[0]
+    assert b"\n" not in head.replace(b"\r\n", b"")
+    return head.split(b"\r\n")
+
+
+def test_long_non_ascii_subject_folds_with_crlf():
+    subject = "Überraschung für das ganze Team " * 6
+    raw = voice_app._build_rfc822("a@example.com", subject, "hi", "me@example.com")
+    assert all(len(line) <= 78 for line in _lines(raw))
+    parsed = message_from_bytes(raw)
+    assert str(make_header(decode_header(parsed["Subject"]))) == " ".join(subject.split())
+
+
+def test_long_references_chain_is_folded():
+    refs = " ".join(f"<message-{i}@mail.example.com>" for i in range(200))
+    raw = voice_app._build_rfc822("a@example.com", "Re: hi", "body", "me@example.com", {"References": refs})
+    assert all(len(line) <= 998 for line in _lines(raw))
+    assert " ".join(message_from_bytes(raw)["References"].split()) == refs
@@ -0,0 +1,19 @@
+import asyncio
+
+import app as voice_app
+
+
+def test_failed_batch_item_is_retried_alone(fake_graph, make_manager):
+    inbox = "/me/mailFolders('Inbox')/messages"
+    fake_graph.routes[inbox] = {"value": [
+        {"id": "m1", "subject": "Hi", "from": {"emailAddress": {"name": "Ann", "address": "ann@example.com"}}},
+    ]}
+
+    async def run():
+        manager = make_manager("microsoft")
+        return await manager._get_unread_email_summary({"id": "mail", "status": 429, "body": {}})
+
+    summary, contacts = asyncio.run(run())
+    assert fake_graph.calls.count(inbox) == 1
+    assert summary.startswith("You have 1 new email")
+    assert contacts[0]["id"] == "m1"
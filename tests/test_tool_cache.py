@@ -0,0 +1,44 @@
+import asyncio
+
+import httpx
+import orjson
+import pytest
+
+import app as voice_app
+
+
+@pytest.fixture
+def quiet_model(monkeypatch, fake_openai):
+    """A model that answers every turn with plain text, so only the cache bookkeeping runs."""
+
+    async def chat(payload):
+        return httpx.Response(200, content=orjson.dumps({"choices": [{"message": {"role": "assistant", "content": "Done."}}]}))
+
+    monkeypatch.setattr(voice_app, "_openai_chat", chat)
+
+
+def _searches_after(make_manager, utterance):
+    calls = []
+
+    async def search(query=""):
+        calls.append(query)
+        return "[]"
+
+    async def run():
+        manager = make_manager("google")
+        await manager._get_cached_or_call("gmail_search_emails", search, {"query": "is:unread"})
+        await manager.process_user_message(utterance)
+        await manager._get_cached_or_call("gmail_search_emails", search, {"query": "is:unread"})
+
+    with voice_app._session_scope("tool-cache-test"):
+        asyncio.run(run())
+    voice_app._SESSION_STATE.pop("tool-cache-test", None)
+    return len(calls)
+
+
+def test_recheck_bypasses_cached_search(quiet_model, make_manager):
+    assert _searches_after(make_manager, "Can you check my inbox again?") == 2
+
+
+def test_other_turns_reuse_cached_search(quiet_model, make_manager):
+    assert _searches_after(make_manager, "Who sent the first one?") == 1
@@ -0,0 +1,15 @@
+import app as voice_app
+
+
+def test_tts_cache_is_bounded_by_bytes(tts_cache, monkeypatch):
+    monkeypatch.setattr(voice_app, "_TTS_CACHE_MAX_BYTES", 1000)
+    for i in range(5):
+        voice_app._tts_cache_put(f"phrase {i}", b"x" * 300)
+    assert voice_app._tts_cache_bytes == 900
+    assert voice_app._tts_cache_get("phrase 0") is None
+    assert voice_app._tts_cache_get("phrase 4") is not None
+
+
+def test_tts_cache_skips_long_text(tts_cache):
+    voice_app._tts_cache_put("word " * 50, b"x" * 10)
+    assert voice_app._tts_cache_get("word " * 50) is None
@@ -0,0 +1,22 @@
+import pytest
+
+import app as voice_app
+
+
+@pytest.fixture
+def idle_manager(monkeypatch):
+    """/ws accepts the session as Google-connected and the conversation never starts talking."""
+    async def nothing(self):
+        return None
+
+    monkeypatch.setattr(voice_app, "_google_connected", lambda creds: True)
+    monkeypatch.setattr(voice_app.ConversationManager, "start", nothing)
+
+
+def test_audio_survives_until_the_sessions_last_socket_closes(idle_manager, session_client):
+    audio_id = session_client.store_audio(b"x" * 500)
+    with session_client.websocket_connect("/ws"):
+        with session_client.websocket_connect("/ws"):
+            pass
+        assert session_client.get(f"/audio/{audio_id}").status_code == 200
+    assert session_client.get(f"/audio/{audio_id}").status_code == 404